@@ -0,0 +1,11 @@
+"""
+基准测试工具：
+fake_device  模拟的 uiautomator2 设备（录制界面树 + 场景脚本）
+replay       使用模拟设备回放一天的发布计划
+log_overhead 调度器和主循环在 1 万个任务下的日志CPU开销
+excel_ingest Excel读取、过滤、哈希和状态回写在 1千/1万/10万 行下的耗时（支持基线对比）
+fake_adb     模拟的 adb 可执行程序（设备存储映射到本地目录，可配置延迟和带宽）
+transfer     使用模拟adb测量不同媒体数量和大小下的传输吞吐（文件/秒、MB/秒）
+startup      用 -X importtime 测量服务启动（导入 main）耗时，检查重量级依赖是否被延迟加载（支持预算）
+task_memory  每个排队任务的内存占用和到期扫描耗时（pandas Series 与 TaskRecord 对比）
+"""
@@ -0,0 +1,3 @@
+@echo off
+rem fake adb for benchmarks, see benchmarks/fake_adb.py
+python "%~dp0..\fake_adb.py" %*
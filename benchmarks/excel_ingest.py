@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+Excel读取链路基准测试功能：
+1. 生成 1千/1万/10万 行的发布计划 xlsx（time、postName、status 列和若干附加列，含过期行和无效行）
+2. 在临时目录中（覆盖 RESOURCE_DIRS 和 EXCEL_CONFIG 路径）分别测量：
+   ExcelMonitor.read_excel_safe / filter_valid_rows / calculate_data_hash / check_excel_data
+   以及 Application.update_excel_status
+3. 结果输出为JSON；可与保存的基线对比，中位数变慢超过阈值时返回非0
+
+用法：
+    python -m benchmarks.excel_ingest --output excel_ingest.json
+    python -m benchmarks.excel_ingest --sizes 1000,10000 --baseline excel_ingest.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# 日志目录和控制台级别需在导入其他模块之前设置
+import config.settings as settings
+
+WORK_DIR = tempfile.mkdtemp(prefix='excel_ingest_')
+settings.LOG_DIR = os.path.join(WORK_DIR, 'logs')
+settings.LOG_CONFIG['CONSOLE_LEVEL'] = 'WARNING'
+
+import pandas as pd
+
+from config.settings import RESOURCE_DIRS, EXCEL_CONFIG, DEVICE_MAPPING, TASK_STATUS
+from core.excel_monitor import ExcelMonitor
+from utils.logger import shutdown_logging
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def override_paths(work_dir):
+    """资源目录和Excel路径指向临时目录（原地修改，已导入的模块同样生效）"""
+    for name in RESOURCE_DIRS:
+        RESOURCE_DIRS[name] = os.path.join(work_dir, 'resources', name.lower())
+        os.makedirs(RESOURCE_DIRS[name], exist_ok=True)
+    EXCEL_CONFIG['BACKUP_PATH'] = os.path.join(work_dir, 'excel_backup')
+
+
+def generate_workbook(path, rows, seed=0):
+    """
+    生成发布计划：约 70% 未来任务、20% 已过期、5% 时间格式错误、5% 未知设备；
+    状态混合空值、传输成功和等待文件，另有标题、备注、负责人三列
+    """
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    names = list(DEVICE_MAPPING)
+    statuses = ['', '', '', TASK_STATUS['SUCCESS'], TASK_STATUS['WAITING_MEDIA'], TASK_STATUS['WAITING_CONTENT']]
+    data = []
+    for i in range(rows):
+        kind = rng.random()
+        if kind < 0.70:
+            task_time = now + timedelta(minutes=rng.randint(60, 29 * 24 * 60))
+        else:
+            task_time = now - timedelta(minutes=rng.randint(60, 30 * 24 * 60))
+        time_value = task_time.strftime('%Y-%m-%d %H:%M:%S')
+        if 0.90 <= kind < 0.95:
+            time_value = task_time.strftime('%Y/%m/%d %H点%M分')
+        post_name = names[i % len(names)] if kind < 0.95 else f"unknown{i % 7}"
+        data.append({
+            'time': time_value,
+            'postName': post_name,
+            'status': rng.choice(statuses),
+            'title': f"第{i}条笔记标题",
+            'remark': '备注' * rng.randint(0, 20),
+            'owner': f"运营{i % 13}"
+        })
+    pd.DataFrame(data).to_excel(path, index=False)
+
+
+def _measure(func, repeat):
+    """执行 repeat 次，返回耗时统计（秒）和最后一次的结果"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return {
+        'first': round(samples[0], 6),
+        'min': round(min(samples), 6),
+        'median': round(statistics.median(samples), 6),
+        'runs': repeat
+    }, result
+
+
+def _load_application():
+    """Application 导入失败时跳过 update_excel_status"""
+    try:
+        from main import Application
+    except ImportError as e:
+        return None, str(e)
+    # 只测量 update_excel_status，不启动监控、调度和ADB
+    app = object.__new__(Application)
+    app._excel_write_lock = threading.Lock()
+    return app, None
+
+
+def bench_size(rows, repeat, seed=0):
+    excel_path = os.path.join(WORK_DIR, f'schedule_{rows}.xlsx')
+    generate_workbook(excel_path, rows, seed)
+    EXCEL_CONFIG['PATH'] = excel_path
+
+    monitor = ExcelMonitor(excel_path, EXCEL_CONFIG['REQUIRED_HEADERS'])
+    monitor.last_backup_time = time.time()  # 不测量定时备份
+    results = {'file_bytes': os.path.getsize(excel_path)}
+
+    results['read_excel_safe'], df = _measure(monitor.read_excel_safe, repeat)
+    # 首次运行会为未来任务创建目录，first 为冷启动耗时
+    results['filter_valid_rows'], valid_rows = _measure(lambda: monitor.filter_valid_rows(df), repeat)
+    results['calculate_data_hash'], _ = _measure(lambda: monitor.calculate_data_hash(valid_rows), repeat)
+    results['check_excel_data'], _ = _measure(lambda: monitor.check_excel_data(force_check=True), repeat)
+    results['valid_rows'] = int(valid_rows['is_valid'].sum()) if 'is_valid' in valid_rows else len(valid_rows)
+
+    app, reason = _load_application()
+    if app is None:
+        results['update_excel_status'] = {'skipped': reason}
+    else:
+        results['update_excel_status'], _ = _measure(
+            lambda: app.update_excel_status(rows // 2, TASK_STATUS['SUCCESS']), repeat
+        )
+    return results
+
+
+def compare(report, baseline, tolerance):
+    """
+    与基线对比中位数
+
+    Returns:
+        list: 变慢超过阈值的项 (规模, 函数, 基线, 当前, 倍数)
+    """
+    regressions = []
+    for size, functions in report['sizes'].items():
+        base_functions = baseline.get('sizes', {}).get(size, {})
+        for name, current in functions.items():
+            base = base_functions.get(name)
+            if not isinstance(current, dict) or not isinstance(base, dict):
+                continue
+            if 'median' not in current or not base.get('median'):
+                continue
+            ratio = current['median'] / base['median']
+            current['baseline_median'] = base['median']
+            current['ratio'] = round(ratio, 3)
+            if ratio > 1 + tolerance:
+                regressions.append((size, name, base['median'], current['median'], round(ratio, 2)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量Excel读取、过滤、哈希和状态回写的耗时')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES), help='行数列表（逗号分隔）')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数')
+    parser.add_argument('--seed', type=int, default=0, help='生成数据的随机种子')
+    parser.add_argument('--output', help='报告输出路径（默认打印到标准输出）')
+    parser.add_argument('--baseline', help='基线报告路径（与中位数对比）')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='允许的变慢比例（0.2 表示 20%%）')
+    args = parser.parse_args()
+
+    override_paths(WORK_DIR)
+    try:
+        report = {
+            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'sizes': {}
+        }
+        for size in (int(s) for s in args.sizes.split(',') if s.strip()):
+            print(f"测量 {size} 行...", file=sys.stderr)
+            report['sizes'][str(size)] = bench_size(size, args.repeat, args.seed)
+    finally:
+        shutdown_logging()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        report['regressions'] = [
+            {'rows': size, 'function': name, 'baseline': base, 'current': current, 'ratio': ratio}
+            for size, name, base, current, ratio in regressions
+        ]
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+    for size, name, base, current, ratio in regressions:
+        print(f"性能回退: {size} 行 {name} 中位数 {base}s -> {current}s ({ratio}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+模拟的 adb 可执行程序功能：
+1. 实现 devices / push / shell(mkdir, ls, am, content) / get-state / connect
+2. 设备存储映射到本地目录：FAKE_ADB_ROOT/<序列号>/<设备路径>
+3. 每次调用的固定延迟和推送带宽可配置，用于在没有手机的环境中测量传输链路
+
+通过环境变量 ADB_COMMAND 指向 benchmarks/bin/adb（Windows 为 adb.cmd）启用，配置：
+    FAKE_ADB_ROOT       设备存储根目录（必需）
+    FAKE_ADB_DEVICES    在线设备序列号（逗号分隔，默认 DEVICE_MAPPING 中的全部设备）
+    FAKE_ADB_OFFLINE    显示为 offline 的设备序列号（逗号分隔）
+    FAKE_ADB_LATENCY    每次调用的固定延迟（秒，默认 0.02）
+    FAKE_ADB_BANDWIDTH  推送带宽（MB/s，默认 20，0 表示不限）
+"""
+
+import os
+import shlex
+import shutil
+import sys
+import time
+
+ROOT = os.environ.get('FAKE_ADB_ROOT')
+LATENCY = float(os.environ.get('FAKE_ADB_LATENCY', '0.02'))
+BANDWIDTH = float(os.environ.get('FAKE_ADB_BANDWIDTH', '20'))
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _devices():
+    if os.environ.get('FAKE_ADB_DEVICES'):
+        return _split(os.environ['FAKE_ADB_DEVICES'])
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config.settings import DEVICE_MAPPING
+    return list(DEVICE_MAPPING.values())
+
+
+def _local(serial, device_path):
+    """设备路径对应的本地路径"""
+    return os.path.join(ROOT, serial, device_path.lstrip('/').replace('/', os.sep))
+
+
+def _fail(message, code=1):
+    sys.stderr.write(message + '\n')
+    return code
+
+
+def cmd_devices(devices, offline):
+    lines = ['List of devices attached']
+    lines += [f"{serial}\tdevice" for serial in devices]
+    lines += [f"{serial}\toffline" for serial in offline]
+    print('\n'.join(lines) + '\n')
+    return 0
+
+
+def cmd_push(serial, source, target):
+    if not os.path.isfile(source):
+        return _fail(f"adb: error: cannot stat '{source}': No such file or directory")
+    local = _local(serial, target)
+    if target.endswith('/') or os.path.isdir(local):
+        local = os.path.join(local, os.path.basename(source))
+    os.makedirs(os.path.dirname(local), exist_ok=True)  # 与 adb push 一致，自动创建设备上的目录
+    size = os.path.getsize(source)
+    start = time.perf_counter()
+    shutil.copyfile(source, local)
+    if BANDWIDTH > 0:
+        remaining = size / (BANDWIDTH * 1024 * 1024) - (time.perf_counter() - start)
+        if remaining > 0:
+            time.sleep(remaining)
+    seconds = max(time.perf_counter() - start, 1e-6)
+    print(f"{source}: 1 file pushed, 0 skipped. {size / seconds / 1024 / 1024:.1f} MB/s ({size} bytes in {seconds:.3f}s)")
+    return 0
+
+
+def cmd_shell(serial, args):
+    # adb shell 会把所有参数拼成一条命令交给设备上的 sh
+    words = shlex.split(' '.join(args))
+    if not words:
+        return _fail("interactive shell is not supported")
+    program = words[0]
+
+    if program == 'mkdir':
+        for path in (w for w in words[1:] if not w.startswith('-')):
+            os.makedirs(_local(serial, path), exist_ok=True)
+        return 0
+
+    if program == 'ls':
+        paths = [w for w in words[1:] if not w.startswith('-')] or ['/']
+        for path in paths:
+            local = _local(serial, path)
+            if not os.path.exists(local):
+                return _fail(f"ls: {path}: No such file or directory")
+            if os.path.isdir(local):
+                for name in sorted(os.listdir(local)):
+                    print(name)
+            else:
+                print(path)
+        return 0
+
+    if program == 'am':
+        if len(words) > 1 and words[1] == 'broadcast':
+            print("Broadcasting: Intent { act=%s }" % (words[words.index('-a') + 1] if '-a' in words else ''))
+            print("Broadcast completed: result=0")
+        else:
+            print("Starting: Intent { }")
+        return 0
+
+    if program == 'content':
+        if len(words) > 1 and words[1] == 'query':
+            # 列出设备存储中的全部文件（模拟媒体库）
+            base = os.path.join(ROOT, serial)
+            row = 0
+            for directory, _, files in os.walk(base):
+                for name in sorted(files):
+                    device_path = '/' + os.path.relpath(os.path.join(directory, name), base).replace(os.sep, '/')
+                    print(f"Row: {row} _id={row + 1}, _data={device_path}")
+                    row += 1
+            if row == 0:
+                print("No result found.")
+        else:
+            print("Result: null")
+        return 0
+
+    return _fail(f"/system/bin/sh: {program}: not found", 127)
+
+
+def main(argv):
+    if not ROOT:
+        return _fail("FAKE_ADB_ROOT is not set")
+    time.sleep(LATENCY)
+
+    devices = _devices()
+    offline = _split(os.environ.get('FAKE_ADB_OFFLINE', ''))
+    devices = [serial for serial in devices if serial not in offline]
+
+    serial = None
+    if len(argv) >= 2 and argv[0] == '-s':
+        serial, argv = argv[1], argv[2:]
+    if not argv:
+        return _fail("adb: no command specified")
+    command, args = argv[0], argv[1:]
+
+    if command == 'devices':
+        return cmd_devices(devices, offline)
+    if command == 'connect':
+        target = args[0] if args else ''
+        print(f"already connected to {target}" if target in devices else f"failed to connect to {target}")
+        return 0
+    if command == 'start-server':
+        return 0
+
+    if serial is None:
+        if len(devices) != 1:
+            return _fail("adb: more than one device/emulator" if devices else "adb: no devices/emulators found")
+        serial = devices[0]
+    if serial in offline:
+        return _fail("adb: device offline")
+    if serial not in devices:
+        return _fail(f"adb: device '{serial}' not found")
+
+    if command == 'get-state':
+        print('device')
+        return 0
+    if command == 'push':
+        if len(args) != 2:
+            return _fail("adb: push requires an argument")
+        return cmd_push(serial, args[0], args[1])
+    if command == 'shell':
+        return cmd_shell(serial, args)
+    return _fail(f"adb: unknown command {command}")
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,466 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+模拟设备模块功能：
+1. 用录制的界面树XML（dump_hierarchy）模拟 uiautomator2 设备
+2. 按场景脚本在点击、滑动、启动应用等操作后切换界面（可设置切换延迟）
+3. 每次RPC按配置的延迟休眠，统计调用次数和耗时
+4. 可直接传给 AndroidAutomation(device=...) 或 DeviceSessionPool(connect=...)
+5. 提供录制命令，从真机保存当前界面树
+
+场景目录结构：
+    scenario.json   界面列表、切换规则和RPC延迟
+    <界面名>.xml     录制的界面树，可包含 {{变量}} 占位符（如 {{folder}}）
+
+录制真机界面：
+    python -m benchmarks.fake_device record <设备序列号> <界面名> --out <场景目录>
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from core.android_automation import KEYGUARD_PACKAGE
+from core.ui_snapshot import UINode, UISnapshot
+
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scenarios', 'xhs')
+
+
+class UiObjectNotFoundError(Exception):
+    """选择器没有匹配到任何元素"""
+
+
+def _render(text, variables):
+    """替换 {{变量}} 占位符"""
+    for key, value in variables.items():
+        text = text.replace('{{%s}}' % key, str(value))
+    return text
+
+
+class _Screen:
+    """一个界面的界面树（供 UISnapshot 解析，不计入RPC延迟）"""
+
+    def __init__(self, name, xml, activity):
+        self.name = name
+        self.xml = xml
+        self.activity = activity
+        self.root = ET.fromstring(xml.encode('utf-8'))
+        self.parents = {child: parent for parent in self.root.iter() for child in parent}
+        self.snapshot = UISnapshot(self)
+        self.snapshot._root = self.root  # 与 hit_test 共用同一棵树，节点可直接对应
+
+    def dump_hierarchy(self):
+        return self.xml
+
+    @property
+    def package(self):
+        node = self.root.find('node')
+        return node.get('package', '') if node is not None else ''
+
+    def hit_test(self, x, y):
+        """返回包含该坐标的最深层节点"""
+        hit = None
+        for element in self.root.iter('node'):
+            left, top, right, bottom = UINode(element).bounds
+            if left <= x < right and top <= y < bottom:
+                hit = element
+        return hit
+
+    def ancestors(self, element):
+        """节点自身及其所有祖先节点"""
+        while element is not None and element.tag == 'node':
+            yield element
+            element = self.parents.get(element)
+
+
+class Scenario:
+    """场景脚本：界面XML、切换规则和RPC延迟"""
+
+    def __init__(self, path=SCENARIO_DIR):
+        self.path = path
+        with open(os.path.join(path, 'scenario.json'), 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        self.initial = config['initial']
+        self.screen_off = config.get('screen_off', self.initial)
+        self.latency = config.get('latency', {})
+        self.screens = config['screens']
+        self.transitions = config['transitions']
+        self._xml = {}
+
+    def load_screen(self, name, variables):
+        """加载界面（按变量渲染占位符）"""
+        if name not in self._xml:
+            with open(os.path.join(self.path, self.screens[name]['file']), 'r', encoding='utf-8') as f:
+                self._xml[name] = f.read()
+        return _Screen(name, _render(self._xml[name], variables), self.screens[name].get('activity', ''))
+
+
+class _Focus:
+    """当前获得焦点的输入框"""
+
+    def __init__(self, element):
+        self.element = element
+        self.text = ''
+
+
+class FakeUiObject:
+    """模拟 d(**selector) 返回的对象"""
+
+    def __init__(self, device, selector):
+        self.d = device
+        self.selector = selector
+
+    def _find(self):
+        return self.d._find(self.selector)
+
+    @property
+    def exists(self):
+        self.d._rpc('exists')
+        return self._find() is not None
+
+    def click(self, timeout=None):
+        element = self.d._wait_element(self._find, timeout)
+        if element is None:
+            raise UiObjectNotFoundError(f"元素不存在: {self.selector}")
+        self.d._click_element(element)
+
+    def _focus(self):
+        focus = self.d.focus
+        if self.selector.get('focused') and focus is not None:
+            return focus
+        element = self._find()
+        if element is None:
+            raise UiObjectNotFoundError(f"元素不存在: {self.selector}")
+        if focus is not None and focus.element is element:
+            return focus
+        raise UiObjectNotFoundError(f"元素未获得焦点: {self.selector}")
+
+    def set_text(self, text):
+        self.d._rpc('set_text')
+        self._focus().text = text
+
+    def get_text(self):
+        self.d._rpc('get_text')
+        return self._focus().text
+
+    def clear_text(self):
+        self.d._rpc('clear_text')
+        self._focus().text = ''
+
+
+class FakeXPathSelector:
+    """模拟 d.xpath(expr) 返回的对象"""
+
+    def __init__(self, device, expr):
+        self.d = device
+        self.expr = expr
+
+    def _find(self):
+        nodes = self.d.screen.snapshot.xpath(self.expr)
+        return self.d._element_of(nodes[0]) if nodes else None
+
+    @property
+    def exists(self):
+        self.d._rpc('exists')
+        return self._find() is not None
+
+    def click(self, timeout=None):
+        element = self.d._wait_element(self._find, timeout)
+        if element is None:
+            raise UiObjectNotFoundError(f"元素不存在: {self.expr}")
+        self.d._click_element(element)
+
+
+class FakeDevice:
+    """模拟的 uiautomator2 设备"""
+
+    def __init__(self, serial, scenario=None, latency_scale=1.0, click_timeout=3.0):
+        """
+        Args:
+            serial (str): 设备序列号
+            scenario (Scenario): 场景脚本，默认使用内置的小红书发布场景
+            latency_scale (float): RPC延迟倍数（0 表示不休眠）
+            click_timeout (float): click 等待元素出现的时间（与 u2 的隐式等待对应）
+        """
+        self.serial = serial
+        self.scenario = scenario or Scenario()
+        self.latency_scale = latency_scale
+        self.click_timeout = click_timeout
+        self.variables = {}        # 界面XML占位符的值
+        self.screen_on_state = False
+        self.clipboard = ''
+        self.focus = None
+        self.media_store = {}      # 设备路径 -> (媒体ID, MIME类型)
+        self.events = Counter()    # 场景事件计数（如 published）
+        self.calls = Counter()     # RPC调用次数
+        self.rpc_seconds = 0.0     # RPC累计模拟延迟
+        self.unhandled = Counter()  # 没有匹配到切换规则的操作
+        self._lock = threading.RLock()
+        self._pending = None       # (目标界面, 切换时间)
+        self._counts = Counter()   # 当前界面上各规则已触发的次数
+        self._screen = self.scenario.load_screen(self.scenario.initial, self.variables)
+
+    # ---- 内部：延迟、界面切换 ----
+
+    def _rpc(self, name, extra=0.0):
+        """记录一次RPC并按配置休眠"""
+        latency = self.scenario.latency
+        seconds = (latency.get(name, latency.get('default', 0.0)) + extra) * self.latency_scale
+        with self._lock:
+            self.calls[name] += 1
+            self.rpc_seconds += seconds
+        if seconds > 0:
+            time.sleep(seconds)
+
+    @property
+    def screen(self):
+        """当前界面（到达切换时间后切换到目标界面）"""
+        with self._lock:
+            if self._pending and time.perf_counter() >= self._pending[1]:
+                name = self._pending[0]
+                self._pending = None
+                self._enter(name)
+            return self._screen
+
+    def _enter(self, name):
+        self._screen = self.scenario.load_screen(name, self.variables)
+        self._counts = Counter()
+
+    def _fire(self, action, element=None, **args):
+        """按切换规则处理一次操作"""
+        with self._lock:
+            screen = self.screen
+            if self._pending:
+                return  # 正在切换界面，忽略操作
+            for index, rule in enumerate(self.scenario.transitions):
+                if rule['screen'] not in ('*', screen.name) or rule['action'] != action:
+                    continue
+                if not self._rule_matches(rule.get('match', {}), screen, element, args):
+                    continue
+                self._counts[index] += 1
+                if self._counts[index] < rule.get('count', 1):
+                    return
+                if rule.get('event'):
+                    self.events[rule['event']] += 1
+                delay = rule.get('delay', 0) * self.latency_scale
+                if delay > 0:
+                    self._pending = (rule['to'], time.perf_counter() + delay)
+                else:
+                    self._enter(rule['to'])
+                return
+            self.unhandled[f"{screen.name}:{action}"] += 1
+
+    def _rule_matches(self, match, screen, element, args):
+        match = {key: _render(value, self.variables) for key, value in match.items()}
+        if element is None:
+            return all(args.get(key) == value for key, value in match.items())
+
+        if 'xpath' in match:
+            targets = {id(self._element_of(node)) for node in screen.snapshot.xpath(match.pop('xpath'))}
+            if not any(id(e) in targets for e in screen.ancestors(element)):
+                return False
+        return not match or any(UISnapshot._match_selector(e, match) for e in screen.ancestors(element))
+
+    def _element_of(self, node):
+        """UINode -> 界面树中的元素（UINode 与元素共享属性字典）"""
+        for element in self._screen.root.iter('node'):
+            if element.attrib is node.attrib:
+                return element
+        return None
+
+    def _find(self, selector):
+        selector = dict(selector)
+        if selector.pop('focused', False):
+            return self.focus.element if self.focus else None
+        for element in self.screen.root.iter('node'):
+            if UISnapshot._match_selector(element, selector):
+                return element
+        return None
+
+    def _wait_element(self, find, timeout):
+        """与 u2 一致：点击前等待元素出现"""
+        timeout = self.click_timeout if timeout is None else timeout
+        deadline = time.perf_counter() + timeout
+        while True:
+            element = find()
+            if element is not None or time.perf_counter() >= deadline:
+                return element
+            time.sleep(0.05)
+
+    def _click_element(self, element):
+        x, y = UINode(element).center
+        self.click(x, y)
+
+    # ---- uiautomator2 接口 ----
+
+    def __call__(self, **selector):
+        return FakeUiObject(self, selector)
+
+    def xpath(self, expr):
+        return FakeXPathSelector(self, expr)
+
+    @property
+    def info(self):
+        self._rpc('info')
+        screen = self.screen
+        left, top, right, bottom = UINode(screen.root.find('node')).bounds
+        return {
+            'currentPackageName': screen.package,
+            'screenOn': self.screen_on_state,
+            'displayWidth': right - left,
+            'displayHeight': bottom - top
+        }
+
+    def dump_hierarchy(self):
+        self._rpc('dump_hierarchy')
+        return self.screen.xml
+
+    def app_current(self):
+        self._rpc('app_current')
+        screen = self.screen
+        return {'package': screen.package, 'activity': screen.activity}
+
+    def app_start(self, package):
+        self._rpc('app_start')
+        self._fire('app_start', package=package)
+
+    def screen_on(self):
+        self._rpc('screen_on')
+        self.screen_on_state = True
+
+    def screen_off(self):
+        self._rpc('screen_off')
+        with self._lock:
+            self.screen_on_state = False
+            self._pending = None
+            self._enter(self.scenario.screen_off)
+
+    def press(self, key):
+        self._rpc('press')
+        self._fire('press', key=key)
+
+    def swipe(self, fx, fy, tx, ty, duration=None, steps=None):
+        self._rpc('swipe')
+        self._fire('swipe')
+
+    def click(self, x, y):
+        self._rpc('click')
+        screen = self.screen
+        if isinstance(x, float) and x < 1:
+            left, top, right, bottom = UINode(screen.root.find('node')).bounds
+            x, y = int(x * (right - left)), int(y * (bottom - top))
+        element = screen.hit_test(x, y)
+        if element is None:
+            return
+        if element.get('class') == 'android.widget.EditText':
+            with self._lock:
+                if self.focus is None or self.focus.element.attrib != element.attrib:
+                    self.focus = _Focus(element)
+        self._fire('click', element)
+
+    def set_clipboard(self, text, label=None):
+        self._rpc('set_clipboard')
+        self.clipboard = text
+
+    def send_keys(self, text, clear=False):
+        self._rpc('send_keys', extra=len(text) * self.scenario.latency.get('send_keys_per_char', 0.0))
+        if self.focus is not None:
+            self.focus.text = text if clear else self.focus.text + text
+
+    def shell(self, cmdargs, timeout=60):
+        self._rpc('shell')
+        command = cmdargs if isinstance(cmdargs, str) else ' '.join(cmdargs)
+        if command.strip() == 'input keyevent 279' and self.focus is not None:
+            self.focus.text += self.clipboard
+        if command.startswith('content query'):
+            return self._content_query(command)
+        if command.startswith('am start'):
+            match = re.search(r'-a (\S+)', command)
+            self._fire('intent', intent=match.group(1) if match else '')
+            return 'Starting: Intent'
+        if command.startswith('dumpsys power'):
+            # 亮屏和锁屏状态（锁屏界面所在的包视为已锁定）
+            locked = self.screen.package == KEYGUARD_PACKAGE
+            return (f"  mWakefulness={'Awake' if self.screen_on_state else 'Asleep'}\n"
+                    f"    mShowingLockscreen={str(locked).lower()} mShowingDream=false\n")
+        return ''
+
+    def add_media(self, path, mime_type='image/jpeg'):
+        """登记已推送到设备的媒体文件（模拟媒体扫描入库）"""
+        with self._lock:
+            self.media_store.setdefault(path, (len(self.media_store) + 1000, mime_type))
+
+    def _content_query(self, command):
+        """模拟 content query（只支持 _data LIKE '前缀%' 条件）"""
+        match = re.search(r"_data LIKE '([^']*)%'", command)
+        prefix = match.group(1) if match else ''
+        with self._lock:
+            rows = [(path, media_id, mime_type) for path, (media_id, mime_type) in self.media_store.items()
+                    if path.startswith(prefix)]
+        if not rows:
+            return 'No result found.\n'
+        return ''.join(f"Row: {i} _id={media_id}, _data={path}, mime_type={mime_type}\n"
+                       for i, (path, media_id, mime_type) in enumerate(rows))
+
+    def get_stats(self):
+        """RPC调用和场景事件统计"""
+        with self._lock:
+            return {
+                'calls': dict(self.calls),
+                'rpc_seconds': round(self.rpc_seconds, 3),
+                'events': dict(self.events),
+                'unhandled': dict(self.unhandled)
+            }
+
+
+class FakeDeviceFarm:
+    """按序列号提供模拟设备（同一序列号始终返回同一台设备，保留界面状态）"""
+
+    def __init__(self, scenario=None, latency_scale=1.0):
+        self.scenario = scenario or Scenario()
+        self.latency_scale = latency_scale
+        self.devices = {}
+        self._lock = threading.Lock()
+
+    def connect(self, serial):
+        """与 u2.connect 相同的调用方式，可作为 DeviceSessionPool 的 connect 参数"""
+        with self._lock:
+            device = self.devices.get(serial)
+            if device is None:
+                device = FakeDevice(serial, self.scenario, self.latency_scale)
+                self.devices[serial] = device
+            return device
+
+
+def record(serial, name, out_dir):
+    """从真机录制当前界面树"""
+    import uiautomator2 as u2
+
+    d = u2.connect(serial)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{name}.xml")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(d.dump_hierarchy())
+    current = d.app_current()
+    print(f"已保存: {path} ({current.get('package')}/{current.get('activity')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='模拟设备工具')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    record_parser = subparsers.add_parser('record', help='从真机录制当前界面树')
+    record_parser.add_argument('serial', help='设备序列号')
+    record_parser.add_argument('name', help='界面名称')
+    record_parser.add_argument('--out', default=SCENARIO_DIR, help='场景目录')
+
+    args = parser.parse_args()
+    if args.action == 'record':
+        record(args.serial, args.name, args.out)
+
+
+if __name__ == "__main__":
+    main()
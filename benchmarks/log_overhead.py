@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+日志开销基准测试功能：
+1. 按当前代码的热点日志调用点和调用次数（主循环逐行检查、Excel轮询、添加任务、到期扫描、提交设备任务）构造一轮工作量
+2. 每个调用点分别用三种写法输出相同字段：立即格式化的 f-string、% 占位符延迟格式化、EventLogger 结构化事件
+3. 日志级别设为 DEBUG 不输出（控制台 WARNING、文件 INFO，即调试日志被过滤时的生产配置），测量被过滤的日志调用本身的开销
+4. 同时测量不输出日志的空循环作为基准，报告每次调用的额外开销（纳秒）
+
+用法：
+    python -m benchmarks.log_overhead
+    python -m benchmarks.log_overhead --rows 10000 --rounds 20 --output log_overhead.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 日志目录和级别需在导入日志模块之前设置（DEBUG 日志被过滤）
+import config.settings as settings
+
+WORK_DIR = tempfile.mkdtemp(prefix='log_overhead_')
+settings.LOG_DIR = os.path.join(WORK_DIR, 'logs')
+settings.LOG_CONFIG['CONSOLE_LEVEL'] = 'WARNING'
+settings.LOG_CONFIG['FILE_LEVEL'] = 'INFO'
+
+from config.settings import DEVICE_MAPPING
+from core.task_record import TaskRecord
+from utils.logger import get_logger, get_event_logger, log_pipeline, shutdown_logging
+
+logger = get_logger('benchmarks.log_overhead')
+events = get_event_logger('benchmarks.log_overhead')
+
+STYLES = ('none', 'eager', 'percent', 'event')
+
+
+def _records(count):
+    names = list(DEVICE_MAPPING)
+    start = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    return [TaskRecord(names[i % len(names)], (start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S'))
+            for i in range(count)]
+
+
+# 主循环：excel.rows 每次轮询一次，task.process 每行一次，task.scan 每次遍历一次
+def monitor_rows(style, records):
+    total = valid = len(records)
+    if style == 'eager':
+        logger.debug(f"Excel数据行数: {total}, 有效行数: {valid}")
+        for task in records:
+            logger.debug(f"处理任务: {task.post_name} - {task.time_str}")
+        logger.debug(f"本次遍历行数: {len(records)}")
+    elif style == 'percent':
+        logger.debug("Excel数据行数: %s, 有效行数: %s", total, valid)
+        for task in records:
+            logger.debug("处理任务: %s - %s", task.post_name, task.time_str)
+        logger.debug("本次遍历行数: %s", len(records))
+    elif style == 'event':
+        events.debug("excel.rows", total=total, valid=valid)
+        for task in records:
+            events.debug("task.process", post_name=task.post_name, time=task.time_str)
+        events.debug("task.scan", rows=len(records))
+    else:
+        for task in records:
+            pass
+    return len(records) + 2
+
+
+# 添加任务：task.time_check 和 task.queue 每个新任务各一次
+def scheduler_add(style, records):
+    now = time.time()
+    queue_length = 0
+    if style == 'eager':
+        for task in records:
+            logger.debug(f"任务时间检查 - 任务: {task.post_name}, 时间: {task.time_str}, 相差: {round(task.due - now)}秒")
+            queue_length += 1
+            logger.debug(f"当前任务队列长度: {queue_length}")
+    elif style == 'percent':
+        for task in records:
+            logger.debug("任务时间检查 - 任务: %s, 时间: %s, 相差: %s秒", task.post_name, task.time_str, round(task.due - now))
+            queue_length += 1
+            logger.debug("当前任务队列长度: %s", queue_length)
+    elif style == 'event':
+        for task in records:
+            events.debug("task.time_check", post_name=task.post_name, task_time=task.time_str,
+                         seconds_until=round(task.due - now))
+            queue_length += 1
+            events.debug("task.queue", queue_length=queue_length)
+    else:
+        for task in records:
+            queue_length += 1
+    return len(records) * 2
+
+
+# 到期扫描：task.pending_check 每次扫描一次，executor.submit 每个到期任务一次
+def scheduler_dispatch(style, records):
+    current_time = time.time()
+    pending, due = len(records), records[:len(records) // 100]
+    next_due = records[0].due
+    if style == 'eager':
+        logger.debug(f"待执行任务: {pending}, 到期: {len(due)}, 下一个任务: {round(next_due - current_time)}秒后")
+        for depth, task in enumerate(due, 1):
+            logger.debug(f"提交设备任务: {task.device_id} - {task.task_id}, 队列深度: {depth}")
+    elif style == 'percent':
+        logger.debug("待执行任务: %s, 到期: %s, 下一个任务: %s秒后", pending, len(due), round(next_due - current_time))
+        for depth, task in enumerate(due, 1):
+            logger.debug("提交设备任务: %s - %s, 队列深度: %s", task.device_id, task.task_id, depth)
+    elif style == 'event':
+        events.debug("task.pending_check", pending=pending, due=len(due),
+                     next_due_seconds=round(next_due - current_time))
+        for depth, task in enumerate(due, 1):
+            events.debug("executor.submit", device_id=task.device_id, task=task.task_id, queue_depth=depth)
+    else:
+        for depth, task in enumerate(due, 1):
+            pass
+    return len(due) + 1
+
+
+def _measure(func, style, records, rounds):
+    """返回 (每轮耗时秒, 每轮日志调用次数)"""
+    func(style, records)  # 预热
+    start = time.perf_counter()
+    for _ in range(rounds):
+        calls = func(style, records)
+    return (time.perf_counter() - start) / rounds, calls
+
+
+def run_benchmark(row_count=10000, rounds=20):
+    records = _records(row_count)
+    queued_before = log_pipeline.get_stats()['queued']
+    report = {
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'rows': row_count,
+        'rounds': rounds,
+        'levels': {'console': settings.LOG_CONFIG['CONSOLE_LEVEL'], 'file': settings.LOG_CONFIG['FILE_LEVEL']},
+        'unit': 'ms 为每轮耗时，overhead_ns_per_call 为相对不输出日志的每次调用额外开销'
+    }
+    for func in (monitor_rows, scheduler_add, scheduler_dispatch):
+        seconds = {}
+        calls = 0
+        for style in STYLES:
+            seconds[style], style_calls = _measure(func, style, records, rounds)
+            if style != 'none':
+                calls = style_calls
+        base = seconds['none']
+        report[func.__name__] = {
+            'log_calls': calls,
+            'ms': {style: round(seconds[style] * 1000, 3) for style in STYLES},
+            'overhead_ns_per_call': {
+                style: round((seconds[style] - base) / calls * 1e9, 1) for style in STYLES if style != 'none'
+            },
+            'event_vs_eager_saved_percent': round(
+                100 * (1 - (seconds['event'] - base) / (seconds['eager'] - base)), 1
+            ) if seconds['eager'] > base else None
+        }
+    # 日志全部被过滤时不会进入队列
+    report['records_queued'] = log_pipeline.get_stats()['queued'] - queued_before
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量热点调用点上被过滤的调试日志的CPU开销')
+    parser.add_argument('--rows', type=int, default=10000, help='Excel行数 / 队列长度')
+    parser.add_argument('--rounds', type=int, default=20, help='每种写法的重复次数')
+    parser.add_argument('--output', help='报告输出路径（默认打印到标准输出）')
+    args = parser.parse_args()
+
+    try:
+        report = run_benchmark(args.rows, args.rounds)
+    finally:
+        shutdown_logging()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+回放基准测试功能：
+1. 按一天的发布计划（Excel/CSV 或随机生成）构造任务和临时资源目录
+2. 通过 TaskScheduler.run_android_automation 执行，设备使用模拟设备（无需连接真机）
+3. 各设备并行、同一设备按计划时间顺序执行（与正式运行一致，经由设备执行器）
+4. 输出端到端耗时、各步骤耗时（p50/p95/max）和模拟设备的RPC统计
+
+用法：
+    python -m benchmarks.replay --tasks 30
+    python -m benchmarks.replay --schedule content.xlsx --latency-scale 0.5 --output replay.json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.fake_device import FakeDeviceFarm, Scenario, SCENARIO_DIR
+from config.settings import DEVICE_MAPPING, DEVICE_PATHS, DIRECTORY_STRUCTURE, AUTOMATION_CONFIG, STEP_TIMING_CONFIG
+from core.device_executor import DeviceExecutor
+from core.session_pool import DeviceSessionPool
+from core.step_timing import StepStats
+from core.task_scheduler import TaskScheduler
+from core.task_store import TaskStore
+from core.task_record import TaskRecord
+
+ALL_DEVICES = '*'  # 汇总所有设备的统计键
+
+
+def load_schedule(path):
+    """从 Excel/CSV 读取发布计划（time, postName 两列）"""
+    import pandas as pd
+
+    if path.lower().endswith('.csv'):
+        df = pd.read_csv(path)
+    else:
+        df = pd.read_excel(path)
+    return [{'postName': str(row['postName']), 'time': str(row['time'])}
+            for _, row in df.iterrows() if str(row['postName']) in DEVICE_MAPPING]
+
+
+def generate_schedule(count, day=None, seed=0):
+    """生成一天内均匀分布在各设备上的发布计划"""
+    rng = random.Random(seed)
+    day = day or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    names = list(DEVICE_MAPPING)
+    minutes = sorted(rng.sample(range(8 * 60, 23 * 60), count))
+    return [{
+        'postName': names[i % len(names)],
+        'time': (day + timedelta(minutes=minute)).strftime('%Y-%m-%d %H:%M:%S')
+    } for i, minute in enumerate(minutes)]
+
+
+def prepare_resources(root_dir, schedule, images=3, body_chars=300):
+    """为每个任务生成图片和内容文件"""
+    img_dir_name = DIRECTORY_STRUCTURE['TASK_DIR']['IMG_DIR']
+    content_name = DIRECTORY_STRUCTURE['TASK_DIR']['CONTENT_FILE']
+    for entry in schedule:
+        folder = datetime.strptime(entry['time'], '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d_%H-%M')
+        base_dir = os.path.join(root_dir, entry['postName'], folder)
+        img_dir = os.path.join(base_dir, img_dir_name)
+        os.makedirs(img_dir, exist_ok=True)
+        for i in range(images):
+            with open(os.path.join(img_dir, f"{i + 1}.jpg"), 'wb') as f:
+                f.write(b'\xff\xd8\xff\xe0' + os.urandom(64))
+        with open(os.path.join(base_dir, content_name), 'w', encoding='utf-8') as f:
+            f.write(f"标题：回放测试 {folder[-5:]}\n正文：" + '回放测试正文。' * (body_chars // 7) + "\n")
+
+
+def _percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    return {
+        'count': len(values),
+        'p50': round(StepStats._percentile(values, 50), 3),
+        'p95': round(StepStats._percentile(values, 95), 3),
+        'max': round(values[-1], 3)
+    }
+
+
+def run_replay(schedule, scenario_dir=SCENARIO_DIR, latency_scale=1.0, handoff=False):
+    """
+    回放发布计划
+
+    Args:
+        handoff (bool): 是否使用媒体分享Intent跳过相册导航
+
+    Returns:
+        dict: 回放报告
+    """
+    AUTOMATION_CONFIG['MEDIA_HANDOFF'] = handoff
+    work_dir = tempfile.mkdtemp(prefix='replay_')
+    farm = FakeDeviceFarm(Scenario(scenario_dir), latency_scale)
+    pool = DeviceSessionPool(connect=farm.connect)
+    executor = DeviceExecutor()
+    executor.max_queue_depth = max(executor.max_queue_depth, len(schedule))
+    scheduler = TaskScheduler(
+        executor=executor,
+        store=TaskStore(os.path.join(work_dir, 'task_journal.jsonl')),
+        session_pool=pool,
+        root_dir=os.path.join(work_dir, 'uploads')
+    )
+    stats = StepStats()
+    results = []
+
+    def run_task(entry, submitted):
+        device_id = DEVICE_MAPPING[entry['postName']]
+        folder = datetime.strptime(entry['time'], '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d_%H-%M')
+        device = farm.connect(device_id)
+        device.variables['folder'] = folder  # 相册里显示当前任务的时间文件夹
+        img_dir = os.path.join(scheduler.root_dir, entry['postName'], folder, DIRECTORY_STRUCTURE['TASK_DIR']['IMG_DIR'])
+        for file_name in os.listdir(img_dir):  # 模拟传输后的媒体扫描入库
+            device.add_media(f"{DEVICE_PATHS[device_id].rstrip('/')}/{folder}/{file_name}")
+        start = time.perf_counter()
+        success, result = scheduler.run_android_automation(TaskRecord(entry['postName'], entry['time']))
+        finished = time.perf_counter()
+        stats.record(ALL_DEVICES, 'end_to_end', finished - start)
+        stats.record(device_id, 'end_to_end', finished - start)
+        for step in (result or {}).get('steps', []):
+            stats.record(ALL_DEVICES, step['name'], step['seconds'])
+            stats.record(device_id, step['name'], step['seconds'])
+        results.append({
+            'postName': entry['postName'],
+            'time': entry['time'],
+            'success': success,
+            'status': (result or {}).get('status'),
+            'queue_seconds': round(start - submitted, 3),
+            'run_seconds': round(finished - start, 3)
+        })
+
+    # 发布流程结束时会写入全局步骤统计，回放期间写到临时目录，不覆盖正式运行的统计文件
+    dump_path = STEP_TIMING_CONFIG['DUMP_PATH']
+    STEP_TIMING_CONFIG['DUMP_PATH'] = os.path.join(work_dir, 'step_timings.json')
+    try:
+        prepare_resources(scheduler.root_dir, schedule)
+        started = time.perf_counter()
+        futures = []
+        for entry in sorted(schedule, key=lambda e: e['time']):
+            device_id = DEVICE_MAPPING[entry['postName']]
+            futures.append(executor.submit(device_id, run_task, entry, time.perf_counter(),
+                                           name=f"{entry['postName']}_{entry['time']}"))
+        for future in futures:
+            if future is not None:
+                future.result()
+        wall_seconds = time.perf_counter() - started
+    finally:
+        scheduler.shutdown()
+        STEP_TIMING_CONFIG['DUMP_PATH'] = dump_path
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    summary = stats.summary()
+    return {
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'tasks': len(schedule),
+        'succeeded': sum(1 for r in results if r['success']),
+        'latency_scale': latency_scale,
+        'media_handoff': handoff,
+        'wall_seconds': round(wall_seconds, 3),
+        'end_to_end': summary.get(ALL_DEVICES, {}).get('end_to_end', {}),
+        'queue_wait': _percentiles([r['queue_seconds'] for r in results]),
+        'steps': {name: value for name, value in summary.get(ALL_DEVICES, {}).items() if name != 'end_to_end'},
+        'devices': {device_id: {'steps': summary.get(device_id, {}), 'fake_device': device.get_stats()}
+                    for device_id, device in farm.devices.items()},
+        'results': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='使用模拟设备回放发布计划')
+    parser.add_argument('--schedule', help='发布计划文件（Excel/CSV，含 time 和 postName 列）')
+    parser.add_argument('--tasks', type=int, default=20, help='未指定计划文件时随机生成的任务数')
+    parser.add_argument('--scenario', default=SCENARIO_DIR, help='模拟设备场景目录')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='RPC和界面切换延迟倍数')
+    parser.add_argument('--handoff', action='store_true', help='使用媒体分享Intent跳过相册导航')
+    parser.add_argument('--output', help='报告输出路径（默认打印到标准输出）')
+    args = parser.parse_args()
+
+    schedule = load_schedule(args.schedule) if args.schedule else generate_schedule(args.tasks)
+    report = run_replay(schedule, args.scenario, args.latency_scale, args.handoff)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"回放完成: {report['succeeded']}/{report['tasks']} 成功, 总耗时 {report['wall_seconds']}秒 -> {args.output}")
+    else:
+        print(text)
+    return 0 if report['succeeded'] == report['tasks'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
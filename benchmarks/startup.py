@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+启动耗时基准测试功能：
+1. 在新进程中用 python -X importtime 导入 main（不启动服务），多次运行取中位数
+2. 输出导入总耗时、进程总耗时和累计耗时最高的模块
+3. 检查启动时是否导入了应延迟加载的重量级依赖（pandas、watchdog、uiautomator2、win32file 等）
+4. 超过耗时预算或导入了禁止的模块时返回非0，可用于CI
+
+用法：
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget-ms 300 --repeat 10 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FORBID = 'pandas,numpy,openpyxl,watchdog,uiautomator2,adbutils,win32file'
+MARKER = '-- startup --'
+
+# 子进程中执行的代码：日志写入临时目录，标记之后的导入才计入启动耗时
+CHILD_CODE = (
+    "import sys\n"
+    "import config.settings as settings\n"
+    "settings.LOG_DIR = {log_dir!r}\n"
+    "settings.LOG_CONFIG['CONSOLE_LEVEL'] = 'WARNING'\n"
+    "sys.stderr.write({marker!r} + '\\n')\n"
+    "sys.stderr.flush()\n"
+    "import {module}\n"
+    "from utils.logger import shutdown_logging\n"
+    "shutdown_logging()\n"
+)
+
+
+def parse_importtime(text):
+    """
+    解析 -X importtime 输出
+
+    Returns:
+        list: (模块名, 嵌套层级, 自身耗时us, 累计耗时us)，只包含标记之后的导入
+    """
+    entries = []
+    started = False
+    for line in text.splitlines():
+        if line.strip() == MARKER:
+            started = True
+            continue
+        if not started or not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        level = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), level, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def run_once(module, log_dir):
+    code = CHILD_CODE.format(log_dir=log_dir, marker=MARKER, module=module)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT_DIR, capture_output=True, text=True, encoding='utf-8', errors='replace')
+    process_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+    # 首层导入的累计耗时之和（config.settings 在标记之前已导入，不计入）
+    entries = parse_importtime(result.stderr)
+    min_level = min((level for _, level, _, _ in entries), default=0)
+    import_ms = sum(cumulative for _, level, _, cumulative in entries if level == min_level) / 1000
+    return entries, import_ms, process_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量服务启动（导入 main）的耗时')
+    parser.add_argument('--module', default='main', help='要导入的模块')
+    parser.add_argument('--repeat', type=int, default=5, help='运行次数（第一次为冷启动）')
+    parser.add_argument('--budget-ms', type=float, default=500, help='导入耗时中位数预算（毫秒）')
+    parser.add_argument('--forbid', default=DEFAULT_FORBID, help='启动时不允许导入的顶层包（逗号分隔）')
+    parser.add_argument('--top', type=int, default=15, help='输出累计耗时最高的模块数')
+    parser.add_argument('--output', help='报告输出路径（默认打印到标准输出）')
+    args = parser.parse_args()
+
+    forbid = {name.strip() for name in args.forbid.split(',') if name.strip()}
+    log_dir = tempfile.mkdtemp(prefix='startup_')
+    import_samples = []
+    process_samples = []
+    try:
+        for _ in range(args.repeat):
+            entries, import_ms, process_ms = run_once(args.module, log_dir)
+            import_samples.append(import_ms)
+            process_samples.append(process_ms)
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    # 模块列表取最后一次运行（文件缓存已热，数值更稳定）
+    loaded = sorted({name.split('.')[0] for name, _, _, _ in entries} & forbid)
+    slowest = sorted(entries, key=lambda e: e[3], reverse=True)[:args.top]
+    import_median = statistics.median(import_samples)
+
+    report = {
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'module': args.module,
+        'runs': args.repeat,
+        'import_ms': {
+            'first': round(import_samples[0], 1),
+            'min': round(min(import_samples), 1),
+            'median': round(import_median, 1)
+        },
+        'process_ms': {
+            'first': round(process_samples[0], 1),
+            'median': round(statistics.median(process_samples), 1)
+        },
+        'modules_imported': len(entries),
+        'slowest': [{'module': name, 'self_ms': round(self_us / 1000, 2), 'cumulative_ms': round(cumulative_us / 1000, 2)}
+                    for name, _, self_us, cumulative_us in slowest],
+        'budget_ms': args.budget_ms,
+        'forbidden_imported': loaded
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+    failed = False
+    if import_median > args.budget_ms:
+        print(f"启动耗时超出预算: {import_median:.1f}ms > {args.budget_ms}ms", file=sys.stderr)
+        failed = True
+    if loaded:
+        print(f"启动时导入了应延迟加载的模块: {', '.join(loaded)}", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+任务队列内存基准测试功能：
+1. 按旧格式（{'id', 'time', 'data': pandas Series}）和 TaskRecord 分别构造 N 个排队任务
+2. 用 tracemalloc 测量每个任务占用的内存（单元格字符串由 DataFrame 持有，两种格式都不计入）
+3. 测量构造耗时和一次到期扫描（每个任务比较计划时间并读取设备名）的耗时
+4. 未安装 pandas 时只测量 TaskRecord
+
+用法：
+    python -m benchmarks.task_memory
+    python -m benchmarks.task_memory --tasks 10000 --output task_memory.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+# 日志目录和控制台级别需在导入其他模块之前设置
+import config.settings as settings
+
+WORK_DIR = tempfile.mkdtemp(prefix='task_memory_')
+settings.LOG_DIR = os.path.join(WORK_DIR, 'logs')
+settings.LOG_CONFIG['CONSOLE_LEVEL'] = 'WARNING'
+
+from config.settings import DEVICE_MAPPING, TASK_VALIDATION
+from core.task_record import TaskRecord
+from utils.logger import shutdown_logging
+
+
+def generate_columns(count):
+    """生成发布计划的各列（与Excel读取结果相同的列）"""
+    names = list(DEVICE_MAPPING)
+    start = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    return {
+        'time': [(start + timedelta(minutes=i)).strftime(TASK_VALIDATION['TIME_FORMAT']) for i in range(count)],
+        'postName': [names[i % len(names)] for i in range(count)],
+        'status': [''] * count,
+        'title': [f"第{i}条笔记标题" for i in range(count)],
+        'remark': ['备注' * (i % 20) for i in range(count)],
+        'owner': [f"运营{i % 13}" for i in range(count)]
+    }
+
+
+def _traced(build):
+    """执行 build，返回 (结果, 新增内存字节数, 耗时秒)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before, seconds
+
+
+def _scan_seconds(scan, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        scan()
+    return (time.perf_counter() - start) / rounds
+
+
+def measure_series(columns, rounds):
+    """旧格式：队列中保存 iterrows 得到的 Series"""
+    try:
+        import pandas as pd
+    except ImportError as e:
+        return {'skipped': str(e)}
+
+    df = pd.DataFrame(columns)
+
+    def build():
+        return [{'id': f"{row['postName']}_{row['time']}",
+                 'time': datetime.strptime(str(row['time']), TASK_VALIDATION['TIME_FORMAT']),
+                 'data': row} for _, row in df.iterrows()]
+
+    tasks, size, seconds = _traced(build)
+    now = datetime.now()
+    scan = _scan_seconds(lambda: [task['data']['postName'] for task in tasks if task['time'] > now], rounds)
+    return {'bytes_per_task': round(size / len(tasks), 1), 'build_us_per_task': round(seconds / len(tasks) * 1e6, 2),
+            'scan_ms': round(scan * 1000, 3)}
+
+
+def measure_records(columns, rounds):
+    """TaskRecord：创建时解析时间并计算派生字段"""
+    def build():
+        return [TaskRecord.from_row(index, post_name, task_time, status)
+                for index, (post_name, task_time, status)
+                in enumerate(zip(columns['postName'], columns['time'], columns['status']))]
+
+    tasks, size, seconds = _traced(build)
+    now = time.time()
+    scan = _scan_seconds(lambda: [task.post_name for task in tasks if task.due > now], rounds)
+    return {'bytes_per_task': round(size / len(tasks), 1), 'build_us_per_task': round(seconds / len(tasks) * 1e6, 2),
+            'scan_ms': round(scan * 1000, 3), 'instance_bytes': sys.getsizeof(tasks[0])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量每个排队任务的内存占用和扫描耗时')
+    parser.add_argument('--tasks', type=int, default=10000, help='任务数')
+    parser.add_argument('--rounds', type=int, default=20, help='扫描重复次数')
+    parser.add_argument('--output', help='报告输出路径（默认打印到标准输出）')
+    args = parser.parse_args()
+
+    columns = generate_columns(args.tasks)
+    try:
+        report = {
+            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'tasks': args.tasks,
+            'series': measure_series(columns, args.rounds),
+            'record': measure_records(columns, args.rounds)
+        }
+    finally:
+        shutdown_logging()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    series, record = report['series'], report['record']
+    if 'bytes_per_task' in series:
+        report['memory_ratio'] = round(series['bytes_per_task'] / record['bytes_per_task'], 1)
+        report['scan_speedup'] = round(series['scan_ms'] / record['scan_ms'], 1) if record['scan_ms'] else None
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
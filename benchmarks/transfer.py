@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+传输吞吐基准测试功能：
+1. 使用模拟 adb（benchmarks/bin/adb，设备存储映射到临时目录），无需连接手机
+2. 按不同的媒体数量和文件大小调用 FileHandler.transfer_images（可选 transfer_images_async）
+3. 输出每组的耗时、文件/秒、MB/秒和每个文件的ADB调用次数，并校验设备端文件完整
+
+用法：
+    python -m benchmarks.transfer
+    python -m benchmarks.transfer --counts 1,9,30 --sizes-kb 200,2048 --latency 0.05 --bandwidth 10 --async
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_ADB = os.path.join(BENCH_DIR, 'bin', 'adb.cmd' if os.name == 'nt' else 'adb')
+WORK_DIR = tempfile.mkdtemp(prefix='transfer_')
+
+# ADB命令路径、日志目录需在导入配置之前设置
+os.environ.setdefault('ADB_COMMAND', FAKE_ADB)
+os.environ.setdefault('FAKE_ADB_ROOT', os.path.join(WORK_DIR, 'devices'))
+os.environ.setdefault('PYTHON', sys.executable)
+
+import config.settings as settings
+
+settings.LOG_DIR = os.path.join(WORK_DIR, 'logs')
+settings.LOG_CONFIG['CONSOLE_LEVEL'] = 'WARNING'
+
+from config.settings import ADB_COMMAND, DEVICE_MAPPING, DEVICE_PATHS, DIRECTORY_STRUCTURE
+from core.file_handler import FileHandler
+from utils.adb_utils import ADB_COMMAND_SECONDS
+from utils.logger import shutdown_logging
+
+
+def _adb_calls():
+    """各ADB子命令的累计调用次数"""
+    return {values[0]: sum(child.counts) for values, child in ADB_COMMAND_SECONDS.collect()}
+
+
+def prepare_case(root_dir, post_name, task_time, count, size):
+    """生成一个任务的媒体文件"""
+    folder = task_time.strftime('%Y-%m-%d_%H-%M')
+    img_dir = os.path.join(root_dir, post_name, folder, DIRECTORY_STRUCTURE['TASK_DIR']['IMG_DIR'])
+    os.makedirs(img_dir, exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(img_dir, f"{i + 1:03d}.jpg"), 'wb') as f:
+            f.write(b'\xff\xd8\xff\xe0' + os.urandom(size - 4))
+    return folder
+
+
+def verify_case(device_id, folder, count, size):
+    """检查模拟设备上的文件数量和大小"""
+    remote_dir = os.path.join(os.environ['FAKE_ADB_ROOT'], device_id,
+                              DEVICE_PATHS[device_id].strip('/').replace('/', os.sep), folder)
+    if not os.path.isdir(remote_dir):
+        return False
+    names = os.listdir(remote_dir)
+    return len(names) == count and all(os.path.getsize(os.path.join(remote_dir, n)) == size for n in names)
+
+
+def run_case(handler, post_name, task_time, count, size, use_async):
+    device_id = DEVICE_MAPPING[post_name]
+    folder = prepare_case(handler.root_dir, post_name, task_time, count, size)
+    time_str = task_time.strftime('%Y-%m-%d %H:%M:%S')
+
+    calls_before = _adb_calls()
+    start = time.perf_counter()
+    if use_async:
+        from utils.async_adb import AsyncADBHelper
+
+        async def transfer():
+            return await handler.transfer_images_async(AsyncADBHelper(), post_name, time_str)
+        success, status = asyncio.run(transfer())
+    else:
+        success, status = handler.transfer_images(post_name, time_str)
+    seconds = time.perf_counter() - start
+    calls_after = _adb_calls()
+
+    calls = {name: calls_after.get(name, 0) - calls_before.get(name, 0) for name in calls_after}
+    total_bytes = count * size
+    return {
+        'mode': 'async' if use_async else 'sync',
+        'files': count,
+        'file_kb': size // 1024,
+        'success': success,
+        'status': status,
+        'verified': verify_case(device_id, folder, count, size),
+        'seconds': round(seconds, 3),
+        'files_per_second': round(count / seconds, 2),
+        'mb_per_second': round(total_bytes / seconds / 1024 / 1024, 2),
+        'adb_calls': {name: n for name, n in calls.items() if n},
+        'adb_calls_per_file': round(sum(calls.values()) / count, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='使用模拟adb测量文件传输吞吐')
+    parser.add_argument('--counts', default='1,9,30', help='每个任务的媒体数量列表（逗号分隔）')
+    parser.add_argument('--sizes-kb', default='200,2048', help='单个文件大小列表（KB，逗号分隔）')
+    parser.add_argument('--latency', type=float, default=0.02, help='模拟adb每次调用的固定延迟（秒）')
+    parser.add_argument('--bandwidth', type=float, default=20, help='模拟adb推送带宽（MB/s，0 表示不限）')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='同时测量异步传输')
+    parser.add_argument('--output', help='报告输出路径（默认打印到标准输出）')
+    args = parser.parse_args()
+
+    os.environ['FAKE_ADB_LATENCY'] = str(args.latency)
+    os.environ['FAKE_ADB_BANDWIDTH'] = str(args.bandwidth)
+
+    counts = [int(c) for c in args.counts.split(',') if c.strip()]
+    sizes = [int(s) * 1024 for s in args.sizes_kb.split(',') if s.strip()]
+    modes = [False, True] if args.use_async else [False]
+
+    results = []
+    try:
+        handler = FileHandler(os.path.join(WORK_DIR, 'uploads'))
+        post_name = next(iter(DEVICE_MAPPING))
+        task_time = (datetime.now() + timedelta(days=1)).replace(second=0, microsecond=0)
+        for use_async in modes:
+            for count in counts:
+                for size in sizes:
+                    task_time += timedelta(minutes=1)  # 每组使用新的任务目录
+                    result = run_case(handler, post_name, task_time, count, size, use_async)
+                    print(f"{result['mode']} {count}个 x {size // 1024}KB: {result['seconds']}秒, "
+                          f"{result['files_per_second']} 文件/秒, {result['mb_per_second']} MB/秒", file=sys.stderr)
+                    results.append(result)
+    finally:
+        shutdown_logging()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    report = {
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'adb_command': ADB_COMMAND,
+        'latency': args.latency,
+        'bandwidth_mb': args.bandwidth,
+        'cases': results
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    return 0 if all(r['success'] and r['verified'] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,17 @@
 
 import json
 import os
+import re
+import threading
+import time
 from utils.logger import get_logger
+from config.settings import LOG_CONFIG
+
+# 旧版规则文件使用的级别键 -> 日志记录的级别名（小写）
+LEVEL_ALIASES = {
+    "warnings": "warning",
+    "errors": "error"
+}
 
 class IgnoreConfig:
     _instance = None
@@ -17,21 +27,39 @@ class IgnoreConfig:
     def __init__(self):
         if self.initialized:
             return
-            
-        self.config_file = "config/ignore_rules.json"
+        
+        self.config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ignore_rules.json")
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._next_check = 0
+        self._matchers = {}   # (级别, 模块) -> 编译后的正则（模块规则 + 全局规则），None 表示无规则
         self.ignore_rules = self._load_rules()
         self.logger = get_logger(__name__)
         self.initialized = True
     
+    @staticmethod
+    def _normalize(rules):
+        """统一级别键（warnings/errors -> warning/error），合并同一级别的规则"""
+        normalized = {}
+        for level, modules in rules.items():
+            level = LEVEL_ALIASES.get(level.lower(), level.lower())
+            target = normalized.setdefault(level, {})
+            for module, patterns in (modules or {}).items():
+                merged = target.setdefault(module, [])
+                merged.extend(p for p in patterns if p not in merged)
+        return normalized
+    
     def _load_rules(self):
         """加载忽略规则"""
         try:
             if os.path.exists(self.config_file):
+                self._mtime = os.stat(self.config_file).st_mtime_ns
                 with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    return self._normalize(json.load(f))
+            self._mtime = None
             return {
-                "warnings": {},    # 警告级别忽略规则
-                "errors": {},      # 错误级别忽略规则
+                "warning": {},     # 警告级别忽略规则
+                "error": {},       # 错误级别忽略规则
                 "info": {}         # 信息级别忽略规则
             }
         except Exception as e:
@@ -39,48 +67,69 @@ class IgnoreConfig:
             print(f"加载忽略规则失败: {str(e)}")
             return {}
     
+    def reload_if_changed(self):
+        """规则文件变化时重新加载（按 IGNORE_RELOAD_INTERVAL 节流检查修改时间）"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + LOG_CONFIG['IGNORE_RELOAD_INTERVAL']
+        
+        try:
+            mtime = os.stat(self.config_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+        
+        with self._lock:
+            self.ignore_rules = self._load_rules()
+            self._matchers = {}
+        return True
+    
     def save_rules(self):
         """保存忽略规则"""
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(self.ignore_rules, f, indent=2, ensure_ascii=False)
+            self._mtime = os.stat(self.config_file).st_mtime_ns
         except Exception as e:
             self.logger.error(f"保存忽略规则失败: {str(e)}")
     
     def add_ignore_rule(self, level, message_pattern, module=None):
         """添加忽略规则"""
-        if level not in self.ignore_rules:
-            self.ignore_rules[level] = {}
-        
-        if module:
-            if module not in self.ignore_rules[level]:
-                self.ignore_rules[level][module] = []
-            self.ignore_rules[level][module].append(message_pattern)
-        else:
-            if "global" not in self.ignore_rules[level]:
-                self.ignore_rules[level]["global"] = []
-            self.ignore_rules[level]["global"].append(message_pattern)
+        level = LEVEL_ALIASES.get(level.lower(), level.lower())
+        with self._lock:
+            rules = self.ignore_rules.setdefault(level, {})
+            rules.setdefault(module or "global", []).append(message_pattern)
+            self._matchers = {}
         
         self.save_rules()
     
-    def should_ignore(self, level, message, module=None):
-        """检查是否应该忽略消息"""
-        if level not in self.ignore_rules:
-            return False
-        
-        # 检查模块特定规则
-        if module and module in self.ignore_rules[level]:
-            for pattern in self.ignore_rules[level][module]:
-                if pattern in message:
-                    return True
+    def matcher(self, level, module=None):
+        """
+        获取某级别、某模块的编译匹配器（模块规则和全局规则合并为一个正则）
         
-        # 检查全局规则
-        if "global" in self.ignore_rules[level]:
-            for pattern in self.ignore_rules[level]["global"]:
-                if pattern in message:
-                    return True
+        Returns:
+            re.Pattern: 无规则时返回 None
+        """
+        key = (level, module)
+        try:
+            return self._matchers[key]
+        except KeyError:
+            pass
         
-        return False
+        with self._lock:
+            rules = self.ignore_rules.get(level, {})
+            patterns = list(rules.get(module, [])) if module else []
+            patterns += rules.get("global", [])
+            compiled = re.compile("|".join(re.escape(p) for p in patterns)) if patterns else None
+            self._matchers[key] = compiled
+        return compiled
+    
+    def should_ignore(self, level, message, module=None):
+        """检查是否应该忽略消息"""
+        compiled = self.matcher(LEVEL_ALIASES.get(level, level), module)
+        return compiled is not None and compiled.search(message) is not None
 
 # 创建全局实例
-ignore_config = IgnoreConfig() 
\ No newline at end of file
+ignore_config = IgnoreConfig()
@@ -21,7 +21,8 @@ RESOURCE_DIRS = {
     "UPLOADS": os.path.join(BASE_PATHS["RESOURCE_ROOT"], 'uploads'),
     "LOGS": os.path.join(BASE_PATHS["RESOURCE_ROOT"], 'logs'),
     "TEMP": os.path.join(BASE_PATHS["RESOURCE_ROOT"], 'temp'),
-    "BACKUP": os.path.join(BASE_PATHS["RESOURCE_ROOT"], 'backup')
+    "BACKUP": os.path.join(BASE_PATHS["RESOURCE_ROOT"], 'backup'),
+    "STATE": os.path.join(BASE_PATHS["RESOURCE_ROOT"], 'state')  # 调度状态持久化目录
 }
 
 # Excel文件配置
@@ -45,12 +46,30 @@ DIRECTORY_STRUCTURE = {
     "CONTENT_TEMPLATE": "标题：\n正文：\n"  # 内容文件模板
 }
 
+# 媒体文件配置
+MEDIA_CONFIG = {
+    "EXTENSIONS": {              # 媒体文件扩展名 -> 类型
+        ".png": "image",
+        ".jpg": "image",
+        ".jpeg": "image",
+        ".mp4": "video"
+    },
+    "MANIFEST_CACHE_SIZE": 500   # 内存中缓存的任务媒体清单数量
+}
+
+# 内容文件配置
+CONTENT_CONFIG = {
+    "TITLE_MAX_LENGTH": 20,      # 标题最大字数
+    "BODY_MAX_LENGTH": 1000,     # 正文最大字数
+    "CACHE_SIZE": 500            # 内存中缓存的内容文件数量
+}
+
 # 文件路径配置
 ROOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads')  # root目录
 LOG_DIR = os.path.join(ROOT_DIR, "logs")  # 日志目录
 
 # ADB配置
-ADB_COMMAND = "adb"  # ADB命令路径（假设已加入系统PATH）
+ADB_COMMAND = os.environ.get("ADB_COMMAND", "adb")  # ADB命令路径（默认使用PATH中的adb，可用环境变量指定，如基准测试的模拟adb）
 
 # 设备映射配置（逻辑名称 -> 物理设备序列号）
 DEVICE_MAPPING = {
@@ -72,7 +91,38 @@ LOG_CONFIG = {
     "FILE_LEVEL": "DEBUG",        # 文件日志级别
     "MAX_BYTES": 10485760,        # 单个日志文件最大大小（10MB）
     "BACKUP_COUNT": 5,            # 保留的日志文件数量
-    "FORMAT": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    "FORMAT": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    "QUEUE_SIZE": 10000,          # 日志队列上限，队列满时丢弃新日志并计数
+    "IGNORE_RELOAD_INTERVAL": 2,  # 检查忽略规则文件（config/ignore_rules.json）变化的间隔（秒）
+    "EVENT_FILE": "events.jsonl"  # 结构化事件日志文件（JSON 行，位于日志目录）
+}
+
+# 运行指标配置（Prometheus 文本格式，http://HOST:PORT/metrics）
+METRICS_CONFIG = {
+    "ENABLED": True,
+    "HOST": "127.0.0.1",          # 只监听本机
+    "PORT": 9108,
+    "DEFAULT_BUCKETS": [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]  # 直方图默认分桶上界（秒）
+}
+
+# 任务链路追踪配置（Chrome trace_event JSON，每个任务一个文件）
+TRACE_CONFIG = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 1.0,           # 采样比例（0~1，按任务采样）
+    "OUTPUT_DIR": os.path.join(RESOURCE_DIRS['LOGS'], 'traces'),
+    "MAX_TASKS": 500,             # 内存中同时追踪的任务数上限
+    "MAX_EVENTS_PER_TASK": 2000   # 单个任务的事件数上限
+}
+
+# 运行时诊断配置（仅类Unix：kill -USR1 <pid> 开始/停止采样分析，kill -USR2 <pid> 转储内存分配和线程栈）
+DIAGNOSTICS_CONFIG = {
+    "ENABLED": True,
+    "OUTPUT_DIR": os.path.join(RESOURCE_DIRS['LOGS'], 'diagnostics'),
+    "PROFILE_SECONDS": 60,        # 采样分析最长持续时间（秒），到时自动停止并输出
+    "SAMPLE_INTERVAL": 0.01,      # 采样间隔（秒）
+    "TRACEMALLOC_AT_START": False,  # 注册诊断时即开始内存分配跟踪（有额外开销；关闭时首次 SIGUSR2 才开始）
+    "TRACEMALLOC_FRAMES": 10,     # 内存分配跟踪保留的调用栈深度
+    "TRACEMALLOC_TOP": 30         # 转储中输出的分配位置数
 }
 
 # 任务状态映射表（中英文对照）
@@ -84,6 +134,7 @@ TASK_STATUS = {
     "DEVICE_NOT_FOUND": "设备未配置",
     "TRANSFER_INCOMPLETE": "传输未完成",
     "VERIFICATION_FAILED": "验证失败",
+    "CONTENT_INVALID": "内容格式错误",
     "FAILED": "传输失败"
 }
 
@@ -92,7 +143,61 @@ AUTOMATION_CONFIG = {
     "APP_PACKAGE": "com.xingin.xhs",
     "SCREEN_LOCK_PASSWORD": "000000",
     "DEFAULT_TITLE_PREFIX": "美食探索之",
-    "WAIT_TIMEOUT": 5
+    "WAIT_TIMEOUT": 5,
+    "HOME_ACTIVITY": "com.xingin.xhs.index.v2.IndexActivityV2",  # 应用首页Activity
+    "STEP_TIMEOUT": 5,             # 单个界面步骤的等待截止时间（秒）
+    "SCROLL_SETTLE_TIMEOUT": 1.0,  # 滚动后等待目标出现的时间（秒）
+    "WAIT_POLL_INTERVAL": 0.05,    # 界面条件轮询的初始间隔（秒）
+    "WAIT_MAX_INTERVAL": 0.5,      # 界面条件轮询的最大间隔（秒）
+    "UNLOCK_SWIPE_DURATION": 0.2,  # 解锁上滑手势时长（秒）
+    "TEXT_INPUT_METHODS": ["set_text", "clipboard", "fastinput"],  # 文本输入方式（按统计耗时自动排序）
+    "FLOW_MAX_RESUMES": 2,         # 发布流程失败后按当前界面续跑的最大次数
+    "MEDIA_HANDOFF": False         # 通过分享Intent直接打开编辑页（仅限单个媒体文件，多图笔记仍走界面导航；不接受时自动改用界面导航）
+}
+
+# 发布流程步骤耗时统计配置
+STEP_TIMING_CONFIG = {
+    "MAX_SAMPLES": 1000,  # 每个设备每个步骤保留的样本数
+    "DUMP_PATH": os.path.join(RESOURCE_DIRS["LOGS"], "step_timings.json")  # 统计结果文件
+}
+
+# 设备会话池配置（复用 uiautomator2 连接）
+SESSION_POOL_CONFIG = {
+    "HEALTH_CHECK_INTERVAL": 30,  # 空闲会话健康检查间隔（秒）
+    "VERIFY_AFTER": 10,           # 距上次确认超过该时间，租用前先检查连接（秒）
+    "LEASE_TIMEOUT": 600          # 等待租约的最长时间（秒）
+}
+
+# 设备预热配置（在截止时间前完成连接、解锁和启动应用）
+WARMUP_CONFIG = {
+    "ENABLED": True,
+    "LEAD_SECONDS": 120,     # 提前预热的时间（秒）
+    "MAX_SLIP_SECONDS": 300  # 超过截止时间仍未使用则释放预热状态（秒）
+}
+
+# 设备执行器配置（每个物理设备一个工作线程）
+EXECUTOR_CONFIG = {
+    "MAX_QUEUE_DEPTH": 20,     # 单设备最大排队任务数（0表示不限制）
+    "SHUTDOWN_TIMEOUT": 30,    # 关闭时等待设备任务结束的时间（秒）
+    "STATS_LOG_INTERVAL": 300  # 设备统计信息输出间隔（秒）
+}
+
+# asyncio运行时配置
+ASYNC_RUNTIME_CONFIG = {
+    "ENABLED": True,                  # 使用asyncio运行时（False时使用原线程主循环）
+    "ADB_PER_DEVICE_CONCURRENCY": 2,  # 单设备同时执行的ADB命令数
+    "ADB_MAX_PROCESSES": 32,          # 同时存在的ADB进程总数
+    "ADB_TIMEOUT": 120,               # 单条ADB命令超时时间（秒）
+    "DEVICES_CACHE_TTL": 2,           # adb devices 结果缓存时间（秒）
+    "DEVICE_CHECK_INTERVAL": 30,      # 设备状态检查间隔（秒）
+    "SHUTDOWN_TIMEOUT": 30            # 关闭时等待后台任务的时间（秒）
+}
+
+# 调度队列持久化配置
+TASK_STORE_CONFIG = {
+    "JOURNAL_PATH": os.path.join(RESOURCE_DIRS["STATE"], "task_journal.jsonl"),  # 追加写日志文件
+    "COMPACT_THRESHOLD": 500,  # 日志行数超过该值时压缩
+    "FSYNC": True              # 每条日志是否立即落盘
 }
 
 # 更新任务状态
@@ -100,7 +205,8 @@ TASK_STATUS.update({
     "DEVICE_NOT_CONNECTED": "设备未连接",
     "PARTIAL_SUCCESS": "部分成功",
     "WAITING_CONTENT": "等待内容",
-    "WAITING_MEDIA": "等待媒体"
+    "WAITING_MEDIA": "等待媒体",
+    "INTERRUPTED": "执行中断"
 })
 
 # 任务验证配置
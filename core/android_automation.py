@@ -1,178 +1,590 @@
 from utils.logger import get_logger
-import uiautomator2 as u2
-import time
+from utils import device_driver
 from config.settings import AUTOMATION_CONFIG, DEVICE_MAPPING
-import os
+from core.ui_wait import UIWaiter
+from core.ui_snapshot import UISnapshot
+from core.step_timing import StepTimer, step_stats
+from core.text_input import TextEntry
+from utils.metrics import metrics
+import time
 
 logger = get_logger(__name__)
 
+POSTS_TOTAL = metrics.counter('posts_total', '发布流程结束次数（按最终状态）', ['status'])
+PUBLISH_SECONDS = metrics.histogram('publish_seconds', '发布流程总耗时（秒）',
+                                    buckets=[5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300])
+PUBLISH_STEP_SECONDS = metrics.histogram('publish_step_seconds', '发布流程各步骤耗时（秒）', ['step'])
+
+# 界面元素定位
+PIN_DIGIT_ID = "com.android.systemui:id/digit_text"
+KEYGUARD_PACKAGE = "com.android.systemui"
+# 一次shell调用同时读取亮屏状态和锁屏状态（不同系统版本的字段名不同）
+DEVICE_STATE_COMMAND = (
+    "dumpsys power | grep -E 'mWakefulness=|Display Power: state='; "
+    "dumpsys window policy | grep -E 'mShowingLockscreen=|mDreamingLockscreen=|isStatusBarKeyguard=|mKeyguardShowing=|showing='"
+)
+PUBLISH_TAB_XPATH = '//*[@content-desc="发布"]/android.widget.ImageView[1]'
+ALL_ALBUM_XPATH = '//*[@resource-id="android:id/content"]/android.widget.FrameLayout[1]/android.widget.FrameLayout[3]/android.widget.RelativeLayout[1]/android.widget.RelativeLayout[1]/android.widget.RelativeLayout[1]/android.widget.LinearLayout[1]'
+THUMBNAIL_XPATH = '//androidx.viewpager.widget.ViewPager/androidx.recyclerview.widget.RecyclerView[1]/android.widget.FrameLayout[1]/androidx.recyclerview.widget.RecyclerView[1]/android.widget.FrameLayout[{}]/android.widget.FrameLayout[1]/android.widget.RelativeLayout[1]/android.widget.FrameLayout[1]/android.widget.FrameLayout[1]/android.widget.ImageView[1]'
+THUMBNAIL_ALL_XPATH = THUMBNAIL_XPATH.replace('[{}]', '')  # 不带序号，匹配所有缩略图
+# 标题输入框按位置定位（输入标题后占位文字"添加标题"消失，不能按文字查找）
+TITLE_INPUT_XPATH = '//android.widget.ScrollView/android.widget.LinearLayout[1]/android.widget.FrameLayout[2]/android.widget.EditText[1]'
+BODY_INPUT_XPATH = '//android.widget.ScrollView/android.widget.LinearLayout[1]/android.widget.FrameLayout[3]/android.widget.LinearLayout[1]/android.view.ViewGroup[1]/android.widget.LinearLayout[1]'
+APP_TEXT_ID = "com.xingin.xhs:id/-"
+
+# 媒体分享（直接打开发布编辑页）
+ACTION_SEND = "android.intent.action.SEND"
+EXTRA_STREAM = "android.intent.extra.STREAM"
+MEDIA_STORE_URI = "content://media/external/file"
+
+# 发布流程步骤（按执行顺序）
+FLOW_STEPS = ('unlock', 'media_handoff', 'app_start', 'open_composer', 'album_select',
+              'folder_lookup', 'image_select', 'text_entry', 'publish_tap')
+
+# 媒体分享成功后可以跳过的界面导航步骤
+HANDOFF_SKIPS = ('app_start', 'open_composer', 'album_select', 'folder_lookup', 'image_select')
+
+# 不接受单文件媒体分享的设备（本次运行内不再尝试）
+_handoff_rejected = set()
+
+# 界面 -> 可以从该界面开始的步骤（续跑时选择前置步骤都已完成的最后一个）
+SCREEN_STEPS = {
+    'keyguard': ('unlock',),
+    'outside_app': ('unlock', 'app_start'),
+    'home': ('open_composer',),
+    'album': ('album_select', 'image_select'),
+    'folders': ('folder_lookup',),
+    'editor': ('text_entry', 'publish_tap'),
+}
+
+
+class StepFailed(Exception):
+    """发布步骤返回了失败状态"""
+
 class AndroidAutomation:
-    def __init__(self, device_id):
+    def __init__(self, device_id, device=None):
+        """
+        Args:
+            device_id (str): 设备序列号
+            device: 已连接的 uiautomator2 设备对象（来自会话池），为空时自行连接
+        """
         self.device_id = device_id
-        self.d = None
+        self.d = device
         self.app_package = AUTOMATION_CONFIG['APP_PACKAGE']
         self.lock_password = AUTOMATION_CONFIG['SCREEN_LOCK_PASSWORD']
         self.wait_timeout = AUTOMATION_CONFIG['WAIT_TIMEOUT']
+        self.home_activity = AUTOMATION_CONFIG['HOME_ACTIVITY']
+        self.step_timeout = AUTOMATION_CONFIG['STEP_TIMEOUT']
+        self.max_resumes = AUTOMATION_CONFIG['FLOW_MAX_RESUMES']
+        self.media_handoff = AUTOMATION_CONFIG['MEDIA_HANDOFF']
+        self.waiter = UIWaiter()  # 界面条件等待（记录每次等待耗时）
+        self._snapshot = None  # 界面树快照
+        self.timer = StepTimer(device_id)  # 发布流程步骤计时
+        self.last_report = None  # 最近一次发布的步骤耗时报告
         logger.info(f"初始化设备ID: {device_id}")
         logger.debug(f"使用配置 - 应用包名: {self.app_package}, 等待超时: {self.wait_timeout}秒")
 
+    @property
+    def snapshot(self):
+        """当前设备的界面快照（设备对象变化时重新绑定）"""
+        if self._snapshot is None or self._snapshot.d is not self.d:
+            self._snapshot = UISnapshot(self.d)
+        return self._snapshot
+
     def connect_device(self):
         """连接设备"""
         try:
-            self.d = u2.connect(self.device_id)
+            self.d = device_driver.connect(self.device_id)
             logger.info(f"成功连接设备: {self.device_id}")
             return True
         except Exception as e:
             logger.error(f"设备连接失败: {str(e)}")
             return False
 
-    def post_content(self, title, content, image_paths):
-        """发布内容"""
+    def _keyguard_gone(self):
+        """锁屏界面是否已经消失"""
+        return self.d.info.get('currentPackageName') != KEYGUARD_PACKAGE
+
+    def probe_device_state(self):
+        """
+        读取设备亮屏和锁屏状态（一次shell调用）
+
+        Returns:
+            dict: {'screen_on': bool, 'locked': bool}；无法解析时返回None
+        """
         try:
-            logger.info("开始发布内容")
-            logger.debug(f"标题: {title if title else '[无标题]'}")
-            logger.debug(f"正文长度: {len(content) if content else 0}")
-            logger.debug(f"图片数量: {len(image_paths)}")
-
-            # 获取时间文件夹名
-            logger.debug(f"原始路径: {image_paths[0]}")
-            path_parts = image_paths[0].split(os.path.sep)
-            logger.debug(f"path_parts: {path_parts}")
-            
-            # 找到 'img' 目录的索引，它的上一级就是时间文件夹
-            img_index = path_parts.index('img')
-            time_str = path_parts[img_index - 1]
-            logger.debug(f"解析到的时间文件夹: {time_str}")
+            result = self.d.shell(DEVICE_STATE_COMMAND)
+            output = getattr(result, 'output', result)
+            if isinstance(output, (tuple, list)):
+                output = output[0]
+        except Exception as e:
+            logger.debug(f"读取设备状态失败: {str(e)}")
+            return None
+
+        screen_on = locked = None
+        for line in (output or '').splitlines():
+            line = line.strip()
+            if line.startswith('mWakefulness='):
+                screen_on = line.split('=', 1)[1].strip() == 'Awake'
+            elif line.startswith('Display Power: state=') and screen_on is None:
+                screen_on = line.split('=', 1)[1].strip() == 'ON'
+            else:
+                for field in line.split():
+                    key, _, value = field.partition('=')
+                    if key in ('mShowingLockscreen', 'mDreamingLockscreen', 'isStatusBarKeyguard',
+                               'mKeyguardShowing', 'showing') and value:
+                        locked = bool(locked) or value == 'true'
+
+        if screen_on is None or locked is None:
+            return None
+        return {'screen_on': screen_on, 'locked': locked}
+
+    def unlock_screen(self):
+        """点亮并解锁屏幕"""
+        with self.timer.span("unlock"):
+            self._unlock_screen()
 
-            # 解锁屏幕
+    def _unlock_screen(self):
+        # 屏幕已亮且未锁定（如连续发布）时跳过整个解锁过程
+        device_state = self.probe_device_state()
+        if device_state and device_state['screen_on'] and not device_state['locked']:
+            logger.debug("设备已亮屏且未锁定，跳过解锁")
+            return
+        if not device_state or not device_state['screen_on']:
             self.d.screen_on()
-            self.d.swipe(500, 2500, 500, 500, duration=1.0)
+        self.d.swipe(500, 2500, 500, 500, duration=AUTOMATION_CONFIG['UNLOCK_SWIPE_DURATION'])
+        
+        # 等待密码输入界面出现，或者设备本身没有设置密码直接进入桌面
+        pin_pad = self.d(resourceId=PIN_DIGIT_ID, text=self.lock_password[0])
+        state = self.waiter.wait_until(
+            lambda: 'pin' if pin_pad.exists else ('unlocked' if self._keyguard_gone() else None),
+            name="unlock_pin_pad"
+        )
+        if not state:
+            raise Exception("密码输入界面未出现")
+        
+        if state == 'pin':
+            for digit in self.lock_password:
+                self.d(resourceId=PIN_DIGIT_ID, text=digit).click()
+            if not self.waiter.wait_until(self._keyguard_gone, name="unlock_done"):
+                raise Exception("密码输入后仍未解锁")
+
+    def launch_app(self):
+        """
+        启动应用并等待首页
+        
+        Returns:
+            bool: 是否在超时前进入首页
+        """
+        with self.timer.span("app_start"):
+            return self._launch_app()
+
+    def _launch_app(self):
+        self.d.app_start(self.app_package)
+        home = self.home_activity.rsplit('.', 1)[-1]
+        if not self.waiter.wait_until(
+            lambda: self.d.app_current().get('activity', '').endswith(home),
+            timeout=self.wait_timeout,
+            name="app_home"
+        ):
+            logger.error(f"应用启动超时，未进入首页: {self.device_id}")
+            return False
+        logger.debug("应用启动成功")
+        return True
+
+    def prepare_device(self):
+        """
+        预热设备：连接、解锁并启动应用到首页
+        
+        Returns:
+            bool: 是否预热成功
+        """
+        try:
+            if self.d is None and not self.connect_device():
+                return False
+            self.unlock_screen()
+            if not self.launch_app():
+                return False
+            logger.info(f"设备预热完成: {self.device_id}")
+            return True
+        except Exception as e:
+            logger.error(f"设备预热失败: {self.device_id} - {str(e)}")
+            return False
+
+    def is_prepared(self):
+        """检查预热状态是否仍然有效（屏幕亮起且应用在前台）"""
+        try:
+            if not self.d.info.get('screenOn'):
+                return False
+            return self.d.app_current().get('package') == self.app_package
+        except Exception:
+            return False
+
+    def teardown(self):
+        """释放预热状态：返回桌面并关闭屏幕"""
+        try:
+            self.d.press("home")
+            self.d.screen_off()
+            logger.info(f"已释放预热设备: {self.device_id}")
+        except Exception as e:
+            logger.warning(f"释放预热设备失败: {self.device_id} - {str(e)}")
+
+    def post_content(self, title, content, manifest, prepared=False):
+        """
+        发布内容
+        
+        Args:
+            title (str): 标题
+            content (str): 正文
+            manifest (MediaManifest): 任务的媒体清单（有序的媒体文件和设备路径）
+            prepared (bool): 设备是否已预热（已解锁并停留在应用首页）
             
-            # 添加等待和重试机制
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    # 等待密码输入界面
-                    if self.d(resourceId="com.android.systemui:id/digit_text", text="0").exists(timeout=5):
-                        for _ in range(6):
-                            self.d(resourceId="com.android.systemui:id/digit_text", text="0").click()
-                        break
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        raise Exception(f"密码输入失败: {str(e)}")
-                    time.sleep(1)
-
-            # 启动应用
-            self.d.app_start(self.app_package)
-            self.d.wait_activity(self.app_package, timeout=self.wait_timeout)
-            logger.debug("应用启动成功")
-
-            # 点击发布按钮
-            self.d.xpath('//*[@content-desc="发布"]/android.widget.ImageView[1]').click()
-            logger.debug("点击发布按钮")
-
-            # 尝试多种方式点击"全部"按钮
+        Returns:
+            tuple: (是否成功, 状态)；各步骤耗时和重试次数见 self.last_report
+        """
+        success, status = self._run_publish_flow(title, content, manifest, prepared)
+        self.last_report = self.timer.report(status)
+        step_stats.dump()
+        POSTS_TOTAL.labels(status).inc()
+        PUBLISH_SECONDS.observe(self.last_report['total_seconds'])
+        for step in self.last_report['steps']:
+            PUBLISH_STEP_SECONDS.labels(step['name']).observe(step['seconds'])
+        logger.info(
+            f"发布流程耗时 {self.last_report['total_seconds']}秒, 重试 {self.last_report['retries']} 次 - "
+            + ", ".join(f"{step['name']}={step['seconds']}" for step in self.last_report['steps'])
+        )
+        self.reset_timer()
+        return success, status
+
+    def reset_timer(self):
+        """开始新的步骤计时（预热完成后或每次发布结束后调用）"""
+        self.timer = StepTimer(self.device_id)
+
+    def _run_publish_flow(self, title, content, manifest, prepared):
+        """
+        发布流程（状态机）
+
+        按 FLOW_STEPS 依次执行各步骤并记录完成的检查点；
+        某一步失败时识别当前界面，从该界面上可以继续的步骤续跑，而不是从解锁重新开始
+        """
+        logger.info("开始发布内容")
+        logger.debug(f"标题: {title if title else '[无标题]'}")
+        logger.debug(f"正文长度: {len(content) if content else 0}")
+        logger.debug(f"媒体数量: {len(manifest.entries)}")
+
+        # 相册中的时间文件夹名
+        time_str = manifest.dir_name
+        logger.debug(f"时间文件夹: {time_str}")
+
+        flow = {
+            'title': title,
+            'content': content,
+            'time_str': time_str,
+            'manifest': manifest,
+            'handoff': False,   # 媒体分享是否成功（成功后跳过界面导航步骤）
+            'entered': set(),   # 已输入并校验的字段（'title'、'content'，续跑时不重复输入）
+            'submitted': False  # 是否已点击发布（点击后不再续跑，避免重复发布）
+        }
+        # 已知限制：媒体分享只支持单个文件。am start 无法传递 Uri 列表（--esal 是字符串列表，
+        # 应用按 ACTION_SEND_MULTIPLE 读取 EXTRA_STREAM 时得不到 Uri），多图笔记（最常见的情况）仍走界面导航
+        use_handoff = (self.media_handoff and len(manifest.entries) == 1
+                       and self.device_id not in _handoff_rejected)
+        if self.media_handoff and len(manifest.entries) > 1:
+            logger.debug(f"媒体分享只支持单个文件，{len(manifest.entries)} 个文件使用界面导航")
+        steps = [name for name in FLOW_STEPS
+                 if (name != 'text_entry' or title or content) and (name != 'media_handoff' or use_handoff)]
+        completed = []
+
+        # 已预热时跳过解锁和启动应用
+        if prepared and self.is_prepared():
+            logger.debug("设备已预热，跳过解锁和启动应用")
+            completed = ['unlock', 'app_start']
+
+        resumes = 0
+        index = 0
+        while index < len(steps):
+            name = steps[index]
+            if name in completed or (flow['handoff'] and name in HANDOFF_SKIPS):
+                if name not in completed:
+                    completed.append(name)
+                index += 1
+                continue
+            status = None
             try:
-                # 方式1：使用原有的xpath
-                all_photos = self.d.xpath('//*[@resource-id="android:id/content"]/android.widget.FrameLayout[1]/android.widget.FrameLayout[3]/android.widget.RelativeLayout[1]/android.widget.RelativeLayout[1]/android.widget.RelativeLayout[1]/android.widget.LinearLayout[1]')
-                if all_photos.exists:
-                    all_photos.click()
-                else:
-                    # 方式2：尝试使用文本定位
-                    self.d(text="全部").click()
+                with self.timer.span(name):
+                    status = getattr(self, f"_step_{name}")(flow)
+                    if status:
+                        raise StepFailed(status)
             except Exception as e:
-                logger.error(f"点击'全部'按钮失败: {str(e)}")
-                return False, "SELECT_ALBUM_FAILED"
-            
-            logger.debug("点击'全部'按钮成功")
-
-            # 等待文件夹列表加载
-            time.sleep(1)
-
-            # 选择时间文件夹
-            time_str = path_parts[-3]  # 从图片路径获取时间文件夹名
-            logger.debug(f"准备选择文件夹: {time_str}")
-
-            # 添加重试机制选择文件夹
-            for attempt in range(max_retries):
-                try:
-                    target_element = self.d(resourceId="com.xingin.xhs:id/-", text=time_str)
-                    if target_element.exists(timeout=5):
-                        target_element.click()
-                        logger.debug(f"成功选择文件夹: {time_str}")
-                        break
-                    else:
-                        # 如果找不到，尝试滚动列表
-                        self.d.swipe(500, 1000, 500, 200)
-                        time.sleep(0.5)
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        logger.error(f"选择文件夹失败: {str(e)}")
-                        return False, "FOLDER_NOT_FOUND"
-                    time.sleep(1)
-
-            self.d.wait_activity('', timeout=self.wait_timeout)
-
-            # 选择图片
-            base_xpath = '//androidx.viewpager.widget.ViewPager/androidx.recyclerview.widget.RecyclerView[1]/android.widget.FrameLayout[1]/androidx.recyclerview.widget.RecyclerView[1]/android.widget.FrameLayout[{}]/android.widget.FrameLayout[1]/android.widget.RelativeLayout[1]/android.widget.FrameLayout[1]/android.widget.FrameLayout[1]/android.widget.ImageView[1]'
-            
-            index = 1
-            while True:
-                xpath = base_xpath.format(index)
-                if self.d.xpath(xpath).exists:
-                    logger.debug(f"选择第 {index} 张图片")
-                    self.d.xpath(xpath).click()
-                    index += 1
-
-                else:
-                    print(f"共找到 {index - 1} 张图片")
-                    logger.info(f"共选择 {index - 1} 张图片")
-                    break
-
-            if index - 1 == 0:
-                logger.error("未能选择任何图片")
-                return False, "NO_IMAGES_SELECTED"
-
-            self.d.click(0.741, 0.964)
-
-            # 点击下一步
-            next_button = self.d(resourceId="com.xingin.xhs:id/-", text="下一步")
-            if not next_button.exists(timeout=5):
-                logger.error("找不到下一步按钮")
-                return False, "NEXT_BUTTON_NOT_FOUND"
-
-            next_button.click()
-            logger.debug("点击下一步")
-
-            # 根据是否有标题和正文来决定操作流程
-            if title or content:
-                logger.debug("检测到标题或正文内容，进行输入操作")
-                # 输入标题（如果有）
-                if title:
-                    self.d(resourceId="com.xingin.xhs:id/-", text="添加标题").click()
-                    self.d.send_keys(title)
-                    logger.debug(f"输入标题: {title}")
-
-                # 输入正文（如果有）
-                if content:
-                    self.d.xpath(
-                        '//android.widget.ScrollView/android.widget.LinearLayout[1]/android.widget.FrameLayout[3]/android.widget.LinearLayout[1]/android.view.ViewGroup[1]/android.widget.LinearLayout[1]').click()
-                    self.d.send_keys(content)
-                    logger.debug("输入正文完成")
-
-                # 点击发布按钮
-                self.d(resourceId="com.xingin.xhs:id/-", text="发布").click()
-            else:
-                logger.debug("无标题和正文内容，直接发布")
-                # 直接点击发布笔记按钮
-                self.d(resourceId="com.xingin.xhs:id/-", text="发布笔记").click()
+                status = status or "AUTOMATION_FAILED"
+                logger.error(f"发布步骤失败: {name} - {status} - {str(e)}")
+
+                if flow['submitted']:
+                    return False, "PUBLISH_UNCONFIRMED"
+                if resumes >= self.max_resumes:
+                    return False, status
+
+                # 识别当前界面，从最近的检查点续跑
+                resumes += 1
+                screen = self.recognize_screen(time_str)
+                index = self._resume_index(steps, completed, screen)
+                completed = steps[:index]
+                if steps[index] in HANDOFF_SKIPS:
+                    flow['handoff'] = False  # 已回到界面导航，不再跳过
+                self.timer.resume(name, status, screen, steps[index])
+                logger.warning(f"当前界面: {screen or '未知'}，从步骤 {steps[index]} 续跑（第 {resumes} 次）")
+                continue
+
+            completed.append(name)
+            index += 1
+
+        # 记录界面导航总耗时，与 media_handoff 步骤对比可得出媒体分享节省的时间
+        if not flow['handoff']:
+            navigation = [step['seconds'] for step in self.timer.steps if step['name'] in HANDOFF_SKIPS]
+            if navigation:
+                step_stats.record(self.device_id, 'ui_navigation', sum(navigation))
+
+        logger.info("发布操作完成")
+        logger.debug(f"界面等待累计耗时: {self.waiter.total_elapsed()}秒, 明细: {self.waiter.records}")
+        return True, "SUCCESS"
+
+    @staticmethod
+    def _resume_index(steps, completed, screen):
+        """
+        续跑的起始步骤：当前界面上可以开始的步骤中，前置步骤都已完成的最后一个；
+        界面无法识别时从头开始
+        """
+        candidates = [name for name in SCREEN_STEPS.get(screen, ()) if name in steps]
+        if not candidates:
+            return 0
+        index = steps.index(candidates[0])
+        for name in candidates[1:]:
+            position = steps.index(name)
+            if all(step in completed for step in steps[:position]):
+                index = position
+        return index
+
+    def recognize_screen(self, folder=None):
+        """
+        根据一次界面快照识别当前所在界面
+
+        Returns:
+            str: SCREEN_STEPS 中的界面名，无法识别时返回None
+        """
+        try:
+            snapshot = self.snapshot.refresh()
+            if snapshot.exists(packageName=KEYGUARD_PACKAGE):
+                return 'keyguard'
+            if not snapshot.exists(packageName=self.app_package):
+                return 'outside_app'
+            if snapshot.xpath_first(TITLE_INPUT_XPATH) or snapshot.xpath_first(BODY_INPUT_XPATH):
+                return 'editor'
+            thumbnails = snapshot.xpath_first(THUMBNAIL_XPATH.format(1))
+            if folder and not thumbnails and snapshot.exists(resourceId=APP_TEXT_ID, text=folder):
+                return 'folders'
+            if thumbnails or snapshot.xpath_first(ALL_ALBUM_XPATH) or snapshot.exists(text="全部"):
+                return 'album'
+            if snapshot.xpath_first(PUBLISH_TAB_XPATH):
+                return 'home'
+        except Exception as e:
+            logger.warning(f"识别当前界面失败: {str(e)}")
+        return None
+
+    def _step_unlock(self, flow):
+        self._unlock_screen()
+
+    def _query_media_uris(self, manifest):
+        """
+        查询已推送文件在 MediaStore 中的 content URI（一次shell调用）
+
+        Returns:
+            tuple: (URI列表（与清单顺序一致）, MIME类型)；有文件未入库时返回 (None, None)
+        """
+        if not manifest.remote_dir:
+            return None, None
+        result = self.d.shell(
+            f"content query --uri {MEDIA_STORE_URI} --projection _id:_data "
+            f"--where \"_data LIKE '{manifest.remote_dir}/%'\""
+        )
+        output = getattr(result, 'output', result)
+        if isinstance(output, (tuple, list)):
+            output = output[0]
+
+        rows = {}
+        for line in (output or '').splitlines():
+            if not line.startswith('Row:'):
+                continue
+            fields = dict(part.split('=', 1) for part in line.split(' ', 2)[2].split(', ') if '=' in part)
+            rows[fields.get('_data', '')] = fields.get('_id')
+
+        uris = []
+        mime_types = set()
+        for entry in manifest.entries:
+            media_id = rows.get(entry.remote_path)
+            if not media_id:
+                logger.debug(f"媒体文件未入库: {entry.name}")
+                return None, None
+            kind = 'video' if entry.type == 'video' else 'images'
+            uris.append(f"content://media/external/{kind}/media/{media_id}")
+            mime_types.add(entry.type)
 
-            logger.info("发布操作完成")
-            return True, "SUCCESS"
+        return uris, (f"{mime_types.pop()}/*" if len(mime_types) == 1 else "*/*")
 
+    def _step_media_handoff(self, flow):
+        """
+        通过分享 Intent（ACTION_SEND，单个媒体文件）直接打开发布编辑页，跳过相册导航；
+        应用不接受时返回并继续界面导航流程
+        """
+        start = time.perf_counter()
+        opened = False  # 分享是否打开了应用内页面（图片编辑页），失败时才需要返回
+        try:
+            uris, mime_type = self._query_media_uris(flow['manifest'])
+            if not uris:
+                logger.info("媒体文件不在 MediaStore 中，使用界面导航选择图片")
+                return None
+
+            self.d.shell(
+                f"am start -a {ACTION_SEND} -t '{mime_type}' -p {self.app_package} "
+                f"--grant-read-uri-permission --eu {EXTRA_STREAM} '{uris[0]}'"
+            )
+
+            # 等待进入编辑页（部分版本会先进入图片编辑页，点击下一步）
+            next_button = self.d(resourceId=APP_TEXT_ID, text="下一步")
+            screen = self.waiter.wait_until(
+                lambda: 'next' if next_button.exists else self.recognize_screen() == 'editor',
+                timeout=self.wait_timeout,
+                name="handoff_composer"
+            )
+            if screen == 'next':
+                opened = True
+                next_button.click()
+                screen = self.waiter.wait_until(lambda: self.recognize_screen() == 'editor', name="handoff_editor")
         except Exception as e:
-            logger.error(f"发布内容失败: {str(e)}")
-            return False, "AUTOMATION_FAILED"
+            logger.warning(f"媒体分享出错: {str(e)}")
+            screen = None
+
+        if not screen:
+            logger.warning(f"应用未接受媒体分享，改用界面导航: {self.device_id}")
+            _handoff_rejected.add(self.device_id)
+            # 分享未打开任何页面时（如已预热停在首页）不能返回，否则会退出应用，界面导航从首页开始失败
+            if opened:
+                self.d.press("back")
+            return None
+
+        flow['handoff'] = True
+        elapsed = time.perf_counter() - start
+        navigation = step_stats.summary().get(self.device_id, {}).get('ui_navigation')
+        if navigation:
+            logger.info(f"媒体分享成功, 耗时 {elapsed:.1f}秒, "
+                        f"比界面导航(p50 {navigation['p50']}秒)节省 {navigation['p50'] - elapsed:.1f}秒")
+        else:
+            logger.info(f"媒体分享成功，跳过相册导航, 耗时 {elapsed:.1f}秒")
+
+    def _step_app_start(self, flow):
+        if not self._launch_app():
+            return "APP_START_FAILED"
+
+    def _step_open_composer(self, flow):
+        """点击发布按钮"""
+        publish_tab = self.d.xpath(PUBLISH_TAB_XPATH)
+        if not self.waiter.wait_exists(publish_tab, name="publish_tab"):
+            return "PUBLISH_BUTTON_NOT_FOUND"
+        publish_tab.click()
+        logger.debug("点击发布按钮")
+
+    def _step_album_select(self, flow):
+        """点击"全部"相册选择器"""
+        # 方式1：使用原有的xpath；方式2：使用文本定位（同一次界面快照中匹配）
+        def find_album_selector():
+            snapshot = self.snapshot.refresh()
+            return snapshot.xpath_first(ALL_ALBUM_XPATH) or snapshot.find_first(text="全部")
+
+        album_node = self.waiter.wait_until(find_album_selector, name="album_selector")
+        if not album_node:
+            logger.error("点击'全部'按钮失败: 相册选择器未出现")
+            return "SELECT_ALBUM_FAILED"
+        self.snapshot.tap(album_node)
+        logger.debug("点击'全部'按钮成功")
+
+    def _step_folder_lookup(self, flow):
+        """选择时间文件夹（找不到时滚动列表后重试）"""
+        time_str = flow['time_str']
+        logger.debug(f"准备选择文件夹: {time_str}")
+        max_retries = 3
+        target_element = self.d(resourceId=APP_TEXT_ID, text=time_str)
+        for attempt in range(max_retries):
+            timeout = self.step_timeout if attempt == 0 else AUTOMATION_CONFIG['SCROLL_SETTLE_TIMEOUT']
+            if self.waiter.wait_exists(target_element, timeout=timeout, name="folder_item"):
+                target_element.click()
+                logger.debug(f"成功选择文件夹: {time_str}")
+                return None
+            self.timer.retry("folder_lookup")
+            self.d.swipe(500, 1000, 500, 200)
+        logger.error(f"选择文件夹失败: {time_str}")
+        return "FOLDER_NOT_FOUND"
+
+    def _step_image_select(self, flow):
+        """选择图片并点击下一步"""
+        # 等待图片列表加载
+        self.waiter.wait_exists(self.d.xpath(THUMBNAIL_XPATH.format(1)), name="thumbnail_grid")
+
+        # 选择图片：一次获取界面树，解析出所有缩略图坐标后直接点击
+        thumbnails = [node for node in self.snapshot.refresh().xpath(THUMBNAIL_ALL_XPATH) if node.visible]
+        for index, node in enumerate(thumbnails, 1):
+            logger.debug(f"选择第 {index} 张图片")
+            self.snapshot.tap(node, invalidate=False)
+        self.snapshot.invalidate()
+        logger.info(f"共选择 {len(thumbnails)} 张图片")
+
+        if not thumbnails:
+            logger.error("未能选择任何图片")
+            return "NO_IMAGES_SELECTED"
+
+        self.d.click(0.741, 0.964)
+
+        # 点击下一步
+        next_button = self.d(resourceId=APP_TEXT_ID, text="下一步")
+        if not self.waiter.wait_exists(next_button, name="next_button"):
+            logger.error("找不到下一步按钮")
+            return "NEXT_BUTTON_NOT_FOUND"
+
+        next_button.click()
+        logger.debug("点击下一步")
+
+    def _step_text_entry(self, flow):
+        """
+        输入标题和正文（可重复执行）
+
+        续跑时跳过已完成的字段；输入框已有内容时，与原文一致则跳过，否则清空后重新输入
+        """
+        logger.debug("检测到标题或正文内容，进行输入操作")
+        text_entry = TextEntry(self.d, self.device_id)
+        fields = (('title', TITLE_INPUT_XPATH, "title_input"), ('content', BODY_INPUT_XPATH, "body_input"))
+        for field, xpath, wait_name in fields:
+            if not flow[field] or field in flow['entered']:
+                continue
+            field_input = self.d.xpath(xpath)
+            if not self.waiter.wait_exists(field_input, name=wait_name):
+                return "TEXT_INPUT_FAILED"
+            field_input.click()
+            ok, method = text_entry.enter(flow[field])
+            if not ok:
+                return "TEXT_INPUT_FAILED"
+            flow['entered'].add(field)
+            logger.debug(f"输入{'标题' if field == 'title' else '正文'}完成({method})")
+
+    def _step_publish_tap(self, flow):
+        """点击发布按钮（有标题或正文时为"发布"，否则为"发布笔记"）"""
+        if flow['title'] or flow['content']:
+            submit = self.d(resourceId=APP_TEXT_ID, text="发布")
+        else:
+            logger.debug("无标题和正文内容，直接发布")
+            submit = self.d(resourceId=APP_TEXT_ID, text="发布笔记")
+
+        if not self.waiter.wait_exists(submit, name="submit_button"):
+            return "SUBMIT_BUTTON_NOT_FOUND"
+        flow['submitted'] = True
+        submit.click()
 
 if __name__ == "__main__":
     logger.info("Android自动化模块")
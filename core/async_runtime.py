@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+asyncio运行时模块功能：
+1. Excel轮询、任务处理、文件传输、任务调度作为协作任务运行
+2. 所有ADB调用通过 AsyncADBHelper 异步执行（按设备限流）
+3. 预热和自动化任务提交到设备执行器（与线程主循环共用队列统计和跟踪阶段），同一设备串行
+4. 文件系统监控事件通过线程安全的方式投递到事件循环
+"""
+
+import asyncio
+import signal
+from utils.logger import get_logger
+from utils.async_adb import AsyncADBHelper
+from utils.tracing import tracer, trace_key
+from core.task_validator import TaskValidator
+from config.settings import ASYNC_RUNTIME_CONFIG, EXECUTOR_CONFIG, DEVICE_MAPPING
+
+logger = get_logger(__name__)
+
+
+class AsyncRuntime:
+    """基于asyncio的服务运行时"""
+
+    def __init__(self, app):
+        self.app = app                     # Application实例（复用其组件）
+        self.validator = TaskValidator()
+        self.loop = None
+        self.adb = None                    # 异步ADB工具（需在事件循环内创建）
+        self._stop_event = None
+        self._device_states = {}           # 设备序列号 -> 最近一次状态
+        self._inflight = set()             # 正在处理的任务ID
+        self._background = set()           # 后台协程任务
+
+    def stop(self):
+        """请求停止运行时（可在任意线程调用）"""
+        if self.loop is not None and self._stop_event is not None:
+            self.loop.call_soon_threadsafe(self._stop_event.set)
+
+    def _install_signal_handlers(self):
+        """注册终止信号（Windows不支持 add_signal_handler 时退回 signal.signal）"""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(sig, self._stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                signal.signal(sig, lambda signum, frame: self.stop())
+
+    def _spawn(self, coro):
+        """创建后台任务并保持引用"""
+        task = self.loop.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def _every(self, interval, func, name):
+        """按固定间隔循环执行协程"""
+        while not self._stop_event.is_set():
+            try:
+                await func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{name} 执行出错: {str(e)}")
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_excel(self):
+        """轮询Excel（替代监控器的轮询线程）"""
+        await asyncio.to_thread(self.app.excel_monitor.check_excel_data, True)
+
+    async def _process_rows(self):
+        """处理有效数据行，每个任务的传输作为独立协程"""
+        tasks = await asyncio.to_thread(self.app.excel_monitor.get_task_records)
+        for task in tasks:
+            if task.task_id in self._inflight:
+                continue
+            self._inflight.add(task.task_id)
+            self._spawn(self._process_task(task))
+
+    async def _process_task(self, task):
+        """处理单个任务（传输使用异步ADB）"""
+        try:
+            if not self.app.should_process_task(task, self.validator):
+                return
+
+            with tracer.task(trace_key(task.post_name, task.time_str)):
+                success, status = await self.app.file_handler.transfer_task_async(self.adb, task)
+            logger.info(f"传输结果: {success} - {status}")
+            await asyncio.to_thread(self.app.apply_transfer_result, task, status)
+        except Exception as e:
+            logger.error(f"处理任务出错: {str(e)}")
+        finally:
+            self._inflight.discard(task.task_id)
+
+    def _on_resource_change(self, task_info):
+        """资源变化回调（在watchdog线程中调用）"""
+        self.loop.call_soon_threadsafe(self._spawn_resource_change, task_info)
+
+    def _spawn_resource_change(self, task_info):
+        self._spawn(self._handle_resource_change(task_info))
+
+    async def _handle_resource_change(self, task_info):
+        """处理资源文件变化"""
+        post_name = task_info['post_name']
+        time_str = task_info['time_str']
+        try:
+            # 内容文件变化时重新解析
+            await asyncio.to_thread(self.app.task_scheduler.load_content, post_name, time_str)
+            success, status = await self.app.file_handler.transfer_images_async(
+                self.adb, post_name, time_str
+            )
+            if success:
+                logger.info(f"资源更新成功: {post_name} - {time_str}")
+            else:
+                logger.error(f"资源更新失败: {post_name} - {time_str} - {status}")
+        except Exception as e:
+            logger.error(f"处理资源变化失败: {str(e)}")
+
+    async def _check_tasks(self):
+        """安排预热、提交到期任务、释放超时的预热会话"""
+        scheduler = self.app.task_scheduler
+        for task in scheduler.pop_warmup_tasks():
+            if task.device_id:
+                self._spawn(self._run_on_device(
+                    task.device_id, scheduler.warm_up, task, name=f"warmup_{task.task_id}"
+                ))
+
+        for task in scheduler.pop_due_tasks():
+            self._spawn(self._run_automation(task))
+
+        for device_id, session in scheduler.pop_expired_warm_sessions():
+            self._spawn(self._run_on_device(
+                device_id, scheduler.release_warm_session, session, name="warmup_release"
+            ))
+
+    async def _wait_device_task(self, future):
+        """等待设备执行器中的任务完成（异常已由设备工作线程记录）"""
+        if future is None:
+            return False
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception:
+            return False
+
+    async def _run_on_device(self, device_id, func, *args, name=None):
+        """提交设备操作到设备执行器，同一设备串行"""
+        future = self.app.task_scheduler.executor.submit(device_id, func, *args, name=name)
+        return await self._wait_device_task(future)
+
+    async def _run_automation(self, task):
+        """提交到期任务到设备执行器（结束 schedule_wait、开始 device_queue 跟踪阶段）"""
+        return await self._wait_device_task(self.app.task_scheduler.dispatch_task(task))
+
+    async def _log_stats(self):
+        """输出设备执行器、会话池和预热统计"""
+        self.app.log_device_stats()
+
+    async def _check_devices(self):
+        """检查所有映射设备的状态，仅在变化时输出日志"""
+        device_ids = sorted(set(DEVICE_MAPPING.values()))
+        states = await asyncio.gather(*(self.adb.get_state(d) for d in device_ids))
+        for device_id, state in zip(device_ids, states):
+            if self._device_states.get(device_id) != state:
+                logger.info(f"设备状态变化: {device_id} -> {state or '未连接'}")
+                self._device_states[device_id] = state
+
+    async def run(self):
+        """运行所有协作任务直到收到停止信号"""
+        self.loop = asyncio.get_running_loop()
+        self.adb = AsyncADBHelper()
+        self._stop_event = asyncio.Event()
+        self._install_signal_handlers()
+
+        monitor = self.app.excel_monitor
+        monitor.remove_resource_handler(self.app.handle_resource_change)
+        monitor.add_resource_handler(self._on_resource_change)
+        await asyncio.to_thread(monitor.start_monitoring, False)
+
+        loops = [
+            self.loop.create_task(self._every(monitor.poll_interval, self._poll_excel, "Excel轮询")),
+            self.loop.create_task(self._every(1, self._process_rows, "任务处理")),
+            self.loop.create_task(self._every(self.app.task_check_interval, self._check_tasks, "任务检查")),
+            self.loop.create_task(self._every(
+                ASYNC_RUNTIME_CONFIG['DEVICE_CHECK_INTERVAL'], self._check_devices, "设备检查"
+            )),
+            self.loop.create_task(self._every(EXECUTOR_CONFIG['STATS_LOG_INTERVAL'], self._log_stats, "设备统计"))
+        ]
+        logger.info("asyncio运行时已启动")
+
+        try:
+            await self._stop_event.wait()
+        finally:
+            logger.info("收到终止信号，正在关闭服务...")
+            for task in loops:
+                task.cancel()
+            await asyncio.gather(*loops, return_exceptions=True)
+
+            # 等待正在执行的传输和自动化任务
+            if self._background:
+                await asyncio.wait(
+                    list(self._background),
+                    timeout=ASYNC_RUNTIME_CONFIG['SHUTDOWN_TIMEOUT']
+                )
+
+            await asyncio.to_thread(monitor.stop_monitoring)
+            self.app.task_scheduler.shutdown(wait=False)
+            logger.info("asyncio运行时已停止")
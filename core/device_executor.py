@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+设备执行器模块功能：
+1. 每个物理设备序列号对应一个工作线程
+2. 不同设备之间并行执行自动化任务
+3. 同一设备上的任务串行执行，保证设备独占
+4. 统计每个设备的队列深度和忙碌时间
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from utils.logger import get_logger, get_event_logger
+from config.settings import EXECUTOR_CONFIG
+
+logger = get_logger(__name__)
+events = get_event_logger(__name__)
+
+_STOP = object()  # 工作线程停止标记
+
+
+class DeviceWorker:
+    """单个设备的工作线程（任务按提交顺序串行执行）"""
+
+    def __init__(self, device_id):
+        self.device_id = device_id
+        self.queue = queue.Queue()
+        self.busy_since = None   # 当前任务开始时间
+        self.busy_total = 0.0    # 累计忙碌时间（秒）
+        self.completed = 0       # 完成任务数
+        self.failed = 0          # 失败任务数
+        self.current = None      # 当前任务名称
+        self.thread = threading.Thread(
+            target=self._run,
+            name=f"device-{device_id}",
+            daemon=True
+        )
+        self.thread.start()
+
+    def _run(self):
+        """工作线程主循环"""
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+
+            future, name, func, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            self.current = name
+            self.busy_since = time.time()
+            try:
+                result = func(*args, **kwargs)
+                future.set_result(result)
+                if result is False:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+            except Exception as e:
+                logger.error(f"设备任务执行异常: {self.device_id} - {name} - {str(e)}")
+                self.failed += 1
+                future.set_exception(e)
+            finally:
+                self.busy_total += time.time() - self.busy_since
+                self.busy_since = None
+                self.current = None
+
+        logger.debug(f"设备工作线程已退出: {self.device_id}")
+
+    def stats(self):
+        """返回设备统计信息"""
+        busy_since = self.busy_since
+        current_busy = time.time() - busy_since if busy_since else 0.0
+        return {
+            'queue_depth': self.queue.qsize(),
+            'busy': busy_since is not None,
+            'current_task': self.current,
+            'current_busy_seconds': round(current_busy, 3),
+            'busy_seconds': round(self.busy_total + current_busy, 3),
+            'completed': self.completed,
+            'failed': self.failed
+        }
+
+
+class DeviceExecutor:
+    """按设备分发任务的执行器"""
+
+    def __init__(self):
+        self._workers = {}              # 设备序列号 -> DeviceWorker
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self.max_queue_depth = EXECUTOR_CONFIG['MAX_QUEUE_DEPTH']
+        logger.info("设备执行器初始化")
+
+    def _get_worker(self, device_id):
+        """获取（或创建）设备工作线程"""
+        with self._lock:
+            worker = self._workers.get(device_id)
+            if worker is None:
+                worker = DeviceWorker(device_id)
+                self._workers[device_id] = worker
+                logger.info(f"创建设备工作线程: {device_id}")
+            return worker
+
+    def submit(self, device_id, func, *args, name=None, **kwargs):
+        """
+        提交任务到指定设备的队列
+
+        Args:
+            device_id (str): 物理设备序列号
+            func (callable): 要执行的函数
+            name (str): 任务名称（用于日志和统计）
+
+        Returns:
+            Future: 任务结果；队列已满或执行器已关闭时返回None
+        """
+        if self._shutdown:
+            logger.warning(f"执行器已关闭，拒绝任务: {device_id} - {name}")
+            return None
+
+        worker = self._get_worker(device_id)
+        depth = worker.queue.qsize()
+        if self.max_queue_depth and depth >= self.max_queue_depth:
+            logger.error(f"设备队列已满({depth})，拒绝任务: {device_id} - {name}")
+            return None
+
+        future = Future()
+        worker.queue.put((future, name or getattr(func, '__name__', 'task'), func, args, kwargs))
+        events.debug("executor.submit", device_id=device_id, task=name, queue_depth=depth + 1)
+        return future
+
+    def get_stats(self):
+        """获取所有设备的队列深度和忙碌时间"""
+        with self._lock:
+            workers = list(self._workers.values())
+        return {worker.device_id: worker.stats() for worker in workers}
+
+    def is_device_busy(self, device_id):
+        """检查设备是否正在执行或有排队任务"""
+        worker = self._workers.get(device_id)
+        if worker is None:
+            return False
+        return worker.busy_since is not None or not worker.queue.empty()
+
+    def shutdown(self, wait=True, timeout=None):
+        """
+        关闭执行器
+
+        Args:
+            wait (bool): 是否等待正在执行的任务结束
+            timeout (float): 每个设备的最长等待时间（秒）
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            workers = list(self._workers.values())
+
+        for worker in workers:
+            worker.queue.put(_STOP)
+
+        if wait:
+            if timeout is None:
+                timeout = EXECUTOR_CONFIG['SHUTDOWN_TIMEOUT']
+            for worker in workers:
+                worker.thread.join(timeout)
+                if worker.thread.is_alive():
+                    logger.warning(f"设备任务仍在执行，放弃等待: {worker.device_id}")
+
+        logger.info("设备执行器已关闭")
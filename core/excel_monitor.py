@@ -18,15 +18,17 @@ Excel文件监控模块功能：
 """
 
 import os
-import pandas as pd
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-from utils.logger import get_logger
+from utils.lazy_import import lazy_module
+from utils.file_watch import FileWatcher
+from utils.logger import get_logger, get_event_logger
+from utils.metrics import metrics
+from utils.tracing import tracer, trace_key
 import threading
 import time
 from datetime import datetime, timedelta
 import hashlib
 from core.task_validator import TaskValidator
+from core.task_record import TaskRecord
 from config.settings import (
     RESOURCE_DIRS, 
     EXCEL_CONFIG, 
@@ -36,10 +38,15 @@ from config.settings import (
 from utils.excel_backup import ExcelBackup
 
 logger = get_logger(__name__)
+events = get_event_logger(__name__)
+pd = lazy_module('pandas')  # 首次读取Excel时导入
 
+EXCEL_PARSE_SECONDS = metrics.histogram('excel_parse_seconds', 'Excel读取和过滤有效行的耗时（秒）')
+EXCEL_VALID_ROWS = metrics.gauge('excel_valid_rows', '最近一次读取的有效行数')
 
-class ExcelEventHandler(FileSystemEventHandler):
-    """文件系统事件处理器（观察者模式）"""
+
+class ExcelEventHandler:
+    """文件系统事件处理器（观察者模式，由 FileWatcher 转发事件）"""
     
     def __init__(self, monitor):
         self.monitor = monitor  # 所属监控器实例
@@ -69,7 +76,7 @@ class ExcelMonitor:
     def __init__(self, excel_path, headers):
         self.excel_path = excel_path
         self.headers = headers
-        self.observer = Observer()   # 文件系统观察者
+        self.watcher = FileWatcher(os.path.dirname(self.excel_path), ExcelEventHandler(self))  # 文件系统监控
         self.last_data_hash = None   # 上次数据哈希值
         self.last_check_time = 0     # 上次检查时间
         self.poll_interval = 60      # 轮询间隔（秒）
@@ -77,6 +84,7 @@ class ExcelMonitor:
         self._stop_flag = False      # 停止标志
         self._lock = threading.Lock() # 线程锁
         self._data_cache = None      # 数据缓存
+        self._task_records = []      # 与数据缓存对应的任务记录（数据变化时重建）
         self._cache_time = 0         # 缓存时间
         self.cache_ttl = 2           # 缓存有效期
         self.excel_backup = ExcelBackup()
@@ -174,6 +182,21 @@ class ExcelMonitor:
             logger.error(f"过滤数据行失败: {str(e)}")
             return pd.DataFrame()
 
+    def build_task_records(self, valid_rows):
+        """
+        由有效数据行创建任务记录（每次数据变化时执行一次，时间格式错误的行跳过）
+        
+        Returns:
+            list: TaskRecord 列表
+        """
+        if valid_rows.empty:
+            return []
+        # 按列读取（filter_valid_rows 已保证 status 列存在），比 iterrows 逐行构造 Series 快得多
+        records = (TaskRecord.from_row(index, post_name, task_time, status)
+                   for index, post_name, task_time, status
+                   in zip(valid_rows.index, valid_rows['postName'], valid_rows['time'], valid_rows['status']))
+        return [record for record in records if record is not None]
+
     def _ensure_task_directories(self, row):
         """确保任务目录结构存在"""
         try:
@@ -188,14 +211,21 @@ class ExcelMonitor:
             base_dir = os.path.join(RESOURCE_DIRS['UPLOADS'], post_name, dir_name)
             img_dir = os.path.join(base_dir, DIRECTORY_STRUCTURE['TASK_DIR']['IMG_DIR'])
             
-            # 创建目录结构
-            os.makedirs(img_dir, exist_ok=True)
-            
-            # 创建content.txt文件
+            # 目录已存在时无需创建（每次读取Excel都会检查所有行）
             content_file = os.path.join(base_dir, DIRECTORY_STRUCTURE['TASK_DIR']['CONTENT_FILE'])
-            if not os.path.exists(content_file):
-                with open(content_file, 'w', encoding='utf-8') as f:
-                    f.write(DIRECTORY_STRUCTURE['CONTENT_TEMPLATE'])
+            if os.path.isdir(img_dir) and os.path.exists(content_file):
+                return True
+            
+            key = trace_key(post_name, time_str)
+            tracer.instant(key, 'excel_detected')
+            with tracer.span('provision_dirs', key):
+                # 创建目录结构
+                os.makedirs(img_dir, exist_ok=True)
+                
+                # 创建content.txt文件
+                if not os.path.exists(content_file):
+                    with open(content_file, 'w', encoding='utf-8') as f:
+                        f.write(DIRECTORY_STRUCTURE['CONTENT_TEMPLATE'])
             
             logger.info(f"成功创建任务目录: {base_dir}")
             return True
@@ -220,11 +250,11 @@ class ExcelMonitor:
         
         try:
             with self._lock:
-                df = self.read_excel_safe()
-                logger.debug(f"读取到的原始数据行数: {len(df)}")
-                
-                valid_rows = self.filter_valid_rows(df)
-                logger.debug(f"过滤后的有效数据行数: {len(valid_rows)}")
+                with EXCEL_PARSE_SECONDS.time():
+                    df = self.read_excel_safe()
+                    valid_rows = self.filter_valid_rows(df)
+                EXCEL_VALID_ROWS.set(len(valid_rows))
+                events.debug("excel.rows", total=len(df), valid=len(valid_rows))
                 
                 # 如果行数减少，输出详细信息
                 if len(valid_rows) < len(df):
@@ -239,6 +269,7 @@ class ExcelMonitor:
                         logger.info("检测到数据变化")
                     self.last_data_hash = current_hash
                     self._data_cache = valid_rows
+                    self._task_records = self.build_task_records(valid_rows)
                     self._cache_time = current_time
                     
                     # 只在数据变化时输出详细信息
@@ -266,16 +297,20 @@ class ExcelMonitor:
                 logger.error(f"轮询检查时发生错误: {str(e)}")
                 time.sleep(5)  # 错误时延长等待
 
-    def start_monitoring(self):
-        """启动监控服务"""
-        # 初始化文件系统监控
-        event_handler = ExcelEventHandler(self)
-        self.observer.schedule(event_handler, path=os.path.dirname(self.excel_path))
-        self.observer.start()
+    def start_monitoring(self, poll=True):
+        """
+        启动监控服务
+        
+        Args:
+            poll (bool): 是否启动轮询线程（asyncio运行时自行调度轮询）
+        """
+        # 启动文件系统监控
+        self.watcher.start()
 
         # 启动轮询线程
-        self.poll_thread = threading.Thread(target=self.poll_excel, daemon=True)
-        self.poll_thread.start()
+        if poll:
+            self.poll_thread = threading.Thread(target=self.poll_excel, daemon=True)
+            self.poll_thread.start()
 
         logger.info(f"Excel监控服务已启动 - 文件: {self.excel_path}")
         # 初始数据检查
@@ -284,17 +319,27 @@ class ExcelMonitor:
     def stop_monitoring(self):
         """停止监控服务"""
         self._stop_flag = True
-        self.observer.stop()
-        self.observer.join()
+        self.watcher.stop()
         logger.info("Excel监控服务已停止")
 
     def get_valid_rows(self):
         """获取有效数据行（使用缓存）"""
         return self.check_excel_data(force_check=False)
 
+    def get_task_records(self):
+        """获取有效数据行对应的任务记录（使用缓存，读取失败时返回空列表）"""
+        if self.check_excel_data(force_check=False).empty:
+            return []
+        return self._task_records
+
     def add_resource_handler(self, handler):
         """添加资源变化处理器"""
         self.resource_handlers.append(handler)
+    
+    def remove_resource_handler(self, handler):
+        """移除资源变化处理器"""
+        if handler in self.resource_handlers:
+            self.resource_handlers.remove(handler)
         
     def handle_resource_change(self, file_path):
         """处理资源文件变化"""
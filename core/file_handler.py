@@ -17,21 +17,28 @@
 """
 
 import os
+import asyncio
+import time
 from utils.adb_utils import ADBHelper
+from core.media_manifest import media_manifests
 from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.tracing import tracer
 from config.settings import DEVICE_MAPPING, TASK_STATUS, LOG_DIR, DEVICE_PATHS
 from datetime import datetime
-import subprocess
-import hashlib
 
 logger = get_logger(__name__)
 
+TRANSFER_FILES = metrics.counter('transfer_files_total', '文件传输次数', ['result'])
+TRANSFER_BYTES = metrics.counter('transfer_bytes_total', '成功传输的字节数')
+TRANSFER_SECONDS = metrics.histogram('transfer_batch_seconds', '一个任务的变化文件全部传输完成的耗时（秒）')
+
 class FileHandler:
     def __init__(self, root_dir):
         self.root_dir = root_dir       # 项目根目录
         self.adb_helper = ADBHelper()  # ADB工具实例
         self.transfer_log_path = os.path.join(LOG_DIR, 'transfer_history.log')
-        self.file_hashes = {}  # 存储文件哈希值
+        self.transferred = {}  # 本地文件路径 -> 已传输成功的文件哈希
     
     def _convert_time_format(self, time_str):
         """转换时间格式为目录格式"""
@@ -101,37 +108,71 @@ class FileHandler:
             logger.error(f"构建目标路径失败: {str(e)}")
             raise
 
-    def _calculate_file_hash(self, file_path):
-        """计算文件的MD5哈希值"""
-        try:
-            with open(file_path, 'rb') as f:
-                return hashlib.md5(f.read()).hexdigest()
-        except Exception:
-            return None
-            
-    def _check_file_changed(self, file_path):
-        """检查文件是否发生变化"""
-        current_hash = self._calculate_file_hash(file_path)
-        if not current_hash:
-            return True
-            
-        previous_hash = self.file_hashes.get(file_path)
-        self.file_hashes[file_path] = current_hash
-        return previous_hash != current_hash
+    def _collect_changed_files(self, post_name, dir_time):
+        """
+        通过媒体清单找出需要传输的文件（目录扫描和哈希由清单增量完成）
+        
+        Args:
+            post_name (str): 设备名称
+            dir_time (str): 时间文件夹名
+        
+        Returns:
+            tuple: (状态, 媒体清单, 变化的文件列表)；状态为None表示需要传输
+        """
+        manifest = media_manifests.get(self.root_dir, post_name, dir_time)
+        logger.debug(f"检查目录: {manifest.base_dir}")
+        
+        if manifest.status == "WAITING_MEDIA":
+            logger.info(f"等待媒体文件目录: {manifest.source_dir}")
+            return "WAITING_MEDIA", manifest, []
+        
+        if manifest.status == "NO_MEDIA_FILES":
+            logger.info(f"没有找到媒体文件: {manifest.source_dir}")
+            return "NO_MEDIA_FILES", manifest, []
+        
+        logger.info(f"找到 {len(manifest.entries)} 个媒体文件")
+        
+        # 只传输上次成功传输后发生变化的文件
+        changed_files = [entry for entry in manifest.entries
+                         if self.transferred.get(entry.path) != entry.hash]
+        
+        if not changed_files:
+            logger.debug("没有检测到文件变化，跳过传输")
+            return "NO_CHANGES", manifest, []
+        
+        return None, manifest, changed_files
+    
+    def _summarize_transfer(self, changed_files, success_count, failed_files, seconds):
+        """汇总传输结果"""
+        failed_paths = {entry.path for entry, _ in failed_files}
+        TRANSFER_SECONDS.observe(seconds)
+        TRANSFER_FILES.labels('success').inc(success_count)
+        TRANSFER_FILES.labels('failed').inc(len(failed_files))
+        TRANSFER_BYTES.inc(sum(entry.size for entry in changed_files if entry.path not in failed_paths))
+        
+        # 简化的结果输出
+        if failed_files:
+            logger.info(f"传输完成: {success_count}/{len(changed_files)} 成功")
+            # 详细失败信息写入debug日志
+            for entry, error in failed_files:
+                logger.debug(f"失败: {entry.name} - {error}")
+            return False, "TRANSFER_INCOMPLETE"
+        else:
+            logger.info(f"传输成功: {success_count}/{len(changed_files)}")
+            return True, "SUCCESS"
         
     def transfer_images(self, post_name, time_str):
         """传输文件并确保完成"""
+        return self._transfer(post_name, DEVICE_MAPPING.get(post_name), time_str,
+                              self._convert_time_format(time_str))
+    
+    def transfer_task(self, task):
+        """传输任务记录对应的文件（设备和目录名在创建记录时已计算）"""
+        return self._transfer(task.post_name, task.device_id, task.time_str, task.dir_name)
+    
+    def _transfer(self, post_name, device_id, time_str, dir_time):
         try:
-            # 初始化传输状态
-            transfer_summary = {
-                'total': 0,
-                'success': 0,
-                'failed': 0,
-                'failed_files': []
-            }
-            
             # 首先检查设备连接
-            device_id = DEVICE_MAPPING.get(post_name)
             if not device_id:
                 logger.error(f"设备映射未找到: {post_name}")
                 return False, "DEVICE_NOT_FOUND"
@@ -140,75 +181,107 @@ class FileHandler:
                 logger.error(f"设备未连接: {device_id}")
                 return False, "DEVICE_NOT_CONNECTED"
             
-            # 构建源目录路径
-            dir_time = self._convert_time_format(time_str)
-            base_dir = os.path.join(self.root_dir, post_name, dir_time)
-            source_dir = os.path.join(base_dir, 'img')
-            
-            # 添加路径调试信息
-            logger.debug(f"检查目录: {base_dir}")
-            logger.debug(f"图片目录: {source_dir}")
-            
-            # 检查媒体目录
-            if not os.path.exists(source_dir):
-                logger.info(f"等待媒体文件目录: {source_dir}")
-                return False, "WAITING_MEDIA"
-            
-            # 获取所有媒体文件并输出调试信息
-            media_files = [f for f in os.listdir(source_dir) 
-                         if f.lower().endswith(('.png', '.jpg', '.jpeg', '.mp4'))]
-            
-            if not media_files:
-                logger.info(f"没有找到媒体文件: {source_dir}")
-                return False, "NO_MEDIA_FILES"
-            
-            logger.info(f"找到 {len(media_files)} 个媒体文件")
-            
-            # 检查文件变化
-            changed_files = []
-            for media_file in media_files:
-                file_path = os.path.join(source_dir, media_file)
-                if self._check_file_changed(file_path):
-                    changed_files.append(media_file)
-            
-            if not changed_files:
-                logger.debug("没有检测到文件变化，跳过传输")
-                return True, "NO_CHANGES"
+            trace_start = tracer.now()
+            status, manifest, changed_files = self._collect_changed_files(post_name, dir_time)
+            if status is not None:
+                # 没有文件需要传输时不记录追踪（主循环每秒检查一次，否则会占满任务的事件上限）
+                return status == "NO_CHANGES", status
+            tracer.complete('media_manifest', trace_start)
             
             # 只传输发生变化的文件
             logger.info(f"开始传输变化的文件 - {post_name} ({len(changed_files)}个文件)")
             
             success_count = 0
             failed_files = []
+            start = time.perf_counter()
             
-            for media_file in changed_files:
+            for entry in changed_files:
                 try:
-                    source_path = os.path.join(source_dir, media_file)
-                    target_path = self._get_target_path(device_id, source_path, time_str)
+                    target_path = entry.remote_path or self._get_target_path(device_id, entry.path, time_str)
                     
                     # 详细日志写入文件
-                    logger.debug(f"传输: {media_file} -> {target_path}")
+                    logger.debug(f"传输: {entry.name} -> {target_path}")
                     
-                    success, status = self.adb_helper.push_file(device_id, source_path, target_path)
+                    with tracer.span('adb_push', file=entry.name, size=entry.size):
+                        success, status = self.adb_helper.push_file(device_id, entry.path, target_path)
                     if success:
                         success_count += 1
+                        self.transferred[entry.path] = entry.hash
                     else:
-                        failed_files.append((media_file, status))
+                        failed_files.append((entry, status))
                         
                 except Exception as e:
-                    failed_files.append((media_file, str(e)))
-                    logger.debug(f"文件传输失败: {media_file} - {str(e)}")
+                    failed_files.append((entry, str(e)))
+                    logger.debug(f"文件传输失败: {entry.name} - {str(e)}")
             
-            # 简化的结果输出
-            if failed_files:
-                logger.info(f"传输完成: {success_count}/{len(changed_files)} 成功")
-                # 详细失败信息写入debug日志
-                for file, error in failed_files:
-                    logger.debug(f"失败: {file} - {error}")
-                return False, "TRANSFER_INCOMPLETE"
-            else:
-                logger.info(f"传输成功: {success_count}/{len(changed_files)}")
-                return True, "SUCCESS"
+            tracer.complete('transfer', trace_start, files=len(changed_files))
+            return self._summarize_transfer(changed_files, success_count, failed_files,
+                                            time.perf_counter() - start)
+            
+        except Exception as e:
+            logger.error(f"传输过程出错: {str(e)}")
+            return False, "FAILED"
+
+    async def transfer_images_async(self, adb, post_name, time_str):
+        """
+        异步传输文件（asyncio运行时使用）
+        
+        Args:
+            adb (AsyncADBHelper): 异步ADB工具实例
+            post_name (str): 设备名称
+            time_str: 计划时间
+        """
+        return await self._transfer_async(adb, post_name, DEVICE_MAPPING.get(post_name), time_str,
+                                          self._convert_time_format(time_str))
+    
+    async def transfer_task_async(self, adb, task):
+        """异步传输任务记录对应的文件"""
+        return await self._transfer_async(adb, task.post_name, task.device_id, task.time_str, task.dir_name)
+    
+    async def _transfer_async(self, adb, post_name, device_id, time_str, dir_time):
+        try:
+            if not device_id:
+                logger.error(f"设备映射未找到: {post_name}")
+                return False, "DEVICE_NOT_FOUND"
+            
+            if not await adb.is_device_connected(device_id):
+                logger.error(f"设备未连接: {device_id}")
+                return False, "DEVICE_NOT_CONNECTED"
+            
+            # 目录扫描和哈希计算放到线程中，避免阻塞事件循环
+            trace_start = tracer.now()
+            status, manifest, changed_files = await asyncio.to_thread(
+                self._collect_changed_files, post_name, dir_time
+            )
+            if status is not None:
+                # 没有文件需要传输时不记录追踪
+                return status == "NO_CHANGES", status
+            tracer.complete('media_manifest', trace_start)
+            
+            logger.info(f"开始传输变化的文件 - {post_name} ({len(changed_files)}个文件)")
+            
+            async def push(entry):
+                try:
+                    target_path = entry.remote_path or self._get_target_path(device_id, entry.path, time_str)
+                    logger.debug(f"传输: {entry.name} -> {target_path}")
+                    with tracer.span('adb_push', file=entry.name, size=entry.size):
+                        return entry, await adb.push_file(device_id, entry.path, target_path)
+                except Exception as e:
+                    logger.debug(f"文件传输失败: {entry.name} - {str(e)}")
+                    return entry, (False, str(e))
+            
+            # 单设备并发数由 AsyncADBHelper 的设备信号量控制
+            start = time.perf_counter()
+            results = await asyncio.gather(*(push(entry) for entry in changed_files))
+            
+            for entry, (success, _) in results:
+                if success:
+                    self.transferred[entry.path] = entry.hash
+            success_count = sum(1 for _, (success, _) in results if success)
+            failed_files = [(entry, status) for entry, (success, status) in results if not success]
+            tracer.complete('transfer', trace_start, files=len(changed_files))
+            return self._summarize_transfer(changed_files, success_count, failed_files,
+                                            time.perf_counter() - start)
             
         except Exception as e:
             logger.error(f"传输过程出错: {str(e)}")
@@ -233,44 +306,6 @@ class FileHandler:
                 else:
                     logger.error(f"- {fail['file']}: {fail['status']}")
 
-    def _transfer_and_verify(self, device_id, source_path, time_str):
-        """传输单个文件并验证"""
-        try:
-            # 获取目标路径
-            target_path = self._get_target_path(device_id, source_path, time_str)
-            
-            # 执行传输
-            success, status = self.adb_helper.push_file(device_id, source_path, target_path)
-            if not success:
-                return False, status
-            
-            # 验证文件是否成功传输
-            if self._verify_file_transfer(device_id, target_path):
-                return True, "SUCCESS"
-            else:
-                return False, "VERIFICATION_FAILED"
-                
-        except Exception as e:
-            logger.error(f"文件传输验证失败: {str(e)}")
-            return False, "FAILED"
-
-    def _verify_file_transfer(self, device_id, target_path):
-        """验证文件传输是否成功"""
-        try:
-            # 使用ADB检查文件是否存在且大小正确
-            command = [
-                ADB_COMMAND,
-                '-s', device_id,
-                'shell',
-                f'ls -l "{target_path}"'
-            ]
-            
-            result = subprocess.run(command, capture_output=True, text=True)
-            return result.returncode == 0 and len(result.stdout.strip()) > 0
-            
-        except Exception:
-            return False
-
     def is_transfer_completed(self, post_name, time_str):
         """检查任务是否已经完成传输"""
         try:
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+媒体清单模块功能：
+1. 每个任务的媒体目录生成一份有序清单（大小、修改时间、哈希、类型、设备路径）
+2. 清单缓存在内存中，传输、调度和自动化共用同一份
+3. 目录或文件变化时增量刷新，只对变化的文件重新计算哈希
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from utils.logger import get_logger
+from config.settings import DEVICE_MAPPING, DEVICE_PATHS, DIRECTORY_STRUCTURE, MEDIA_CONFIG
+
+logger = get_logger(__name__)
+
+
+class MediaEntry:
+    """清单中的一个媒体文件"""
+
+    __slots__ = ('name', 'path', 'size', 'mtime', 'hash', 'type', 'remote_path')
+
+    def __init__(self, name, path, size, mtime, file_hash, media_type, remote_path):
+        self.name = name
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.hash = file_hash
+        self.type = media_type
+        self.remote_path = remote_path
+
+    def __repr__(self):
+        return f"MediaEntry({self.name}, {self.type}, {self.size}B)"
+
+
+class MediaManifest:
+    """单个任务的媒体清单"""
+
+    def __init__(self, root_dir, post_name, dir_name):
+        self.post_name = post_name
+        self.dir_name = dir_name   # 时间文件夹名（YYYY-MM-DD_HH-MM）
+        self.base_dir = os.path.join(root_dir, post_name, dir_name)
+        self.source_dir = os.path.join(self.base_dir, DIRECTORY_STRUCTURE['TASK_DIR']['IMG_DIR'])
+        base_path = DEVICE_PATHS.get(DEVICE_MAPPING.get(post_name))
+        self.remote_dir = f"{base_path.rstrip('/')}/{dir_name}" if base_path else None
+        self.entries = []          # 按文件名排序的媒体文件
+        self.status = None         # None 或 WAITING_MEDIA / NO_MEDIA_FILES
+        self.version = 0           # 内容变化时递增
+        self.hashed = 0            # 累计计算哈希的文件数
+        self._dir_mtime = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash_file(path):
+        md5 = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+
+    def refresh(self):
+        """
+        增量刷新：目录未变化时只检查已知文件的大小和修改时间，
+        只对新增或变化的文件计算哈希
+
+        Returns:
+            bool: 清单内容是否发生变化
+        """
+        with self._lock:
+            try:
+                dir_mtime = os.stat(self.source_dir).st_mtime_ns
+            except FileNotFoundError:
+                changed = self.status != "WAITING_MEDIA"
+                self.entries, self.status, self._dir_mtime = [], "WAITING_MEDIA", None
+                if changed:
+                    self.version += 1
+                return changed
+
+            if dir_mtime != self._dir_mtime:
+                extensions = MEDIA_CONFIG['EXTENSIONS']
+                names = sorted(name for name in os.listdir(self.source_dir)
+                               if os.path.splitext(name)[1].lower() in extensions)
+                self._dir_mtime = dir_mtime
+            else:
+                names = [entry.name for entry in self.entries]
+
+            known = {entry.name: entry for entry in self.entries}
+            entries = []
+            changed = len(names) != len(self.entries)
+            for name in names:
+                path = os.path.join(self.source_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    changed = True
+                    continue
+                entry = known.get(name)
+                if entry is None or entry.size != stat.st_size or entry.mtime != stat.st_mtime_ns:
+                    entry = MediaEntry(
+                        name, path, stat.st_size, stat.st_mtime_ns, self._hash_file(path),
+                        MEDIA_CONFIG['EXTENSIONS'][os.path.splitext(name)[1].lower()],
+                        f"{self.remote_dir}/{name}" if self.remote_dir else None
+                    )
+                    self.hashed += 1
+                    changed = True
+                entries.append(entry)
+
+            self.entries = entries
+            status = None if entries else "NO_MEDIA_FILES"
+            changed = changed or status != self.status
+            self.status = status
+            if changed:
+                self.version += 1
+                logger.debug(f"媒体清单已更新: {self.source_dir} ({len(entries)} 个文件)")
+            return changed
+
+    @property
+    def paths(self):
+        return [entry.path for entry in self.entries]
+
+
+class MediaManifestCache:
+    """媒体清单缓存（按 根目录/设备名/时间文件夹 索引，超过上限时淘汰最久未使用的）"""
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or MEDIA_CONFIG['MANIFEST_CACHE_SIZE']
+        self._manifests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, root_dir, post_name, dir_name):
+        """获取任务的媒体清单（已增量刷新）"""
+        key = (root_dir, post_name, dir_name)
+        with self._lock:
+            manifest = self._manifests.get(key)
+            if manifest is None:
+                manifest = MediaManifest(root_dir, post_name, dir_name)
+                self._manifests[key] = manifest
+                while len(self._manifests) > self.max_entries:
+                    self._manifests.popitem(last=False)
+            else:
+                self._manifests.move_to_end(key)
+        manifest.refresh()
+        return manifest
+
+    def discard(self, root_dir, post_name, dir_name):
+        """移除任务的媒体清单"""
+        with self._lock:
+            self._manifests.pop((root_dir, post_name, dir_name), None)
+
+
+# 创建全局实例
+media_manifests = MediaManifestCache()
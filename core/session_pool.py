@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+设备会话池模块功能：
+1. 每个设备序列号保持一个长连接的 uiautomator2 设备对象
+2. 以独占租约的方式提供给自动化代码
+3. 后台线程对空闲会话做健康检查
+4. 健康检查或租用时发现连接失效则自动重连
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from utils import device_driver
+from utils.logger import get_logger
+from config.settings import SESSION_POOL_CONFIG
+
+logger = get_logger(__name__)
+
+
+class DeviceSession:
+    """单个设备的会话"""
+
+    def __init__(self, device_id):
+        self.device_id = device_id
+        self.device = None         # uiautomator2 设备对象
+        self.lock = threading.Lock()  # 租约锁（同一时间只允许一个使用者）
+        self.last_check = 0        # 最近一次确认可用的时间
+        self.connects = 0          # 建立连接的次数
+        self.leases = 0            # 被租用的次数
+
+
+class DeviceSessionPool:
+    """uiautomator2 设备会话池"""
+
+    def __init__(self, connect=None):
+        """
+        Args:
+            connect (callable): 建立设备连接的函数，默认 device_driver.connect（首次连接时导入 uiautomator2）
+        """
+        self._connect = connect or device_driver.connect
+        self._sessions = {}        # 设备序列号 -> DeviceSession
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._health_thread = None
+        self.check_interval = SESSION_POOL_CONFIG['HEALTH_CHECK_INTERVAL']
+        self.verify_after = SESSION_POOL_CONFIG['VERIFY_AFTER']
+        self.lease_timeout = SESSION_POOL_CONFIG['LEASE_TIMEOUT']
+
+    def _get_session(self, device_id):
+        """获取（或创建）设备会话"""
+        with self._lock:
+            session = self._sessions.get(device_id)
+            if session is None:
+                session = DeviceSession(device_id)
+                self._sessions[device_id] = session
+            return session
+
+    def _is_healthy(self, session):
+        """通过一次轻量RPC检查会话是否可用"""
+        try:
+            session.device.info
+            session.last_check = time.time()
+            return True
+        except Exception as e:
+            logger.warning(f"设备会话不可用: {session.device_id} - {str(e)}")
+            return False
+
+    def _reconnect(self, session):
+        """重新建立设备连接"""
+        start = time.perf_counter()
+        session.device = self._connect(session.device_id)
+        session.last_check = time.time()
+        session.connects += 1
+        logger.info(f"设备会话已连接: {session.device_id}, 耗时 {time.perf_counter() - start:.2f}秒")
+
+    def _ensure_connected(self, session):
+        """确保会话可用（调用方需持有会话锁）"""
+        if session.device is None:
+            self._reconnect(session)
+        elif time.time() - session.last_check > self.verify_after and not self._is_healthy(session):
+            self._reconnect(session)
+
+    @contextmanager
+    def lease(self, device_id):
+        """
+        租用设备会话（独占）
+
+        用法:
+            with pool.lease(device_id) as d:
+                d.screen_on()
+        """
+        session = self._get_session(device_id)
+        if not session.lock.acquire(timeout=self.lease_timeout):
+            raise TimeoutError(f"等待设备会话超时: {device_id}")
+        try:
+            self._ensure_connected(session)
+            session.leases += 1
+            try:
+                yield session.device
+            except Exception:
+                # 使用过程中出错时，下次租用前强制检查连接
+                session.last_check = 0
+                raise
+        finally:
+            session.lock.release()
+
+    def _health_loop(self):
+        """后台健康检查：只检查空闲会话，失败则重连"""
+        while not self._stop_event.wait(self.check_interval):
+            with self._lock:
+                sessions = list(self._sessions.values())
+            for session in sessions:
+                if session.device is None or not session.lock.acquire(blocking=False):
+                    continue  # 未连接或正在使用
+                try:
+                    if not self._is_healthy(session):
+                        self._reconnect(session)
+                except Exception as e:
+                    logger.error(f"设备会话重连失败: {session.device_id} - {str(e)}")
+                    session.device = None
+                finally:
+                    session.lock.release()
+
+    def start(self):
+        """启动后台健康检查线程"""
+        if self._health_thread is None:
+            self._health_thread = threading.Thread(
+                target=self._health_loop,
+                name="session-health",
+                daemon=True
+            )
+            self._health_thread.start()
+
+    def stop(self):
+        """停止健康检查"""
+        self._stop_event.set()
+        if self._health_thread is not None:
+            self._health_thread.join(timeout=5)
+            self._health_thread = None
+
+    def get_stats(self):
+        """获取会话统计信息"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            s.device_id: {
+                'connected': s.device is not None,
+                'in_use': s.lock.locked(),
+                'connects': s.connects,
+                'leases': s.leases
+            }
+            for s in sessions
+        }
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+步骤计时模块功能：
+1. 将发布流程的每个步骤包装为命名的计时区间
+2. 记录每个步骤的耗时、结果和重试次数
+3. 按设备、步骤在内存中保留耗时样本，计算 p50/p95/max
+4. 将统计结果写入JSON文件，便于分析
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from utils.logger import get_logger
+from utils.tracing import tracer
+from config.settings import STEP_TIMING_CONFIG
+
+logger = get_logger(__name__)
+
+
+class StepTimer:
+    """单次发布流程的步骤计时"""
+
+    def __init__(self, device_id, stats=None):
+        self.device_id = device_id
+        self.stats = stats if stats is not None else step_stats
+        self.steps = []      # [{'name', 'seconds', 'ok', 'retries'}]
+        self._retries = {}   # 步骤名 -> 重试次数
+        self.resumes = []    # 流程中断后的续跑记录
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, name):
+        """计时区间（区间内抛出异常时记为失败并继续抛出）"""
+        start = time.perf_counter()
+        ok = False
+        try:
+            with tracer.span(name):  # 归属到当前追踪的任务
+                yield
+            ok = True
+        finally:
+            seconds = time.perf_counter() - start
+            self.steps.append({
+                'name': name,
+                'seconds': round(seconds, 3),
+                'ok': ok,
+                'retries': self._retries.get(name, 0)
+            })
+            self.stats.record(self.device_id, name, seconds)
+
+    def retry(self, name):
+        """记录步骤的一次重试"""
+        self._retries[name] = self._retries.get(name, 0) + 1
+
+    def resume(self, failed_step, status, screen, resumed_from):
+        """记录一次续跑：失败的步骤、识别到的界面和续跑的起始步骤"""
+        self.retry(resumed_from)
+        self.resumes.append({
+            'failed_step': failed_step,
+            'status': status,
+            'screen': screen,
+            'resumed_from': resumed_from
+        })
+
+    def report(self, status):
+        """生成任务结果（状态 + 各步骤耗时 + 重试次数 + 续跑记录）"""
+        return {
+            'status': status,
+            'total_seconds': round(time.perf_counter() - self._start, 3),
+            'retries': sum(self._retries.values()),
+            'steps': self.steps,
+            'resumes': self.resumes
+        }
+
+
+class StepStats:
+    """按设备、步骤保存耗时样本"""
+
+    def __init__(self, max_samples=None):
+        self.max_samples = max_samples or STEP_TIMING_CONFIG['MAX_SAMPLES']
+        self._samples = {}   # (设备, 步骤) -> deque
+        self._lock = threading.Lock()
+
+    def record(self, device_id, step, seconds):
+        key = (device_id, step)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = deque(maxlen=self.max_samples)
+                self._samples[key] = samples
+            samples.append(seconds)
+
+    @staticmethod
+    def _percentile(sorted_values, percent):
+        index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+        return sorted_values[index]
+
+    def summary(self):
+        """返回 {设备: {步骤: {count, p50, p95, max}}}"""
+        with self._lock:
+            items = [(key, sorted(samples)) for key, samples in self._samples.items()]
+
+        result = {}
+        for (device_id, step), values in items:
+            if not values:
+                continue
+            result.setdefault(device_id, {})[step] = {
+                'count': len(values),
+                'p50': round(self._percentile(values, 50), 3),
+                'p95': round(self._percentile(values, 95), 3),
+                'max': round(values[-1], 3)
+            }
+        return result
+
+    def dump(self, path=None):
+        """将统计结果写入JSON文件"""
+        path = path or STEP_TIMING_CONFIG['DUMP_PATH']
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'devices': self.summary()
+                }, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.error(f"写入步骤耗时统计失败: {str(e)}")
+
+
+# 创建全局实例
+step_stats = StepStats()
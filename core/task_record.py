@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+任务记录模块功能：
+1. 不可变的任务记录（__slots__，无实例字典），读取Excel时每行创建一次
+2. 设备序列号、计划时间戳、目录名等派生字段在创建时计算，调度、传输和自动化各层直接使用
+3. 替代在队列中保存 pandas Series（索引和 dtype 开销大，字段访问慢）
+"""
+
+from datetime import datetime
+from config.settings import DEVICE_MAPPING, TASK_VALIDATION
+
+
+def _clean(value):
+    """单元格值转为去空白的字符串（空单元格为 NaN 或 None）"""
+    if value is None or value != value:
+        return ''
+    return str(value).strip()
+
+
+class TaskRecord:
+    """
+    一个发布任务
+
+    Attributes:
+        post_name (str): 设备逻辑名称（Excel postName 列）
+        device_id (str): 设备序列号，未配置时为 None
+        due (float): 计划执行时间（时间戳，秒）
+        time_str (str): 计划时间（'YYYY-MM-DD HH:MM:SS'，与Excel和任务日志一致）
+        dir_name (str): 任务资源目录名（'YYYY-MM-DD_HH-MM'）
+        status (str): 读取Excel时的状态列
+        row_id: Excel行索引（回写状态用），从任务日志恢复时为 None
+        task_id (str): 任务ID（'postName_time'）
+    """
+
+    __slots__ = ('post_name', 'device_id', 'due', 'time_str', 'dir_name', 'status', 'row_id', 'task_id')
+
+    def __init__(self, post_name, time_str, status='', row_id=None):
+        """
+        Raises:
+            ValueError: 时间格式不正确
+        """
+        dt = datetime.strptime(time_str, TASK_VALIDATION['TIME_FORMAT'])
+        init = object.__setattr__
+        init(self, 'post_name', post_name)
+        init(self, 'device_id', DEVICE_MAPPING.get(post_name))
+        init(self, 'due', dt.timestamp())
+        init(self, 'time_str', time_str)
+        init(self, 'dir_name', dt.strftime('%Y-%m-%d_%H-%M'))
+        init(self, 'status', status)
+        init(self, 'row_id', row_id)
+        init(self, 'task_id', f"{post_name}_{time_str}")
+
+    @classmethod
+    def from_row(cls, row_id, post_name, task_time, status=None):
+        """
+        由Excel单元格值创建
+
+        Returns:
+            TaskRecord: 时间格式不正确时返回 None
+        """
+        try:
+            return cls(_clean(post_name), _clean(task_time), _clean(status), row_id)
+        except ValueError:
+            return None
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"TaskRecord 不可修改: {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"TaskRecord 不可修改: {name}")
+
+    def __repr__(self):
+        return f"TaskRecord({self.post_name!r}, {self.time_str!r}, status={self.status!r}, row_id={self.row_id!r})"
@@ -13,159 +13,428 @@
 1. 管理定时任务队列
 2. 添加未来执行任务
 3. 提供安卓自动化接口
+4. 按设备并行执行到期任务
+5. 持久化任务队列，重启后快速恢复
+6. 截止时间前预热设备（解锁并启动应用）
+7. 通过会话池复用设备连接
+8. 队列保存不可变的 TaskRecord（读取Excel时创建，时间已解析为时间戳）
 """
 
-from datetime import datetime
+import threading
 import time
-from utils.logger import get_logger
+from utils.logger import get_logger, get_event_logger
 import os
 from core.android_automation import AndroidAutomation
-from utils.content_reader import ContentReader
-from config.settings import ROOT_DIR, DEVICE_MAPPING
+from core.device_executor import DeviceExecutor
+from core.task_store import TaskStore
+from core.session_pool import DeviceSessionPool
+from core.task_record import TaskRecord
+from core.media_manifest import media_manifests
+from utils.content_reader import content_cache
+from utils.metrics import metrics
+from utils.tracing import tracer, trace_key
+from config.settings import ROOT_DIR, TASK_VALIDATION, WARMUP_CONFIG, DIRECTORY_STRUCTURE
 
 logger = get_logger(__name__)
+events = get_event_logger(__name__)
+
+TASK_QUEUE_DEPTH = metrics.gauge('task_queue_depth', '等待执行的任务数')
+DEVICE_QUEUE_DEPTH = metrics.gauge('device_queue_depth', '设备执行器排队的任务数', ['device'])
+TASKS_EXECUTED = metrics.counter('tasks_executed_total', '执行完成的任务数', ['result'])
 
 class TaskScheduler:
-    def __init__(self):
-        self.tasks = []  # 任务队列
+    def __init__(self, executor=None, store=None, session_pool=None, root_dir=None):
+        self.tasks = []  # 任务队列（TaskRecord）
+        self._task_ids = set()  # 队列中的任务ID（去重）
+        self.root_dir = root_dir or ROOT_DIR  # 任务资源根目录
+        self._lock = threading.Lock()  # 保护任务队列（asyncio运行时会在线程中添加任务）
+        self.interrupted_tasks = []  # 上次崩溃时正在执行的任务（确认前保留在任务日志中）
+        self.executor = executor or DeviceExecutor()  # 设备执行器
+        self.store = store or TaskStore()  # 任务队列持久化
+        self.session_pool = session_pool or DeviceSessionPool()  # 设备会话池
+        self.session_pool.start()
+        self.warm_sessions = {}  # 设备序列号 -> 预热会话
+        self._warming = set()    # 已安排预热、尚未到期的任务ID
+        self.warmup_stats = {
+            'warmed': 0,           # 预热成功次数
+            'failed': 0,           # 预热失败次数（连接、解锁或启动应用失败）
+            'used': 0,             # 预热会话被任务使用的次数
+            'expired': 0,          # 超时释放的预热会话数
+            'saved_seconds': 0.0,  # 预热节省的累计时间
+            'cold': 0,             # 未预热直接执行的次数
+            'cold_seconds': 0.0    # 未预热时准备设备的累计时间
+        }
+        self._restore_tasks()
+        
+        # 抓取指标时读取队列深度
+        TASK_QUEUE_DEPTH.set_function(lambda: len(self.tasks))
+        DEVICE_QUEUE_DEPTH.set_function(lambda: {
+            (device_id,): stats['queue_depth'] for device_id, stats in self.executor.get_stats().items()
+        })
         logger.info("任务调度器初始化")
     
-    def add_task(self, row):
-        """添加新任务到队列"""
+    def _restore_tasks(self):
+        """从任务日志恢复队列（不访问设备，不重新计算媒体哈希）"""
         try:
-            # 确保时间是字符串格式
-            time_str = str(row['time'])
-            task_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S')
+            pending, interrupted = self.store.load()
+            expire_time = time.time() - TASK_VALIDATION['BUFFER_MINUTES'] * 60
+            
+            for record in pending:
+                task = TaskRecord(record['postName'], record['time'])
+                if task.due <= expire_time:
+                    logger.warning(f"丢弃已过期的持久化任务: {record['postName']} - {record['time']}")
+                    self.store.record_remove(record['id'])
+                    continue
+                self.tasks.append(task)
+                self._task_ids.add(task.task_id)
             
-            # 添加调试信息：检查任务时间
-            now = datetime.now()
-            time_diff = task_time - now
-            logger.debug(f"任务时间检查 - 当前时间: {now}, 任务时间: {task_time}, 相差: {time_diff}")
+            # 中断的任务可能已经部分发布，不自动重试，交由人工确认
+            for record in interrupted:
+                logger.warning(f"检测到上次运行中断的任务: {record['postName']} - {record['time']}")
+                self.interrupted_tasks.append(record)
+            
+            if self.tasks:
+                logger.info(f"已恢复 {len(self.tasks)} 个待执行任务")
+        except Exception as e:
+            logger.error(f"恢复任务队列失败: {str(e)}")
+    
+    def acknowledge_interrupted(self, task_id):
+        """中断的任务已处理（如已在Excel中标记），从任务日志中移除"""
+        self.interrupted_tasks = [record for record in self.interrupted_tasks if record['id'] != task_id]
+        self.store.record_remove(task_id)
+    
+    def add_task(self, task):
+        """
+        添加新任务到队列
+        
+        Args:
+            task (TaskRecord): 任务记录
+        """
+        try:
+            now = time.time()
+            events.debug("task.time_check", post_name=task.post_name, task_time=task.time_str,
+                         seconds_until=round(task.due - now))
             
             # 检查是否已存在相同的任务
-            task_id = f"{row['postName']}_{time_str}"
-            existing_tasks = [f"{t['data']['postName']}_{t['time'].strftime('%Y-%m-%d %H:%M:%S')}" 
-                             for t in self.tasks]
-            
-            if task_id not in existing_tasks and task_time > now:
-                self.tasks.append({
-                    'time': task_time,
-                    'data': row
-                })
-                logger.info(f"成功添加新任务: {row['postName']} - {time_str}")
-                logger.debug(f"当前任务队列长度: {len(self.tasks)}")
-                logger.debug(f"任务队列内容: {[{t['data']['postName']: t['time']} for t in self.tasks]}")
+            with self._lock:
+                duplicate = task.task_id in self._task_ids
+                added = not duplicate and task.due > now
+                if added:
+                    self.tasks.append(task)
+                    self._task_ids.add(task.task_id)
+            
+            if added:
+                self.store.record_add(task.task_id, task.post_name, task.time_str)
+                tracer.begin(trace_key(task.post_name, task.time_str), 'schedule_wait')
+                logger.info(f"成功添加新任务: {task.post_name} - {task.time_str}")
+                events.debug("task.queue", queue_length=len(self.tasks))
             else:
-                if task_id in existing_tasks:
-                    logger.warning(f"跳过重复任务: {row['postName']} - {time_str}")
+                if duplicate:
+                    logger.warning(f"跳过重复任务: {task.post_name} - {task.time_str}")
                 else:
-                    logger.warning(f"跳过过期任务: {row['postName']} - {time_str}")
+                    logger.warning(f"跳过过期任务: {task.post_name} - {task.time_str}")
         except Exception as e:
             logger.error(f"添加任务失败: {str(e)}")
     
-    def check_pending_tasks(self):
-        """检查待执行的任务"""
-        try:
-            current_time = datetime.now()
-            logger.debug(f"检查待执行任务 - 当前时间: {current_time}")
-            logger.debug(f"待执行任务数量: {len(self.tasks)}")
-            
-            # 找出需要执行的任务
+    def is_queued(self, task):
+        """任务是否在等待执行的队列中"""
+        with self._lock:
+            return task.task_id in self._task_ids
+    
+    def pop_due_tasks(self):
+        """取出已到期的任务（从队列中移除）"""
+        current_time = time.time()
+        next_due = None
+        
+        with self._lock:
+            # 找出需要执行的任务（加入队列时已去重）
             tasks_to_execute = []
             remaining_tasks = []
-            
-            # 使用集合来跟踪已处理的任务
-            processed_tasks = set()
-            
+        
             for task in self.tasks:
-                time_diff = task['time'] - current_time
-                task_id = f"{task['data']['postName']}_{task['time']}"
-                
-                logger.debug(f"任务 {task['data']['postName']} 距离执行还有: {time_diff}")
-                
-                if task['time'] <= current_time:
-                    # 检查任务是否已经处理过
-                    if task_id not in processed_tasks:
-                        tasks_to_execute.append(task)
-                        processed_tasks.add(task_id)
+                if task.due <= current_time:
+                    tasks_to_execute.append(task)
+                    self._task_ids.discard(task.task_id)
+                    self._warming.discard(task.task_id)
                 else:
                     remaining_tasks.append(task)
-            
+                    if next_due is None or task.due < next_due:
+                        next_due = task.due
+        
             # 更新任务队列
             self.tasks = remaining_tasks
+        
+        events.debug("task.pending_check", pending=len(remaining_tasks), due=len(tasks_to_execute),
+                     next_due_seconds=round(next_due - current_time) if next_due else None)
+        return tasks_to_execute
+    
+    def pop_warmup_tasks(self):
+        """取出进入预热窗口、尚未安排预热的任务（任务仍保留在队列中）"""
+        if not WARMUP_CONFIG['ENABLED']:
+            return []
+        
+        now = time.time()
+        lead = WARMUP_CONFIG['LEAD_SECONDS']
+        with self._lock:
+            tasks = [t for t in self.tasks
+                     if t.due - lead <= now < t.due and t.task_id not in self._warming]
+            self._warming.update(t.task_id for t in tasks)
+        return tasks
+    
+    def pop_expired_warm_sessions(self):
+        """取出超过截止时间仍未使用的预热会话"""
+        now = time.time()
+        slip = WARMUP_CONFIG['MAX_SLIP_SECONDS']
+        with self._lock:
+            expired = [(device_id, session) for device_id, session in self.warm_sessions.items()
+                       if now > session['deadline'] + slip]
+            for device_id, _ in expired:
+                del self.warm_sessions[device_id]
+        return expired
+    
+    def warm_up(self, task):
+        """预热设备：连接、解锁并启动应用（在设备工作线程中调用）"""
+        device_id = task.device_id
+        if not device_id:
+            return False
+        
+        # 截止时间前重新检查内容文件，执行时直接使用缓存
+        self.load_content(task.post_name, task.dir_name)
+        
+        start = time.perf_counter()
+        try:
+            with tracer.span('warm_up', trace_key(task.post_name, task.time_str), device=device_id):
+                with self.session_pool.lease(device_id) as device:
+                    automation = AndroidAutomation(device_id, device=device)
+                    prepared = automation.prepare_device()
+                    automation.reset_timer()  # 预热步骤不计入任务的发布耗时
+        except Exception as e:
+            logger.error(f"设备预热失败: {device_id} - {str(e)}")
+            prepared = False
+        if not prepared:
+            with self._lock:
+                self.warmup_stats['failed'] += 1
+            return False
+        duration = time.perf_counter() - start
+        
+        with self._lock:
+            self.warm_sessions[device_id] = {
+                'automation': automation,
+                'task_id': task.task_id,
+                'deadline': task.due,
+                'duration': duration
+            }
+            self.warmup_stats['warmed'] += 1
+        logger.info(f"设备预热完成: {device_id} - 任务 {task.task_id}, 耗时 {duration:.1f}秒")
+        return True
+    
+    def release_warm_session(self, session):
+        """释放未被使用的预热会话"""
+        automation = session['automation']
+        logger.warning(f"预热会话超时未使用，释放设备: {automation.device_id} - 任务 {session['task_id']}")
+        try:
+            with self.session_pool.lease(automation.device_id) as device:
+                automation.d = device
+                automation.teardown()
+        except Exception as e:
+            logger.warning(f"释放预热会话失败: {automation.device_id} - {str(e)}")
+        with self._lock:
+            self.warmup_stats['expired'] += 1
+        return True
+    
+    def _take_warm_session(self, device_id):
+        """取出设备的预热会话"""
+        with self._lock:
+            return self.warm_sessions.pop(device_id, None)
+    
+    def get_warmup_stats(self):
+        """获取预热统计（含平均节省时间）"""
+        with self._lock:
+            stats = dict(self.warmup_stats)
+        stats['avg_saved_seconds'] = round(stats['saved_seconds'] / stats['used'], 2) if stats['used'] else 0.0
+        stats['avg_cold_seconds'] = round(stats['cold_seconds'] / stats['cold'], 2) if stats['cold'] else 0.0
+        return stats
+    
+    def check_pending_tasks(self):
+        """检查待执行的任务"""
+        try:
+            # 预热即将到期任务的设备
+            for task in self.pop_warmup_tasks():
+                if task.device_id:
+                    self.executor.submit(task.device_id, self.warm_up, task, name=f"warmup_{task.task_id}")
+            
+            # 提交到期的任务到对应设备的工作线程（不阻塞主循环）
+            for task in self.pop_due_tasks():
+                self.dispatch_task(task)
             
-            # 执行到期的任务
-            for task in tasks_to_execute:
-                logger.info(f"开始执行任务: {task['data']['postName']} - 计划时间: {task['time']}")
-                self.run_android_automation(task['data'])
+            # 释放截止时间已过仍未使用的预热会话
+            for device_id, session in self.pop_expired_warm_sessions():
+                self.executor.submit(device_id, self.release_warm_session, session, name="warmup_release")
                 
         except Exception as e:
             logger.error(f"检查待执行任务时出错: {str(e)}")
     
-    def _convert_time_format(self, time_str):
-        """转换时间格式为目录格式"""
-        try:
-            if isinstance(time_str, str):
-                dt = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S')
-            else:
-                dt = time_str
-            return dt.strftime('%Y-%m-%d_%H-%M')
-        except Exception as e:
-            logger.error(f"时间格式转换失败: {str(e)}")
+    def dispatch_task(self, task):
+        """
+        将任务提交到设备执行器（线程主循环和asyncio运行时共用）
+        
+        Returns:
+            Future: 任务执行结果；设备未配置或队列已满时返回None
+        """
+        device_id = task.device_id
+        key = trace_key(task.post_name, task.time_str)
+        if not device_id:
+            logger.error(f"设备未找到: {task.post_name}")
+            self.store.record_remove(task.task_id)
+            tracer.end(key, 'schedule_wait', rejected='device_not_found')
+            tracer.finish(key)
             return None
-
-    def run_android_automation(self, task_data):
-        """执行安卓自动化任务"""
+        
+        logger.info(f"开始执行任务: {task.post_name} - 计划时间: {task.time_str}")
+        tracer.end(key, 'schedule_wait')
+        # 提交前开始排队阶段（工作线程可能在 submit 返回前就开始执行并结束该阶段）
+        tracer.begin(key, 'device_queue', device=device_id)
+        future = self.executor.submit(
+            device_id,
+            self.execute_task,
+            task,
+            name=task.task_id
+        )
+        if future is None:
+            # 队列已满或执行器已关闭：任务不会执行，结束排队阶段并输出追踪，避免阶段和缓冲一直保留
+            self.store.record_remove(task.task_id)
+            tracer.end(key, 'device_queue', rejected='executor')
+            tracer.finish(key)
+        return future
+    
+    def execute_task(self, task):
+        """执行任务并记录执行状态（在设备工作线程中调用）"""
+        self.store.record_start(task.task_id)
+        key = trace_key(task.post_name, task.time_str)
+        tracer.end(key, 'device_queue')
+        success, result = False, None
+        try:
+            with tracer.span('automation', key):
+                success, result = self.run_android_automation(task)
+        finally:
+            self.store.record_done(task.task_id, success, result)
+            TASKS_EXECUTED.labels('success' if success else 'failed').inc()
+            tracer.finish(key)
+        return success
+    
+    def get_executor_stats(self):
+        """获取各设备的队列深度和忙碌时间"""
+        return self.executor.get_stats()
+    
+    def shutdown(self, wait=True):
+        """关闭调度器，等待设备上正在执行的任务"""
+        self.executor.shutdown(wait=wait)
+        self.session_pool.stop()
+        self.store.close()
+    
+    def load_content(self, post_name, dir_name, refresh=True):
+        """
+        获取任务的内容（标题、正文和格式错误）
+        
+        Args:
+            post_name (str): 设备名称
+            dir_name (str): 时间文件夹名
+            refresh (bool): 是否检查内容文件变化
+        """
+        content_file = os.path.join(self.root_dir, post_name, dir_name, DIRECTORY_STRUCTURE['TASK_DIR']['CONTENT_FILE'])
+        return content_cache.get(content_file, refresh=refresh)
+    
+    def check_content(self, task, report=True):
+        """
+        加入队列前解析并校验内容文件，提前发现格式错误
+        
+        Args:
+            task (TaskRecord): 任务记录
+            report (bool): 格式错误时是否输出错误日志（主循环重复检查时关闭）
+        
+        Returns:
+            str: SUCCESS 或 CONTENT_INVALID
+        """
+        entry = self.load_content(task.post_name, task.dir_name)
+        if entry.error:
+            if report:
+                logger.error(f"内容文件格式错误: {task.post_name} - {task.time_str} - {entry.error}")
+            return "CONTENT_INVALID"
+        return "SUCCESS"
+    
+    def run_android_automation(self, task):
+        """
+        执行安卓自动化任务
+        
+        Args:
+            task (TaskRecord): 任务记录
+        
+        Returns:
+            tuple: (是否成功, 任务结果)；任务结果包含状态、各步骤耗时和重试次数
+        """
         try:
-            device_id = DEVICE_MAPPING.get(task_data['postName'])
+            device_id = task.device_id
             if not device_id:
-                logger.error(f"设备未找到: {task_data['postName']}")
-                return False
-            
-            automation = AndroidAutomation(device_id)
-            if not automation.connect_device():
-                logger.error(f"设备连接失败: {device_id}")
-                return False
-            
-            # 构建目录路径
-            time_str = self._convert_time_format(task_data['time'])
-            if not time_str:
-                return False
-                
-            logger.debug(f"开始执行自动化任务 - 设备: {task_data['postName']}, 时间: {time_str}")
+                logger.error(f"设备未找到: {task.post_name}")
+                return False, {'status': 'DEVICE_NOT_FOUND'}
             
-            base_dir = os.path.join(ROOT_DIR, task_data['postName'], time_str)
-            image_dir = os.path.join(base_dir, 'img')
+            # 目录名在创建任务记录时已计算
+            time_str = task.dir_name
+            logger.debug(f"开始执行自动化任务 - 设备: {task.post_name}, 时间: {time_str}")
             
-            # 获取图片路径（这是必需的）
-            if not os.path.exists(image_dir):
-                logger.error(f"图片目录不存在: {image_dir}")
-                return False
-                
-            image_paths = [os.path.join(image_dir, f) for f in os.listdir(image_dir)
-                          if f.lower().endswith(('.jpg', '.png', '.jpeg'))]
+            # 媒体清单（与文件传输共用，目录未变化时不重新扫描）
+            manifest = media_manifests.get(self.root_dir, task.post_name, time_str)
+            if manifest.status == "WAITING_MEDIA":
+                logger.error(f"媒体目录不存在: {manifest.source_dir}")
+                return False, {'status': 'WAITING_MEDIA'}
             
-            if not image_paths:
-                logger.error("没有找到图片文件")
-                return False
+            if manifest.status == "NO_MEDIA_FILES":
+                logger.error("没有找到媒体文件")
+                return False, {'status': 'NO_MEDIA_FILES'}
             
-            # 读取内容文件（可选）
-            content_file = os.path.join(base_dir, 'content.txt')
-            title, content = ContentReader.read_content_file(content_file)
+            # 内容已在加入队列和预热时解析，此处直接使用缓存（不读文件）
+            entry = self.load_content(task.post_name, time_str, refresh=False)
+            if entry.error:
+                logger.error(f"内容文件格式错误: {entry.error}")
+                return False, {'status': 'CONTENT_INVALID'}
+            title, content = entry.title, entry.body
             
             # 标题和正文都允许为空
             logger.info(f"准备发布内容 - 标题: {'[无标题]' if not title else title}")
             logger.debug(f"正文长度: {len(content) if content else 0}")
             
-            success, status = automation.post_content(title, content, image_paths)
+            # 从会话池租用设备连接，优先使用预热会话
+            with self.session_pool.lease(device_id) as device:
+                session = self._take_warm_session(device_id)
+                if session:
+                    automation = session['automation']
+                    automation.d = device  # 会话池可能已重连
+                else:
+                    start = time.perf_counter()
+                    automation = AndroidAutomation(device_id, device=device)
+                    if not automation.prepare_device():
+                        logger.error(f"设备准备失败: {device_id}")
+                        return False, automation.timer.report("DEVICE_PREPARE_FAILED")
+                    with self._lock:
+                        self.warmup_stats['cold'] += 1
+                        self.warmup_stats['cold_seconds'] += time.perf_counter() - start
+                
+                success, status = automation.post_content(title, content, manifest, prepared=True)
+                result = automation.last_report
+            
+            if session:
+                with self._lock:
+                    self.warmup_stats['used'] += 1
+                    self.warmup_stats['saved_seconds'] += session['duration']
+                logger.info(f"使用预热会话发布，节省约 {session['duration']:.1f}秒")
             
             if success:
-                logger.info(f"任务执行成功: {task_data['postName']} - {time_str}")
+                logger.info(f"任务执行成功: {task.post_name} - {time_str}")
             else:
-                logger.error(f"任务执行失败: {task_data['postName']} - {time_str} - {status}")
+                logger.error(f"任务执行失败: {task.post_name} - {time_str} - {status}")
                 
-            return success
+            return success, result
             
         except Exception as e:
             logger.error(f"自动化执行失败: {str(e)}")
-            return False
+            return False, {'status': 'AUTOMATION_FAILED'}
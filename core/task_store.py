@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+任务持久化模块功能：
+1. 以追加写日志（JSON Lines）记录调度队列的变化
+2. 定期压缩日志，只保留仍然有效的任务
+3. 启动时快速重放日志恢复任务队列
+4. 识别崩溃时正在执行的任务（保留在日志中，直到确认后调用 record_remove）
+"""
+
+import json
+import os
+import threading
+import time
+from utils.logger import get_logger
+from config.settings import TASK_STORE_CONFIG
+
+logger = get_logger(__name__)
+
+
+class TaskStore:
+    """调度队列的追加写日志存储"""
+
+    def __init__(self, journal_path=None):
+        self.journal_path = journal_path or TASK_STORE_CONFIG['JOURNAL_PATH']
+        self.compact_threshold = TASK_STORE_CONFIG['COMPACT_THRESHOLD']
+        self.fsync = TASK_STORE_CONFIG['FSYNC']
+        self._lock = threading.Lock()
+        self._pending = {}   # 任务ID -> 任务记录（等待执行）
+        self._running = {}   # 任务ID -> 任务记录（执行中）
+        self._entries = 0    # 当前日志行数
+        self._file = None
+
+    def load(self):
+        """
+        重放日志恢复任务状态
+
+        Returns:
+            tuple: (等待执行的任务列表, 崩溃时正在执行的任务列表)
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self._pending = {}
+            self._running = {}
+            self._entries = 0
+
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # 崩溃时最后一行可能只写了一半
+                            logger.warning(f"跳过损坏的任务日志行: {line[:80]}")
+                            continue
+                        self._apply(entry)
+                        self._entries += 1
+
+            # 上次崩溃时仍在执行的任务保留在执行中状态（压缩时不丢失），确认后由调用方移除
+            interrupted = list(self._running.values())
+            pending = list(self._pending.values())
+
+            self._compact_locked()
+
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f"任务日志加载完成: {len(pending)} 个待执行, "
+                    f"{len(interrupted)} 个中断, 耗时 {elapsed:.1f}ms")
+        return pending, interrupted
+
+    def _apply(self, entry):
+        """将一条日志应用到内存状态"""
+        op = entry.get('op')
+        task_id = entry.get('id')
+        if op == 'add':
+            self._pending[task_id] = {
+                'id': task_id,
+                'postName': entry['postName'],
+                'time': entry['time']
+            }
+        elif op == 'start':
+            record = self._pending.pop(task_id, None)
+            if record:
+                self._running[task_id] = record
+        elif op in ('done', 'remove'):
+            self._pending.pop(task_id, None)
+            self._running.pop(task_id, None)
+
+    def _write(self, entry):
+        """追加一条日志（调用方需持有锁）"""
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._entries += 1
+
+    def _record(self, entry):
+        """应用并持久化一条日志，必要时压缩"""
+        with self._lock:
+            try:
+                self._apply(entry)
+                self._write(entry)
+                live = len(self._pending) + len(self._running)
+                if self._entries >= max(self.compact_threshold, live * 2):
+                    self._compact_locked()
+            except Exception as e:
+                logger.error(f"写入任务日志失败: {str(e)}")
+
+    def record_add(self, task_id, post_name, time_str):
+        """记录新加入队列的任务"""
+        self._record({'op': 'add', 'id': task_id, 'postName': post_name, 'time': time_str})
+
+    def record_start(self, task_id):
+        """记录任务开始执行"""
+        self._record({'op': 'start', 'id': task_id, 'ts': time.time()})
+
+    def record_done(self, task_id, success, result=None):
+        """记录任务执行结束（result 为任务结果：状态、步骤耗时、重试次数）"""
+        entry = {'op': 'done', 'id': task_id, 'ok': bool(success), 'ts': time.time()}
+        if result:
+            entry['result'] = result
+        self._record(entry)
+
+    def record_remove(self, task_id):
+        """记录任务被移出队列（过期或取消）"""
+        self._record({'op': 'remove', 'id': task_id})
+
+    def compact(self):
+        """压缩日志"""
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        """用当前有效任务重写日志（先写临时文件再原子替换）"""
+        try:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+            temp_path = f"{self.journal_path}.tmp"
+            entries = 0
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for record in list(self._pending.values()) + list(self._running.values()):
+                    entry = {'op': 'add', 'id': record['id'],
+                             'postName': record['postName'], 'time': record['time']}
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                    entries += 1
+                for task_id in self._running:
+                    f.write(json.dumps({'op': 'start', 'id': task_id}) + '\n')
+                    entries += 1
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(temp_path, self.journal_path)
+            self._entries = entries
+            logger.debug(f"任务日志压缩完成: {entries} 条记录")
+        except Exception as e:
+            logger.error(f"压缩任务日志失败: {str(e)}")
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -11,6 +11,7 @@
 """
 
 from datetime import datetime, timedelta
+import time
 from utils.logger import get_logger
 from config.settings import TASK_VALIDATION
 
@@ -33,8 +34,14 @@ class TaskValidator:
         1. 未来任务：可以修改和执行
         2. 当前任务：可以执行，不可修改
         3. 过期任务：保留记录，不执行
+        
+        Args:
+            task_time: 时间字符串、datetime 或时间戳（TaskRecord.due，无需解析）
         """
         try:
+            if isinstance(task_time, (int, float)):
+                return task_time > time.time() - self.buffer_minutes * 60
+            
             if isinstance(task_time, str):
                 task_time = datetime.strptime(str(task_time).strip(), self.time_format)
             
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+文本输入模块功能：
+1. 提供多种文本输入方式：直接 set_text、剪贴板粘贴、uiautomator2 输入法
+2. 按设备统计每种方式的耗时和成功率，优先使用最快的可用方式
+3. 输入后读取输入框内容与原文比对，不一致时换下一种方式；输入前已有相同内容时跳过（续跑时不重复输入）
+4. 每种方式的耗时写入步骤统计，便于选择默认方式
+"""
+
+import threading
+import time
+from utils.logger import get_logger
+from core.step_timing import step_stats
+from config.settings import AUTOMATION_CONFIG
+
+logger = get_logger(__name__)
+
+KEYCODE_PASTE = 279
+
+
+def _normalize(text):
+    """比对前统一换行和首尾空白"""
+    return (text or '').replace('\r\n', '\n').strip()
+
+
+class TextInputStats:
+    """按设备记录每种输入方式的耗时和成功次数"""
+
+    def __init__(self):
+        self._stats = {}   # (设备, 方式) -> {'ok', 'failed', 'seconds'}
+        self._lock = threading.Lock()
+
+    def record(self, device_id, method, seconds, ok):
+        with self._lock:
+            stats = self._stats.setdefault((device_id, method), {'ok': 0, 'failed': 0, 'seconds': 0.0})
+            if ok:
+                stats['ok'] += 1
+                stats['seconds'] += seconds
+            else:
+                stats['failed'] += 1
+
+    def order(self, device_id, methods):
+        """
+        输入方式的尝试顺序：
+        成功过的方式按平均耗时排序，其次是未尝试过的方式，最后是只失败过的方式
+        """
+        with self._lock:
+            snapshot = {m: dict(self._stats.get((device_id, m), {'ok': 0, 'failed': 0, 'seconds': 0.0}))
+                        for m in methods}
+
+        def sort_key(item):
+            position, method = item
+            stats = snapshot[method]
+            if stats['ok']:
+                return 0, stats['seconds'] / stats['ok'], position
+            if not stats['failed']:
+                return 1, 0, position
+            return 2, 0, position
+
+        return [method for _, method in sorted(enumerate(methods), key=sort_key)]
+
+    def summary(self):
+        with self._lock:
+            return {
+                f"{device_id}/{method}": {
+                    'ok': stats['ok'],
+                    'failed': stats['failed'],
+                    'avg_seconds': round(stats['seconds'] / stats['ok'], 3) if stats['ok'] else None
+                }
+                for (device_id, method), stats in self._stats.items()
+            }
+
+
+class TextEntry:
+    """向当前获得焦点的输入框输入文本"""
+
+    def __init__(self, device, device_id, stats=None):
+        self.d = device
+        self.device_id = device_id
+        self.stats = stats if stats is not None else text_input_stats
+        self.methods = AUTOMATION_CONFIG['TEXT_INPUT_METHODS']
+
+    def _focused(self):
+        return self.d(focused=True)
+
+    def _by_set_text(self, element, text):
+        """直接设置输入框内容（无障碍 ACTION_SET_TEXT）"""
+        element.set_text(text)
+
+    def _by_clipboard(self, element, text):
+        """写入剪贴板后发送粘贴按键"""
+        self.d.set_clipboard(text)
+        self.d.shell(f"input keyevent {KEYCODE_PASTE}")
+
+    def _by_fastinput(self, element, text):
+        """使用 uiautomator2 自带输入法逐字输入"""
+        self.d.send_keys(text)
+
+    def _read_back(self, element):
+        try:
+            return element.get_text()
+        except Exception:
+            return None
+
+    def enter(self, text):
+        """
+        输入文本并校验
+
+        Returns:
+            tuple: (是否成功, 使用的输入方式)
+        """
+        element = self._focused()
+        # 续跑时输入框可能已有内容：与原文一致时跳过，部分输入的内容先清空，避免重复输入
+        current = self._read_back(element)
+        if current is not None and _normalize(current) == _normalize(text):
+            logger.debug(f"输入框已有相同内容，跳过输入: {len(text)} 字")
+            return True, 'existing'
+        if current:
+            self._clear(element)
+
+        for method in self.stats.order(self.device_id, self.methods):
+            start = time.perf_counter()
+            ok = False
+            try:
+                getattr(self, f"_by_{method}")(element, text)
+                actual = self._read_back(element)
+                # 无法读取输入框内容时视为未校验（可能什么也没输入），换下一种方式
+                ok = actual is not None and _normalize(actual) == _normalize(text)
+                if actual is None:
+                    logger.warning(f"无法读取输入框内容，输入未校验({method})")
+                elif not ok:
+                    logger.warning(f"输入内容校验失败({method}): 期望 {len(text)} 字, 实际 {len(actual)} 字")
+            except Exception as e:
+                logger.warning(f"文本输入失败({method}): {str(e)}")
+
+            seconds = time.perf_counter() - start
+            self.stats.record(self.device_id, method, seconds, ok)
+            step_stats.record(self.device_id, f"text_entry.{method}", seconds)
+            if ok:
+                logger.debug(f"文本输入完成({method}): {len(text)} 字, 耗时 {seconds:.2f}秒")
+                return True, method
+
+            # 清除失败方式留下的内容，再尝试下一种
+            self._clear(element)
+
+        return False, None
+
+    def _clear(self, element):
+        try:
+            element.clear_text()
+        except Exception:
+            pass
+
+
+# 创建全局实例
+text_input_stats = TextInputStats()
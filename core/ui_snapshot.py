@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+界面快照模块功能：
+1. 一次 dump_hierarchy 获取完整界面树，本地解析
+2. 在同一份快照上批量匹配多个选择器（属性选择器和常用xpath子集）
+3. 返回所有匹配节点及其坐标，直接按坐标点击
+4. 改变界面的操作之后使快照失效，下次访问时重新获取
+"""
+
+import re
+import time
+import xml.etree.ElementTree as ET
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_BOUNDS_PATTERN = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+_ATTR_PREDICATE = re.compile(r'^@([\w:-]+)\s*=\s*(["\'])(.*)\2$')
+
+# 属性选择器参数名 -> 界面树属性名（与 uiautomator2 的 d(...) 参数一致）
+_SELECTOR_ATTRS = {
+    'resourceId': 'resource-id',
+    'text': 'text',
+    'description': 'content-desc',
+    'className': 'class',
+    'packageName': 'package',
+}
+
+
+class UINode:
+    """界面树中的一个节点"""
+
+    __slots__ = ('attrib', 'bounds')
+
+    def __init__(self, element):
+        self.attrib = element.attrib
+        match = _BOUNDS_PATTERN.match(element.attrib.get('bounds', ''))
+        self.bounds = tuple(int(v) for v in match.groups()) if match else (0, 0, 0, 0)
+
+    @property
+    def center(self):
+        """节点中心坐标"""
+        left, top, right, bottom = self.bounds
+        return (left + right) // 2, (top + bottom) // 2
+
+    @property
+    def visible(self):
+        """节点在屏幕上是否有面积"""
+        left, top, right, bottom = self.bounds
+        return right > left and bottom > top
+
+    @property
+    def text(self):
+        return self.attrib.get('text', '')
+
+    def __repr__(self):
+        return f"UINode({self.attrib.get('class')}, text={self.text!r}, bounds={self.bounds})"
+
+
+def _split_steps(expr):
+    """将xpath拆分为 (轴, 步骤) 列表，轴为 '/' 或 '//'（忽略谓词和引号内的斜杠）"""
+    steps = []
+    i = 0
+    length = len(expr)
+    while i < length:
+        if expr.startswith('//', i):
+            axis, i = '//', i + 2
+        elif expr[i] == '/':
+            axis, i = '/', i + 1
+        else:
+            axis = '/'
+        start = i
+        depth = 0
+        quote = None
+        while i < length:
+            ch = expr[i]
+            if quote:
+                if ch == quote:
+                    quote = None
+            elif ch in '"\'':
+                quote = ch
+            elif ch == '[':
+                depth += 1
+            elif ch == ']':
+                depth -= 1
+            elif ch == '/' and depth == 0:
+                break
+            i += 1
+        steps.append((axis, expr[start:i]))
+    return steps
+
+
+def _parse_step(step):
+    """将步骤拆分为 (节点名, 谓词列表)"""
+    bracket = step.find('[')
+    if bracket < 0:
+        return step, []
+    name = step[:bracket]
+    predicates = []
+    depth = 0
+    quote = None
+    start = None
+    for i in range(bracket, len(step)):
+        ch = step[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '[':
+            if depth == 0:
+                start = i + 1
+            depth += 1
+        elif ch == ']':
+            depth -= 1
+            if depth == 0:
+                predicates.append(step[start:i].strip())
+    return name, predicates
+
+
+class UISnapshot:
+    """界面树快照（一次dump，多次匹配）"""
+
+    def __init__(self, device):
+        self.d = device
+        self._root = None
+        self.dumps = 0          # 实际执行dump的次数
+        self.dump_seconds = 0.0  # dump累计耗时
+
+    def refresh(self):
+        """重新获取界面树"""
+        start = time.perf_counter()
+        xml = self.d.dump_hierarchy()
+        self._root = ET.fromstring(xml.encode('utf-8') if isinstance(xml, str) else xml)
+        self.dumps += 1
+        self.dump_seconds += time.perf_counter() - start
+        return self
+
+    def invalidate(self):
+        """使快照失效（界面发生变化后调用）"""
+        self._root = None
+
+    @property
+    def root(self):
+        if self._root is None:
+            self.refresh()
+        return self._root
+
+    def find(self, **selector):
+        """
+        按属性选择器查找所有匹配节点
+
+        支持 resourceId/text/description/className/packageName，
+        以及 textContains/descriptionContains
+        """
+        results = []
+        for element in self.root.iter('node'):
+            if self._match_selector(element, selector):
+                results.append(UINode(element))
+        return results
+
+    def find_first(self, **selector):
+        nodes = self.find(**selector)
+        return nodes[0] if nodes else None
+
+    def exists(self, **selector):
+        return self.find_first(**selector) is not None
+
+    @staticmethod
+    def _match_selector(element, selector):
+        for key, value in selector.items():
+            if key.endswith('Contains'):
+                attr = _SELECTOR_ATTRS[key[:-len('Contains')]]
+                if value not in element.get(attr, ''):
+                    return False
+            elif element.get(_SELECTOR_ATTRS[key], '') != value:
+                return False
+        return True
+
+    def xpath(self, expr):
+        """
+        按xpath查找所有匹配节点（文档顺序）
+
+        支持的子集：'/' 与 '//' 轴、类名或 '*' 节点测试、
+        [@attr="value"] 属性谓词、[n] 位置谓词；
+        步骤不带位置谓词时返回所有匹配（用于批量获取列表项）
+        """
+        contexts = [self.root]
+        for axis, step in _split_steps(expr):
+            name, predicates = _parse_step(step)
+            matched = []
+            seen = set()
+            for context in contexts:
+                parents = context.iter() if axis == '//' else (context,)
+                for parent in parents:
+                    for element in self._apply_step(parent, name, predicates):
+                        if id(element) not in seen:
+                            seen.add(id(element))
+                            matched.append(element)
+            contexts = matched
+            if not contexts:
+                break
+        return [UINode(element) for element in self._document_order(contexts)]
+
+    def xpath_first(self, expr):
+        nodes = self.xpath(expr)
+        return nodes[0] if nodes else None
+
+    @staticmethod
+    def _apply_step(parent, name, predicates):
+        """对一个父节点应用步骤（节点测试 + 依次应用谓词）"""
+        candidates = [child for child in parent
+                      if child.tag == 'node' and (name == '*' or child.get('class') == name)]
+        for predicate in predicates:
+            if predicate.isdigit():
+                position = int(predicate)
+                candidates = candidates[position - 1:position]
+                continue
+            match = _ATTR_PREDICATE.match(predicate)
+            if not match:
+                raise ValueError(f"不支持的xpath谓词: [{predicate}]")
+            attr, _, value = match.groups()
+            candidates = [child for child in candidates if child.get(attr) == value]
+        return candidates
+
+    def _document_order(self, elements):
+        """按文档顺序排列节点"""
+        if len(elements) < 2:
+            return elements
+        order = {id(element): i for i, element in enumerate(self.root.iter())}
+        return sorted(elements, key=lambda element: order[id(element)])
+
+    def tap(self, node, invalidate=True):
+        """按坐标点击节点（默认点击后使快照失效）"""
+        x, y = node.center
+        self.d.click(x, y)
+        if invalidate:
+            self.invalidate()
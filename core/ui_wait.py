@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+界面等待模块功能：
+1. 轮询等待界面条件成立，替代固定时长的 sleep
+2. 轮询间隔自适应（从短间隔开始逐步退避）
+3. 每个步骤独立的截止时间
+4. 记录每次等待的实际耗时
+"""
+
+import time
+from utils.logger import get_logger
+from config.settings import AUTOMATION_CONFIG
+
+logger = get_logger(__name__)
+
+
+class UIWaiter:
+    """界面条件等待器"""
+
+    def __init__(self, initial_interval=None, max_interval=None, backoff=1.5):
+        self.initial_interval = initial_interval or AUTOMATION_CONFIG['WAIT_POLL_INTERVAL']
+        self.max_interval = max_interval or AUTOMATION_CONFIG['WAIT_MAX_INTERVAL']
+        self.backoff = backoff
+        self.default_timeout = AUTOMATION_CONFIG['STEP_TIMEOUT']
+        self.records = []  # 每次等待的记录 {'name', 'elapsed', 'success', 'polls'}
+
+    def wait_until(self, condition, timeout=None, name="wait"):
+        """
+        等待条件成立
+
+        Args:
+            condition (callable): 无参函数，返回真值表示条件成立
+            timeout (float): 本步骤的截止时间（秒）
+            name (str): 步骤名称（用于记录）
+
+        Returns:
+            条件函数最后一次的返回值；超时返回假值
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        deadline = start + timeout
+        interval = self.initial_interval
+        polls = 0
+        result = None
+
+        while True:
+            polls += 1
+            try:
+                result = condition()
+            except Exception as e:
+                logger.debug(f"等待条件检查出错: {name} - {str(e)}")
+                result = None
+
+            now = time.perf_counter()
+            if result or now >= deadline:
+                break
+
+            time.sleep(min(interval, deadline - now))
+            interval = min(interval * self.backoff, self.max_interval)
+
+        elapsed = time.perf_counter() - start
+        self.records.append({
+            'name': name,
+            'elapsed': round(elapsed, 3),
+            'success': bool(result),
+            'polls': polls
+        })
+        if result:
+            logger.debug(f"等待完成: {name}, 耗时 {elapsed:.2f}秒, 轮询 {polls} 次")
+        else:
+            logger.debug(f"等待超时: {name}, 耗时 {elapsed:.2f}秒")
+        return result
+
+    def wait_exists(self, selector, timeout=None, name="exists"):
+        """等待元素出现（支持 d(...) 和 d.xpath(...) 选择器）"""
+        return self.wait_until(lambda: bool(selector.exists), timeout, name)
+
+    def wait_gone(self, selector, timeout=None, name="gone"):
+        """等待元素消失"""
+        return self.wait_until(lambda: not selector.exists, timeout, name)
+
+    def total_elapsed(self):
+        """所有等待的累计耗时"""
+        return round(sum(r['elapsed'] for r in self.records), 3)
+
+    def reset(self):
+        """清空等待记录"""
+        self.records = []
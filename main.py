@@ -19,23 +19,32 @@
 from core.excel_monitor import ExcelMonitor
 from core.task_scheduler import TaskScheduler
 from core.file_handler import FileHandler
+from core.async_runtime import AsyncRuntime
 from config.settings import (
     RESOURCE_DIRS,
     EXCEL_CONFIG,
     TASK_STATUS,
-    ADB_COMMAND
+    EXECUTOR_CONFIG,
+    ASYNC_RUNTIME_CONFIG
 )
-import pandas as pd
+import asyncio
 import time
 import signal
 import sys
+import threading
 import os
-from utils.logger import get_logger
-import subprocess
+from utils.logger import get_logger, get_event_logger, log_pipeline, shutdown_logging
+from utils.metrics import metrics_server
+from utils.tracing import tracer, trace_key
+from utils.diagnostics import diagnostics
+from utils.lazy_import import lazy_module
 from utils.excel_utils import ExcelUtils
 from core.task_validator import TaskValidator
+from core.task_record import TaskRecord
 
 logger = get_logger(__name__)
+events = get_event_logger(__name__)
+pd = lazy_module('pandas')  # 首次读写Excel时导入，启动时不加载
 
 class Application:
     def __init__(self):
@@ -44,11 +53,13 @@ class Application:
             EXCEL_CONFIG['PATH'],
             EXCEL_CONFIG['REQUIRED_HEADERS']
         )
-        self.task_scheduler = TaskScheduler()
+        self.task_scheduler = TaskScheduler(root_dir=RESOURCE_DIRS['UPLOADS'])  # 与文件传输使用同一资源目录
         self.file_handler = FileHandler(RESOURCE_DIRS['UPLOADS'])
         self.running = True  # 运行状态标志
         self.task_check_interval = 60  # 每60秒检查一次任务
         self.last_task_check = 0
+        self.last_stats_log = 0
+        self._excel_write_lock = threading.Lock()  # 串行化Excel状态写入（asyncio运行时会在多个线程中同时回写状态）
         
         # 注册资源变化处理器
         self.excel_monitor.add_resource_handler(self.handle_resource_change)
@@ -58,21 +69,26 @@ class Application:
         logger.info("收到终止信号，正在关闭服务...")
         self.running = False
         self.excel_monitor.stop_monitoring()
+        self.task_scheduler.shutdown()
+        shutdown_logging()
         sys.exit(0)
     
     def update_excel_status(self, row_index, status):
-        """更新Excel中的任务状态"""
+        """更新Excel中的任务状态（读取-修改-写入整体加锁，并发回写时不会互相覆盖）"""
         try:
-            # 读取当前Excel内容
-            df = pd.read_excel(EXCEL_CONFIG['PATH'])
-            
-            # 更新状态
-            if 'status' not in df.columns:
-                df['status'] = pd.Series(dtype='str')
-            df.at[row_index, 'status'] = str(status)
+            with self._excel_write_lock:
+                # 读取当前Excel内容
+                df = pd.read_excel(EXCEL_CONFIG['PATH'])
+                
+                # 更新状态
+                if 'status' not in df.columns:
+                    df['status'] = pd.Series(dtype='str')
+                df.at[row_index, 'status'] = str(status)
+                
+                # 安全写入Excel
+                written = ExcelUtils.safe_write_excel(EXCEL_CONFIG['PATH'], df)
             
-            # 安全写入Excel
-            if ExcelUtils.safe_write_excel(EXCEL_CONFIG['PATH'], df):
+            if written:
                 logger.info(f"更新任务状态成功: 行 {row_index + 1}, 状态 {status}")
                 return True
             else:
@@ -83,16 +99,92 @@ class Application:
             logger.error(f"更新Excel状态时发生错误: {str(e)}")
             return False
     
-    def check_device_status(self, device_id):
-        """检查设备状态"""
+    def report_interrupted_tasks(self):
+        """
+        将上次运行中断的任务在Excel中标记为执行中断（可能已部分发布，不自动重试）
+        
+        标记成功或Excel中已没有该任务时从任务日志移除，写入失败时下次启动重试
+        """
+        interrupted = list(self.task_scheduler.interrupted_tasks)
+        if not interrupted:
+            return
         try:
-            command = [ADB_COMMAND, 'get-state']
-            result = subprocess.run(command, capture_output=True, text=True)
-            return result.stdout.strip() == 'device'
-        except Exception:
+            df = self.excel_monitor.read_excel_safe()
+        except Exception as e:
+            logger.error(f"读取Excel失败，无法标记中断的任务: {str(e)}")
+            return
+        
+        rows = {}
+        for index, post_name, task_time in zip(df.index, df['postName'], df['time']):
+            record = TaskRecord.from_row(index, post_name, task_time)
+            if record is not None:
+                rows[record.task_id] = index
+        
+        for record in interrupted:
+            row_index = rows.get(record['id'])
+            if row_index is None:
+                logger.warning(f"Excel中未找到中断的任务，不再跟踪: {record['postName']} - {record['time']}")
+            elif not self.update_excel_status(row_index, TASK_STATUS['INTERRUPTED']):
+                continue
+            self.task_scheduler.acknowledge_interrupted(record['id'])
+    
+    def log_device_stats(self):
+        """输出各设备执行器的队列深度和忙碌时间"""
+        for device_id, stats in self.task_scheduler.get_executor_stats().items():
+            logger.info(
+                f"设备 {device_id} - 队列: {stats['queue_depth']}, "
+                f"忙碌: {stats['busy']}, 累计忙碌: {stats['busy_seconds']}秒, "
+                f"完成: {stats['completed']}, 失败: {stats['failed']}"
+            )
+        
+        for device_id, stats in self.task_scheduler.session_pool.get_stats().items():
+            logger.info(f"设备会话 {device_id} - 已连接: {stats['connected']}, "
+                        f"连接次数: {stats['connects']}, 租用次数: {stats['leases']}")
+        
+        warmup = self.task_scheduler.get_warmup_stats()
+        logger.info(
+            f"预热统计 - 使用: {warmup['used']}/{warmup['warmed']}, 失败: {warmup['failed']}, "
+            f"超时释放: {warmup['expired']}, "
+            f"平均节省: {warmup['avg_saved_seconds']}秒, 未预热平均准备: {warmup['avg_cold_seconds']}秒"
+        )
+        
+        log_stats = log_pipeline.get_stats()
+        logger.info(f"日志队列 - 积压: {log_stats['queued']}/{log_stats['capacity']}, 丢弃: {log_stats['dropped']}")
+    
+    def should_process_task(self, task, validator):
+        """检查任务是否需要传输（未过期且未完成，主循环每秒对每一行调用，跳过时不输出日志）"""
+        if not validator.can_modify_task(task.due):
+            return False
+        
+        # 中断的任务可能已部分发布，需人工确认后清除状态
+        if task.status in ('SUCCESS', TASK_STATUS['INTERRUPTED']):
             return False
+        
+        events.debug("task.process", post_name=task.post_name, time=task.time_str)
+        
+        return True
     
-    def process_task(self, index, row, validator):
+    def apply_transfer_result(self, task, status):
+        """根据传输结果更新Excel状态并加入调度队列"""
+        if status == "NO_CHANGES":
+            # 文件已传输但未加入队列（内容格式错误）：内容文件修正后加入队列，仍有错误时不重复更新Excel
+            if task.due <= time.time() or self.task_scheduler.is_queued(task):
+                return
+            if self.task_scheduler.check_content(task, report=False) != "SUCCESS":
+                return
+            logger.info(f"内容文件已可用，加入队列: {task.post_name} - {task.time_str}")
+            status = "SUCCESS"
+        elif status == "SUCCESS":
+            # 提前解析内容文件，格式错误时不加入队列
+            status = self.task_scheduler.check_content(task)
+        if status == "SUCCESS":
+            self.update_excel_status(task.row_id, TASK_STATUS[status])
+            self.task_scheduler.add_task(task)
+        elif status in ["DEVICE_NOT_FOUND", "TRANSFER_INCOMPLETE", "CONTENT_INVALID"]:
+            self.update_excel_status(task.row_id, TASK_STATUS[status])
+        # 其他状态（等待资源就绪）不更新Excel
+    
+    def process_task(self, task, validator):
         """
         处理单个任务
         
@@ -103,39 +195,21 @@ class Application:
         4. 更新任务状态
         
         Args:
-            index (int): 任务在Excel中的索引
-            row (Series): 任务数据
+            task (TaskRecord): 任务记录（含Excel行索引）
             validator (TaskValidator): 任务验证器实例
         """
         try:
-            # 添加任务处理日志
-            logger.info(f"处理任务: {row['postName']} - {row['time']}")
-            
-            if not validator.can_modify_task(row['time']):
-                logger.debug(f"跳过已过期任务: {row['postName']} - {row['time']}")
-                return
-            
-            current_status = str(row.get('status', '')).strip()
-            if current_status == 'SUCCESS':
-                logger.debug(f"跳过已完成任务: {row['postName']} - {row['time']}")
+            if not self.should_process_task(task, validator):
                 return
             
-            # 执行文件传输
-            success, status = self.file_handler.transfer_images(
-                row['postName'],
-                row['time']
-            )
+            # 执行文件传输（有文件传输时才记录 transfer 阶段）
+            with tracer.task(trace_key(task.post_name, task.time_str)):
+                success, status = self.file_handler.transfer_task(task)
             
             # 输出传输结果
             logger.info(f"传输结果: {success} - {status}")
             
-            # 根据传输结果更新状态
-            if status == "SUCCESS":
-                self.update_excel_status(index, TASK_STATUS[status])
-                self.task_scheduler.add_task(row)
-            elif status in ["DEVICE_NOT_FOUND", "TRANSFER_INCOMPLETE"]:
-                self.update_excel_status(index, TASK_STATUS[status])
-            # 其他状态（等待资源就绪）不更新Excel
+            self.apply_transfer_result(task, status)
             
         except Exception as e:
             logger.error(f"处理任务出错: {str(e)}")
@@ -147,6 +221,9 @@ class Application:
             post_name = task_info['post_name']
             time_str = task_info['time_str']
             
+            # 内容文件变化时重新解析
+            self.task_scheduler.load_content(post_name, time_str)
+            
             # 重新执行文件传输
             success, status = self.file_handler.transfer_images(
                 post_name,
@@ -161,6 +238,16 @@ class Application:
         except Exception as e:
             logger.error(f"处理资源变化失败: {str(e)}")
     
+    def run_async(self):
+        """使用asyncio运行时运行应用"""
+        logger.info("应用程序已启动（asyncio运行时）")
+        try:
+            asyncio.run(AsyncRuntime(self).run())
+        except Exception as e:
+            logger.error(f"程序运行异常: {str(e)}")
+        finally:
+            logger.info("应用程序已停止")
+    
     def run(self):
         """运行应用"""
         # 注册信号处理
@@ -185,14 +272,19 @@ class Application:
                     self.task_scheduler.check_pending_tasks()
                     self.last_task_check = current_time
                 
-                valid_rows = self.excel_monitor.get_valid_rows()
+                if current_time - self.last_stats_log >= EXECUTOR_CONFIG['STATS_LOG_INTERVAL']:
+                    self.log_device_stats()
+                    self.last_stats_log = current_time
                 
-                if valid_rows.empty:
+                tasks = self.excel_monitor.get_task_records()
+                
+                if not tasks:
                     time.sleep(1)
                     continue
                 
-                for index, row in valid_rows.iterrows():
-                    self.process_task(index, row, validator)
+                for task in tasks:
+                    self.process_task(task, validator)
+                events.debug("task.scan", rows=len(tasks))
                 
                 time.sleep(1)
                 
@@ -200,7 +292,9 @@ class Application:
             logger.error(f"程序运行异常: {str(e)}")
         finally:
             self.excel_monitor.stop_monitoring()
+            self.task_scheduler.shutdown()
             logger.info("应用程序已停止")
+            shutdown_logging()
 
 def ensure_directories():
     """确保所有必要的目录结构存在"""
@@ -218,9 +312,20 @@ def main():
         # 确保目录结构
         ensure_directories()
         
+        # 运行时诊断信号（SIGUSR1 采样分析，SIGUSR2 转储内存和线程栈）
+        diagnostics.install()
+        
         # 启动应用
         app = Application()
-        app.run()
+        app.report_interrupted_tasks()
+        
+        # 本地指标端口（Prometheus 文本格式）
+        metrics_server.start()
+        
+        if ASYNC_RUNTIME_CONFIG['ENABLED']:
+            app.run_async()
+        else:
+            app.run()
     except Exception as e:
         logger.error(f"程序启动失败: {str(e)}")
         sys.exit(1)
@@ -17,6 +17,8 @@ ADB工具模块功能：
 
 import subprocess
 from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.tracing import tracer
 from config.settings import ADB_COMMAND, DEVICE_PATHS
 import re
 import os
@@ -24,6 +26,34 @@ import time
 
 logger = get_logger(__name__)
 
+ADB_COMMAND_SECONDS = metrics.histogram('adb_command_seconds', 'ADB命令耗时（秒）', ['command'])
+ADB_COMMAND_ERRORS = metrics.counter('adb_command_errors_total', 'ADB命令失败次数（返回码非0或异常）', ['command'])
+
+def adb_command_name(args):
+    """ADB参数中的子命令名（跳过 -s 设备号），用作指标标签"""
+    for i, arg in enumerate(args):
+        if arg == '-s':
+            continue
+        if i > 0 and args[i - 1] == '-s':
+            continue
+        return arg
+    return 'unknown'
+
+def run_adb(command, **kwargs):
+    """执行ADB命令（subprocess.run）并记录耗时和失败次数"""
+    name = adb_command_name(command[1:])
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(command, **kwargs)
+    except Exception:
+        ADB_COMMAND_ERRORS.labels(name).inc()
+        raise
+    finally:
+        ADB_COMMAND_SECONDS.labels(name).observe(time.perf_counter() - start)
+    if result.returncode != 0:
+        ADB_COMMAND_ERRORS.labels(name).inc()
+    return result
+
 class ADBHelper:
     def __init__(self):
         self.connected_devices = set()  # 已连接设备集合
@@ -32,7 +62,7 @@ class ADBHelper:
     def update_connected_devices(self):
         """更新已连接的设备列表"""
         try:
-            result = subprocess.run(
+            result = run_adb(
                 [ADB_COMMAND, 'devices'], 
                 capture_output=True, 
                 text=True, 
@@ -77,7 +107,7 @@ class ADBHelper:
             ]
             
             try:
-                subprocess.run(mkdir_command, capture_output=True, encoding='utf-8')
+                run_adb(mkdir_command, capture_output=True, encoding='utf-8')
             except:
                 pass
             
@@ -90,20 +120,15 @@ class ADBHelper:
                 target_path
             ]
             
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            
-            stdout, stderr = process.communicate()
+            process = run_adb(command, capture_output=True)
             
             if process.returncode == 0:
-                self.trigger_media_scan(device_id, target_path)
+                with tracer.span('media_scan'):
+                    self.trigger_media_scan(device_id, target_path)
                 logger.debug(f"文件传输成功: {target_path}")
                 return True, "SUCCESS"
             else:
-                logger.debug(f"传输失败: {stderr.decode('utf-8', errors='ignore')}")
+                logger.debug(f"传输失败: {process.stderr.decode('utf-8', errors='ignore')}")
                 return False, "TRANSFER_FAILED"
             
         except Exception as e:
@@ -121,7 +146,7 @@ class ADBHelper:
                 'ls',
                 os.path.dirname(path)
             ]
-            result = subprocess.run(command, capture_output=True, text=True)
+            result = run_adb(command, capture_output=True, text=True)
             
             if result.returncode != 0:
                 logger.error(f"目录访问权限检查失败: {result.stderr}")
@@ -141,7 +166,7 @@ class ADBHelper:
             logger.warning(f"设备未连接，尝试重新连接 ({attempt + 1}/{max_retries}): {device_id}")
             try:
                 # 尝试重新连接设备
-                subprocess.run([ADB_COMMAND, 'connect', device_id], 
+                run_adb([ADB_COMMAND, 'connect', device_id], 
                              capture_output=True, text=True)
                 time.sleep(retry_interval)
             except Exception as e:
@@ -169,10 +194,10 @@ class ADBHelper:
             ]
             
             # 尝试第一种方法
-            result = subprocess.run(scan_command1, capture_output=True, encoding='utf-8')
+            result = run_adb(scan_command1, capture_output=True, encoding='utf-8')
             if result.returncode != 0:
                 # 如果失败，尝试第二种方法
-                subprocess.run(scan_command2, capture_output=True, encoding='utf-8')
+                run_adb(scan_command2, capture_output=True, encoding='utf-8')
             
             logger.debug(f"媒体扫描请求已发送: {target_path}")
             return True
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+异步ADB工具模块功能：
+1. 通过 asyncio.create_subprocess_exec 执行所有ADB命令
+2. 每个设备独立的信号量，限制单设备并发ADB进程数
+3. 全局信号量，限制同时存在的ADB进程总数
+4. 设备列表短时缓存，避免每个文件都执行 adb devices
+"""
+
+import asyncio
+import os
+import time
+from utils.logger import get_logger
+from utils.tracing import tracer
+from utils.adb_utils import ADB_COMMAND_SECONDS, ADB_COMMAND_ERRORS, adb_command_name
+from config.settings import ADB_COMMAND, ASYNC_RUNTIME_CONFIG
+
+logger = get_logger(__name__)
+
+
+class AsyncADBHelper:
+    def __init__(self):
+        self.per_device_limit = ASYNC_RUNTIME_CONFIG['ADB_PER_DEVICE_CONCURRENCY']
+        self.command_timeout = ASYNC_RUNTIME_CONFIG['ADB_TIMEOUT']
+        self.devices_ttl = ASYNC_RUNTIME_CONFIG['DEVICES_CACHE_TTL']
+        self._global_semaphore = asyncio.Semaphore(ASYNC_RUNTIME_CONFIG['ADB_MAX_PROCESSES'])
+        self._device_semaphores = {}   # 设备序列号 -> asyncio.Semaphore
+        self._devices_lock = asyncio.Lock()
+        self.connected_devices = set()
+        self._devices_time = 0
+
+    def _device_semaphore(self, device_id):
+        """获取设备信号量"""
+        semaphore = self._device_semaphores.get(device_id)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_device_limit)
+            self._device_semaphores[device_id] = semaphore
+        return semaphore
+
+    async def _exec(self, args, timeout):
+        """执行ADB子进程（记录耗时和失败次数），超时则终止进程"""
+        async with self._global_semaphore:
+            name = adb_command_name(args)
+            start = time.perf_counter()
+            try:
+                return await self._communicate(args, timeout, name)
+            except Exception:
+                ADB_COMMAND_ERRORS.labels(name).inc()
+                raise
+            finally:
+                ADB_COMMAND_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+    async def _communicate(self, args, timeout, name):
+        """启动ADB子进程并等待输出"""
+        process = await asyncio.create_subprocess_exec(
+            ADB_COMMAND, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode != 0:
+            ADB_COMMAND_ERRORS.labels(name).inc()
+        return (
+            process.returncode,
+            stdout.decode('utf-8', errors='ignore'),
+            stderr.decode('utf-8', errors='ignore')
+        )
+
+    async def run(self, *args, device_id=None, timeout=None):
+        """
+        执行ADB命令
+
+        Args:
+            *args: ADB参数（不含 adb 本身和 -s）
+            device_id (str): 目标设备，指定时受设备信号量限制
+            timeout (float): 超时时间（秒）
+
+        Returns:
+            tuple: (返回码, 标准输出, 标准错误)
+        """
+        timeout = timeout or self.command_timeout
+        if device_id is None:
+            return await self._exec(list(args), timeout)
+
+        async with self._device_semaphore(device_id):
+            return await self._exec(['-s', device_id, *args], timeout)
+
+    async def update_connected_devices(self):
+        """更新已连接的设备列表"""
+        try:
+            returncode, stdout, stderr = await self.run('devices')
+            if returncode != 0:
+                logger.error(f"获取设备列表失败: {stderr.strip()}")
+                self.connected_devices = set()
+            else:
+                lines = stdout.strip().split('\n')[1:]  # 跳过标题行
+                self.connected_devices = {
+                    line.split()[0] for line in lines
+                    if line.strip() and line.split()[-1] == 'device'  # 过滤掉未授权设备
+                }
+            self._devices_time = time.time()
+            return self.connected_devices
+        except Exception as e:
+            logger.error(f"获取设备列表失败: {str(e)}")
+            self.connected_devices = set()
+            return set()
+
+    async def is_device_connected(self, device_id):
+        """检查指定设备是否在线（使用短时缓存）"""
+        async with self._devices_lock:
+            if time.time() - self._devices_time > self.devices_ttl:
+                await self.update_connected_devices()
+        return device_id in self.connected_devices
+
+    async def get_state(self, device_id):
+        """获取设备状态（device/offline/unauthorized）"""
+        try:
+            returncode, stdout, _ = await self.run('get-state', device_id=device_id)
+            return stdout.strip() if returncode == 0 else None
+        except Exception as e:
+            logger.debug(f"获取设备状态失败: {device_id} - {str(e)}")
+            return None
+
+    async def shell(self, device_id, command, timeout=None):
+        """执行设备shell命令"""
+        return await self.run('shell', command, device_id=device_id, timeout=timeout)
+
+    async def push_file(self, device_id, source_path, target_path):
+        """推送文件并触发媒体扫描"""
+        try:
+            if not await self.is_device_connected(device_id):
+                return False, "DEVICE_NOT_FOUND"
+
+            target_dir = os.path.dirname(target_path)
+            try:
+                await self.run('shell', 'mkdir', '-p', target_dir, device_id=device_id)
+            except Exception:
+                pass
+
+            returncode, _, stderr = await self.run('push', source_path, target_path, device_id=device_id)
+            if returncode != 0:
+                logger.debug(f"传输失败: {stderr}")
+                return False, "TRANSFER_FAILED"
+
+            with tracer.span('media_scan'):
+                await self.trigger_media_scan(device_id, target_path)
+            logger.debug(f"文件传输成功: {target_path}")
+            return True, "SUCCESS"
+
+        except Exception as e:
+            logger.error(f"传输异常: {str(e)}")
+            return False, "FAILED"
+
+    async def trigger_media_scan(self, device_id, target_path):
+        """触发媒体扫描（广播失败时使用媒体存储命令）"""
+        try:
+            returncode, _, _ = await self.shell(
+                device_id,
+                'am broadcast -a android.intent.action.MEDIA_SCANNER_SCAN_FILE -d file://' + target_path
+            )
+            if returncode != 0:
+                await self.shell(
+                    device_id,
+                    'content call --uri content://media/none/all --method SCAN_FILE --arg file://' + target_path
+                )
+            logger.debug(f"媒体扫描请求已发送: {target_path}")
+            return True
+        except Exception as e:
+            logger.warning(f"媒体扫描触发失败: {str(e)}")
+            return False
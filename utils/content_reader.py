@@ -2,7 +2,10 @@
 # -*- coding: UTF-8 -*-
 
 from utils.logger import get_logger
+from config.settings import CONTENT_CONFIG
+from collections import OrderedDict
 import os
+import threading
 
 logger = get_logger(__name__)
 
@@ -19,29 +22,126 @@ class ContentReader:
                 logger.debug(f"内容文件不存在，使用空内容: {content_path}")
                 return "", ""
                 
-            with open(content_path, 'r', encoding='utf-8') as f:
+            with open(content_path, 'r', encoding='utf-8-sig') as f:
                 content = f.read()
             
-            # 分割标题和正文
-            parts = content.split('\n', 2)  # 最多分割2次
-            
-            title = ""
-            body = ""
-            
-            # 解析标题
-            if len(parts) >= 1:
-                title_line = parts[0]
-                if title_line.startswith("标题："):
-                    title = title_line[3:].strip()
-            
-            # 解析正文
-            if len(parts) >= 2:
-                body_start = parts[1]
-                if body_start.startswith("正文："):
-                    body = parts[1][3:] + "\n" + parts[2] if len(parts) > 2 else parts[1][3:]
-            
-            return title, body.strip()
+            title, body, _ = ContentReader.parse_content(content)
+            return title, body
             
         except Exception as e:
             logger.error(f"读取内容文件失败: {str(e)}")
-            return "", "" 
\ No newline at end of file
+            return "", ""
+
+    @staticmethod
+    def parse_content(content):
+        """
+        解析并校验内容文本
+        
+        Returns:
+            tuple: (标题, 正文, 错误信息)；格式正确时错误信息为None
+        """
+        # 分割标题和正文
+        parts = content.split('\n', 2)  # 最多分割2次
+        
+        title = ""
+        body = ""
+        error = None
+        
+        # 解析标题
+        if len(parts) >= 1:
+            title_line = parts[0]
+            if title_line.startswith("标题："):
+                title = title_line[3:].strip()
+            elif content.strip():
+                error = "第一行应以'标题：'开头"
+        
+        # 解析正文
+        if len(parts) >= 2:
+            body_start = parts[1]
+            if body_start.startswith("正文："):
+                body = parts[1][3:] + "\n" + parts[2] if len(parts) > 2 else parts[1][3:]
+            elif not error and ''.join(parts[1:]).strip():
+                error = "第二行应以'正文：'开头"
+        
+        body = body.strip()
+        if not error and len(title) > CONTENT_CONFIG['TITLE_MAX_LENGTH']:
+            error = f"标题超过 {CONTENT_CONFIG['TITLE_MAX_LENGTH']} 字"
+        if not error and len(body) > CONTENT_CONFIG['BODY_MAX_LENGTH']:
+            error = f"正文超过 {CONTENT_CONFIG['BODY_MAX_LENGTH']} 字"
+        
+        return title, body, error
+
+
+class ContentEntry:
+    """解析后的内容文件"""
+
+    __slots__ = ('title', 'body', 'error', 'mtime', 'size')
+
+    def __init__(self, title, body, error, mtime, size):
+        self.title = title
+        self.body = body
+        self.error = error   # 格式错误信息，None 表示可以直接发布
+        self.mtime = mtime
+        self.size = size
+
+
+class ContentCache:
+    """内容文件缓存（按路径索引，文件修改时间或大小变化时重新解析）"""
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or CONTENT_CONFIG['CACHE_SIZE']
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, content_path, refresh=True):
+        """
+        获取解析后的内容
+        
+        Args:
+            content_path (str): 内容文件路径
+            refresh (bool): 是否检查文件变化；为False时直接返回已缓存的内容（无文件读写）
+        
+        Returns:
+            ContentEntry: 文件不存在时标题和正文为空
+        """
+        with self._lock:
+            entry = self._entries.get(content_path)
+            if entry is not None:
+                self._entries.move_to_end(content_path)
+                if not refresh:
+                    return entry
+        
+        try:
+            stat = os.stat(content_path)
+            mtime, size = stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            mtime, size = None, None
+        
+        if entry is not None and (entry.mtime, entry.size) == (mtime, size):
+            return entry
+        
+        if mtime is None:
+            logger.debug(f"内容文件不存在，使用空内容: {content_path}")
+            entry = ContentEntry("", "", None, None, None)
+        else:
+            try:
+                with open(content_path, 'r', encoding='utf-8-sig') as f:
+                    title, body, error = ContentReader.parse_content(f.read())
+            except Exception as e:
+                title, body, error = "", "", f"读取失败: {str(e)}"
+            entry = ContentEntry(title, body, error, mtime, size)
+            if error:
+                logger.warning(f"内容文件格式错误: {content_path} - {error}")
+            else:
+                logger.debug(f"内容文件已解析: {content_path}")
+        
+        with self._lock:
+            self._entries[content_path] = entry
+            self._entries.move_to_end(content_path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+# 创建全局实例
+content_cache = ContentCache()
@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+设备驱动适配模块功能：
+1. 封装 uiautomator2 的连接入口，首次连接设备时才导入 uiautomator2
+2. 导入调度器、会话池等模块不再依赖 uiautomator2（启动更快，未安装时也能运行不连接设备的部分）
+"""
+
+from utils.lazy_import import lazy_module
+
+u2 = lazy_module('uiautomator2')
+
+
+def connect(serial):
+    """连接设备（与 uiautomator2.connect 相同）"""
+    return u2.connect(serial)
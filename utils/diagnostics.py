@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+运行时诊断模块功能：
+1. SIGUSR1：开始/停止采样分析（覆盖所有线程），最长持续 PROFILE_SECONDS，结束时输出火焰图折叠栈和热点函数汇总
+2. SIGUSR2：转储 tracemalloc 分配热点（与上次转储对比）和各线程当前调用栈；
+   TRACEMALLOC_AT_START 开启时从注册诊断起跟踪，否则首次转储时才开始跟踪
+3. 信号处理函数只启动后台线程，服务主循环不受影响；输出写入 DIAGNOSTICS_CONFIG['OUTPUT_DIR']
+4. Windows 没有 SIGUSR1/SIGUSR2，此时不注册
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+import traceback
+from collections import Counter
+from utils.logger import get_logger
+from config.settings import DIAGNOSTICS_CONFIG
+
+logger = get_logger(__name__)
+
+
+def _timestamp():
+    """文件名时间戳（精确到毫秒，连续转储不会覆盖）"""
+    now = time.time()
+    return time.strftime('%Y%m%d_%H%M%S', time.localtime(now)) + f"_{int(now * 1000) % 1000:03d}"
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _thread_names():
+    return {thread.ident: thread.name for thread in threading.enumerate()}
+
+
+class SamplingProfiler:
+    """
+    采样分析器：后台线程定期读取所有线程的调用栈并计数
+
+    cProfile 只能分析启用它的线程，这里用 sys._current_frames 采样，开销与线程数和采样间隔有关
+    """
+
+    def __init__(self, output_dir, interval):
+        self.output_dir = output_dir
+        self.interval = interval
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds):
+        """开始采样，seconds 秒后自动停止；已在运行时返回 False"""
+        with self._lock:
+            if self.running:
+                return False
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, args=(seconds,), name='sampling-profiler', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        """提前停止采样（结果由采样线程输出）"""
+        self._stop_event.set()
+
+    def _run(self, seconds):
+        own = threading.get_ident()
+        stacks = Counter()
+        samples = 0
+        start = time.perf_counter()
+        deadline = start + seconds
+        while not self._stop_event.is_set() and time.perf_counter() < deadline:
+            names = _thread_names()
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(tid, str(tid)))
+                stacks[tuple(reversed(stack))] += 1
+            samples += 1
+            self._stop_event.wait(self.interval)
+        self._write(stacks, samples, time.perf_counter() - start)
+
+    def _write(self, stacks, samples, seconds):
+        """输出折叠栈（flamegraph.pl / speedscope 可直接读取）和热点函数汇总"""
+        base = os.path.join(self.output_dir, f"profile_{_timestamp()}")
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in stacks.items():
+            self_counts[stack[-1]] += count
+            for label in set(stack[1:]):
+                total_counts[label] += count
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(base + '.folded', 'w', encoding='utf-8') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{';'.join(stack)} {count}\n")
+
+            thread_samples = sum(stacks.values()) or 1
+            lines = [
+                f"采样分析: {seconds:.1f}秒, {samples} 次采样, 间隔 {self.interval}秒, 进程 {os.getpid()}",
+                '',
+                '自身耗时（占线程采样比例）:'
+            ]
+            lines += [f"  {count * 100 / thread_samples:6.2f}%  {label}" for label, count in self_counts.most_common(40)]
+            lines += ['', '累计耗时（含子调用）:']
+            lines += [f"  {count * 100 / thread_samples:6.2f}%  {label}" for label, count in total_counts.most_common(40)]
+            with open(base + '.txt', 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        except Exception as e:
+            logger.error(f"写入采样分析结果失败: {base} - {str(e)}")
+            return
+        logger.info(f"采样分析已完成: {base}.txt, 折叠栈: {base}.folded")
+
+
+class Diagnostics:
+    """按信号触发的运行时诊断"""
+
+    def __init__(self):
+        self.enabled = DIAGNOSTICS_CONFIG['ENABLED']
+        self.output_dir = DIAGNOSTICS_CONFIG['OUTPUT_DIR']
+        self.profiler = SamplingProfiler(self.output_dir, DIAGNOSTICS_CONFIG['SAMPLE_INTERVAL'])
+        self._last_snapshot = None
+        self._tracing_since = None   # 本模块开始 tracemalloc 跟踪的时间
+        self._dump_lock = threading.Lock()
+
+    def install(self):
+        """
+        注册 SIGUSR1/SIGUSR2（必须在主线程调用）
+
+        Returns:
+            bool: 是否已注册
+        """
+        if not self.enabled:
+            return False
+        if not hasattr(signal, 'SIGUSR1') or not hasattr(signal, 'SIGUSR2'):
+            logger.debug("当前平台不支持 SIGUSR1/SIGUSR2，未注册运行时诊断")
+            return False
+        signal.signal(signal.SIGUSR1, self._on_profile_signal)
+        signal.signal(signal.SIGUSR2, self._on_dump_signal)
+        if DIAGNOSTICS_CONFIG['TRACEMALLOC_AT_START']:
+            self._start_tracing()
+        logger.info(f"运行时诊断已注册: kill -USR1 {os.getpid()} 采样分析, kill -USR2 {os.getpid()} 转储内存和线程栈")
+        return True
+
+    def _on_profile_signal(self, signum, frame):
+        threading.Thread(target=self.toggle_profiling, name='diagnostics', daemon=True).start()
+
+    def _on_dump_signal(self, signum, frame):
+        threading.Thread(target=self.dump_state, name='diagnostics', daemon=True).start()
+
+    def toggle_profiling(self):
+        """未运行时开始采样，运行中则提前停止"""
+        if self.profiler.running:
+            logger.info("停止采样分析...")
+            self.profiler.stop()
+        elif self.profiler.start(DIAGNOSTICS_CONFIG['PROFILE_SECONDS']):
+            logger.info(f"开始采样分析，最长 {DIAGNOSTICS_CONFIG['PROFILE_SECONDS']} 秒（再次发送 SIGUSR1 提前停止）")
+
+    def dump_state(self):
+        """
+        转储线程栈和内存分配热点
+
+        Returns:
+            str: 转储文件路径；失败时返回 None
+        """
+        with self._dump_lock:
+            lines = [f"运行时转储: {time.strftime('%Y-%m-%d %H:%M:%S')}, 进程 {os.getpid()}", '']
+            lines += self._format_threads()
+            lines.append('')
+            lines += self._format_allocations()
+
+            path = os.path.join(self.output_dir, f"dump_{_timestamp()}.txt")
+            try:
+                os.makedirs(self.output_dir, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(lines) + '\n')
+            except Exception as e:
+                logger.error(f"写入运行时转储失败: {path} - {str(e)}")
+                return None
+            logger.info(f"运行时转储已输出: {path}")
+            return path
+
+    def _format_threads(self):
+        names = _thread_names()
+        frames = sys._current_frames()
+        lines = [f"线程栈（{len(frames)} 个线程）:"]
+        for tid, frame in frames.items():
+            if tid == threading.get_ident():
+                continue  # 跳过转储线程本身
+            lines.append(f"--- {names.get(tid, '未知线程')} ({tid}) ---")
+            lines += [line.rstrip('\n') for line in traceback.format_stack(frame)]
+        return lines
+
+    def _start_tracing(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(DIAGNOSTICS_CONFIG['TRACEMALLOC_FRAMES'])
+            self._tracing_since = time.time()
+
+    def _format_allocations(self):
+        """
+        输出分配热点及与上次转储的差异
+
+        未开启 TRACEMALLOC_AT_START 时首次转储才开始跟踪（跟踪有额外开销），
+        之前的分配不会被记录，转储中注明跟踪开始时间
+        """
+        if not tracemalloc.is_tracing():
+            self._start_tracing()
+            return ["内存分配: tracemalloc 跟踪刚刚开始，此前的分配（包括已存在的内存增长）没有记录；",
+                    "  再次发送 SIGUSR2 输出此后的分配热点，需要从启动起跟踪时开启 DIAGNOSTICS_CONFIG['TRACEMALLOC_AT_START']"]
+
+        top = DIAGNOSTICS_CONFIG['TRACEMALLOC_TOP']
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>')
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        if self._tracing_since is not None:
+            since = (f"跟踪开始于 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._tracing_since))}"
+                     f"（{time.time() - self._tracing_since:.0f}秒前）")
+        else:
+            since = "跟踪由外部开启（如 PYTHONTRACEMALLOC）"
+        lines = [f"内存分配: 当前 {current / 1024 / 1024:.1f}MB, 峰值 {peak / 1024 / 1024:.1f}MB, {since}", '',
+                 f"分配热点（前 {top} 个位置）:"]
+        lines += [f"  {stat}" for stat in snapshot.statistics('lineno')[:top]]
+        if self._last_snapshot is not None:
+            lines += ['', f"与上次转储相比增长最多（前 {top} 个位置）:"]
+            lines += [f"  {stat}" for stat in snapshot.compare_to(self._last_snapshot, 'lineno')[:top]]
+        self._last_snapshot = snapshot
+        return lines
+
+
+# 创建全局实例
+diagnostics = Diagnostics()
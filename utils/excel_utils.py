@@ -1,7 +1,6 @@
 import os
 import time
-import win32file
-import pandas as pd
+from utils.file_lock import is_file_locked
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -10,29 +9,9 @@ class ExcelUtils:
     @staticmethod
     def is_file_locked(file_path):
         """
-        检查文件是否被占用
+        检查文件是否被占用（平台相关的实现见 utils.file_lock）
         """
-        try:
-            # 尝试以写入模式打开文件
-            handle = win32file.CreateFile(
-                file_path,
-                win32file.GENERIC_READ | win32file.GENERIC_WRITE,
-                0,  # 不共享
-                None,
-                win32file.OPEN_EXISTING,
-                win32file.FILE_ATTRIBUTE_NORMAL,
-                None
-            )
-            
-            # 如果成功打开，则关闭句柄
-            if handle:
-                win32file.CloseHandle(handle)
-                return False
-                
-        except Exception:
-            return True
-            
-        return False
+        return is_file_locked(file_path)
 
     @staticmethod
     def wait_for_file_unlock(file_path, timeout=300, check_interval=2):
@@ -85,12 +64,8 @@ class ExcelUtils:
                 # 写入临时文件
                 df.to_excel(temp_file, index=False, engine='openpyxl')
                 
-                # 如果原文件存在，则先删除
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                
-                # 重命名临时文件
-                os.rename(temp_file, file_path)
+                # 原子替换原文件（不会出现原文件已删除、新文件尚未就位的窗口）
+                os.replace(temp_file, file_path)
                 
                 logger.info("Excel文件更新成功")
                 return True
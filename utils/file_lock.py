@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+文件占用检测适配模块功能：
+1. Windows：以独占方式打开文件（win32file，首次检测时导入），失败即被占用（如Excel正在编辑）
+2. 其他平台：没有强制文件锁，能以读写方式打开即视为未占用
+"""
+
+import os
+from utils.lazy_import import lazy_module
+
+win32file = lazy_module('win32file') if os.name == 'nt' else None
+
+
+def is_file_locked(file_path):
+    """检查文件是否被其他进程占用"""
+    if win32file is None:
+        try:
+            with open(file_path, 'r+b'):
+                return False
+        except OSError:
+            return True
+
+    try:
+        # 尝试以写入模式打开文件
+        handle = win32file.CreateFile(
+            file_path,
+            win32file.GENERIC_READ | win32file.GENERIC_WRITE,
+            0,  # 不共享
+            None,
+            win32file.OPEN_EXISTING,
+            win32file.FILE_ATTRIBUTE_NORMAL,
+            None
+        )
+
+        # 如果成功打开，则关闭句柄
+        if handle:
+            win32file.CloseHandle(handle)
+            return False
+
+    except Exception:
+        return True
+
+    return False
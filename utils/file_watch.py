@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+文件系统监控适配模块功能：
+1. 封装 watchdog 的 Observer，启动监控时才导入 watchdog
+2. 事件处理对象无需继承 watchdog 的基类，只需实现 on_modified / on_created
+"""
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FileWatcher:
+    """监控一个目录，把修改和创建事件转发给 handler"""
+
+    def __init__(self, path, handler, recursive=False):
+        self.path = path
+        self.handler = handler
+        self.recursive = recursive
+        self._observer = None
+
+    def start(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        handler = self.handler
+
+        class _Forwarder(FileSystemEventHandler):
+            def on_modified(self, event):
+                handler.on_modified(event)
+
+            def on_created(self, event):
+                handler.on_created(event)
+
+        self._observer = Observer()
+        self._observer.schedule(_Forwarder(), path=self.path, recursive=self.recursive)
+        self._observer.start()
+
+    def stop(self):
+        """停止监控（未启动时直接返回）"""
+        if self._observer is None:
+            return
+        self._observer.stop()
+        self._observer.join()
+        self._observer = None
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+延迟导入模块功能：
+1. 模块代理对象，首次访问属性时才真正导入（pandas 等重量级依赖不拖慢启动）
+2. 导入耗时写入日志，便于确认首次使用时的开销
+"""
+
+import importlib
+import time
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LazyModule:
+    """模块代理：用法与 import 的模块相同（pd.read_excel(...)），首次访问属性时导入"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            start = time.perf_counter()
+            # 多线程同时首次访问时由 importlib 的模块锁保证只导入一次
+            self._module = importlib.import_module(self._name)
+            logger.debug(f"延迟导入 {self._name}: {time.perf_counter() - start:.3f}秒")
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = '已导入' if self._module is not None else '未导入'
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_module(name):
+    """返回模块 name 的延迟导入代理"""
+    return LazyModule(name)
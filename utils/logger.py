@@ -13,18 +13,32 @@
 1. 统一日志格式
 2. 文件与控制台双输出
 3. 按模块分日志文件
+4. 日志经有界队列交给后台线程写入，业务线程不做磁盘读写；队列满时丢弃并计数
+5. 结构化事件日志（事件名 + 字段），在后台线程输出时才格式化，文件中写为 JSON 行
 """
 
+import atexit
+import json
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
 from config.settings import LOG_CONFIG, LOG_DIR
 
 class FilteredHandler(logging.StreamHandler):
-    def __init__(self, ignore_rules=None):
+    """控制台处理器：按 IgnoreConfig 的编译规则过滤日志"""
+    
+    def __init__(self, ignore_config=None):
         super().__init__(sys.stdout)
-        self.ignore_rules = ignore_rules or {}
+        self.ignore_config = ignore_config
+
+    def handle(self, record):
+        # 低于处理器级别的日志直接跳过，不做规则匹配
+        if record.levelno < self.level:
+            return False
+        return super().handle(record)
 
     def emit(self, record):
         """实现emit方法"""
@@ -36,27 +50,190 @@ class FilteredHandler(logging.StreamHandler):
             self.handleError(record)
     
     def should_ignore(self, record):
-        level = record.levelname.lower()
-        message = record.getMessage()
-        module = record.name
+        config = self.ignore_config
+        if config is None:
+            return False
         
-        rules = self.ignore_rules
-        if not rules:
+        config.reload_if_changed()
+        matcher = config.matcher(record.levelname.lower(), record.name)
+        if matcher is None:
             return False
+        return matcher.search(record.getMessage()) is not None
+
+class LogEvent:
+    """结构化事件：只保存事件名和字段，输出时才格式化"""
+    
+    __slots__ = ('event', 'fields')
+    
+    def __init__(self, event, fields):
+        self.event = event
+        self.fields = fields
+    
+    def __str__(self):
+        if not self.fields:
+            return self.event
+        return self.event + " " + " ".join(f"{key}={value}" for key, value in self.fields.items())
+
+class EventFormatter(logging.Formatter):
+    """将结构化事件格式化为一行 JSON"""
+    
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.msg.event
+        }
+        data.update(record.msg.fields)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class EventFileHandler(RotatingFileHandler):
+    """结构化事件的文件输出（JSON 行），普通日志不写入"""
+    
+    def emit(self, record):
+        if isinstance(record.msg, LogEvent):
+            super().emit(record)
+
+class ModuleFileHandler(logging.Handler):
+    """按记录器名称分发到各模块的日志文件（仅在后台线程中调用）"""
+    
+    def __init__(self):
+        super().__init__()
+        self._handlers = {}
+    
+    def _handler_for(self, name):
+        handler = self._handlers.get(name)
+        if handler is None:
+            handler = RotatingFileHandler(
+                os.path.join(LOG_DIR, f"{name}.log"),
+                maxBytes=LOG_CONFIG['MAX_BYTES'],
+                backupCount=LOG_CONFIG['BACKUP_COUNT'],
+                encoding='utf-8'
+            )
+            handler.setFormatter(self.formatter)
+            self._handlers[name] = handler
+        return handler
+    
+    def emit(self, record):
+        if isinstance(record.msg, LogEvent):
+            return  # 结构化事件写入事件文件
+        try:
+            self._handler_for(record.name).emit(record)
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        for handler in self._handlers.values():
+            handler.flush()
+    
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
+class BoundedQueueHandler(QueueHandler):
+    """非阻塞入队：队列满时丢弃日志并计数"""
+    
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.fallback = None  # 管道关闭后直接由输出处理器同步写入
+    
+    def prepare(self, record):
+        # 结构化事件不在业务线程格式化，交给后台线程输出时处理
+        if isinstance(record.msg, LogEvent):
+            return record
+        return super().prepare(record)
+    
+    def enqueue(self, record):
+        if self.fallback is not None:
+            self.fallback.handle(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogPipeline:
+    """日志管道：所有模块共用一个队列处理器，由一个后台监听线程负责控制台和文件输出"""
+    
+    def __init__(self):
+        self.queue = queue.Queue(LOG_CONFIG['QUEUE_SIZE'])
+        self.handler = BoundedQueueHandler(self.queue)
+        # 控制台和文件都不输出的日志不进入队列
+        self.handler.setLevel(min(logging.getLevelName(LOG_CONFIG['CONSOLE_LEVEL']),
+                                  logging.getLevelName(LOG_CONFIG['FILE_LEVEL'])))
+        self.listener = None
+        self._lock = threading.RLock()
+    
+    def start(self):
+        """首次获取日志记录器时启动后台监听线程"""
+        with self._lock:
+            if self.listener is not None:
+                return
             
-        # 检查模块特定规则
-        if module in rules.get(level, {}):
-            for pattern in rules[level][module]:
-                if pattern in message:
-                    return True
-        
-        # 检查全局规则
-        if "global" in rules.get(level, {}):
-            for pattern in rules[level]["global"]:
-                if pattern in message:
-                    return True
+            # 创建日志目录
+            os.makedirs(LOG_DIR, exist_ok=True)
+            
+            console_handler = FilteredHandler()
+            console_handler.setLevel(LOG_CONFIG['CONSOLE_LEVEL'])
+            console_handler.setFormatter(logging.Formatter(LOG_CONFIG['FORMAT']))
+            
+            # 文件处理器
+            file_handler = ModuleFileHandler()
+            file_handler.setLevel(LOG_CONFIG['FILE_LEVEL'])
+            file_handler.setFormatter(logging.Formatter(LOG_CONFIG['FORMAT']))
+            
+            # 结构化事件文件（JSON 行）
+            event_handler = EventFileHandler(
+                os.path.join(LOG_DIR, LOG_CONFIG['EVENT_FILE']),
+                maxBytes=LOG_CONFIG['MAX_BYTES'],
+                backupCount=LOG_CONFIG['BACKUP_COUNT'],
+                encoding='utf-8',
+                delay=True
+            )
+            event_handler.setLevel(LOG_CONFIG['FILE_LEVEL'])
+            event_handler.setFormatter(EventFormatter())
+            
+            self.listener = QueueListener(self.queue, console_handler, file_handler, event_handler,
+                                          respect_handler_level=True)
+            self.listener.start()
+            
+            try:
+                # 尝试导入ignore_config（其中也会获取日志记录器，需在监听线程创建之后导入）
+                from config.ignore_config import ignore_config
+                console_handler.ignore_config = ignore_config
+            except ImportError:
+                pass
+    
+    def stop(self):
+        """写完队列中剩余的日志，之后的日志改为同步写入（可重复调用）"""
+        with self._lock:
+            listener, self.listener = self.listener, None
+        if listener is None:
+            return
         
-        return False
+        if self.handler.dropped:
+            self.queue.put(logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': f"日志队列已满，共丢弃 {self.handler.dropped} 条日志"
+            }))
+        listener.stop()  # 阻塞直到队列中的日志全部写出
+        for handler in listener.handlers:
+            handler.flush()
+        self.handler.fallback = listener
+    
+    def get_stats(self):
+        return {
+            'queued': self.queue.qsize(),
+            'capacity': self.queue.maxsize,
+            'dropped': self.handler.dropped
+        }
+
+# 创建全局实例
+log_pipeline = LogPipeline()
+atexit.register(log_pipeline.stop)
 
 def get_logger(name):
     """获取模块专用日志记录器"""
@@ -67,34 +244,47 @@ def get_logger(name):
     if logger.handlers:
         return logger
     
-    # 创建日志目录
-    os.makedirs(LOG_DIR, exist_ok=True)
-    
-    try:
-        # 尝试导入ignore_config
-        from config.ignore_config import ignore_config
-        console_handler = FilteredHandler(ignore_config.ignore_rules)
-    except ImportError:
-        # 如果无法导入，使用基本的StreamHandler
-        console_handler = logging.StreamHandler(sys.stdout)
-    
-    console_handler.setLevel(LOG_CONFIG['CONSOLE_LEVEL'])
-    console_formatter = logging.Formatter(LOG_CONFIG['FORMAT'])
-    console_handler.setFormatter(console_formatter)
-    
-    # 文件处理器
-    file_handler = RotatingFileHandler(
-        os.path.join(LOG_DIR, f"{name}.log"),
-        maxBytes=LOG_CONFIG['MAX_BYTES'],
-        backupCount=LOG_CONFIG['BACKUP_COUNT'],
-        encoding='utf-8'
-    )
-    file_handler.setLevel(LOG_CONFIG['FILE_LEVEL'])
-    file_formatter = logging.Formatter(LOG_CONFIG['FORMAT'])
-    file_handler.setFormatter(file_formatter)
-    
-    # 添加处理器
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    log_pipeline.start()
+    logger.addHandler(log_pipeline.handler)
     
     return logger
+
+class EventLogger:
+    """
+    结构化事件日志记录器
+    
+    用法：
+        events = get_event_logger(__name__)
+        events.debug("task.added", post_name=name, queue_length=len(tasks))
+    
+    字段值在后台线程输出时才转换为字符串，调用方应传入不会再被修改的简单值
+    """
+    
+    def __init__(self, logger):
+        self.logger = logger
+    
+    def log(self, level, event, **fields):
+        # 控制台和文件都不输出时直接返回，不创建日志记录
+        if level < log_pipeline.handler.level or not self.logger.isEnabledFor(level):
+            return
+        self.logger.log(level, LogEvent(event, fields))
+    
+    def debug(self, event, **fields):
+        self.log(logging.DEBUG, event, **fields)
+    
+    def info(self, event, **fields):
+        self.log(logging.INFO, event, **fields)
+    
+    def warning(self, event, **fields):
+        self.log(logging.WARNING, event, **fields)
+    
+    def error(self, event, **fields):
+        self.log(logging.ERROR, event, **fields)
+
+def get_event_logger(name):
+    """获取模块专用的结构化事件日志记录器"""
+    return EventLogger(get_logger(name))
+
+def shutdown_logging():
+    """关闭日志管道（程序退出前调用，确保日志写入磁盘）"""
+    log_pipeline.stop()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+运行指标模块功能：
+1. 进程内指标注册表（计数器、仪表、直方图），按标签区分
+2. 以 Prometheus 文本格式输出，通过本地 http.server 端口提供 /metrics
+3. 记录开销低：每次记录只有一次加锁和少量加法，格式化只在抓取时进行
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.logger import get_logger
+from config.settings import METRICS_CONFIG
+
+logger = get_logger(__name__)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    """指标基类：按标签值保存子指标"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """获取某组标签值对应的子指标（热点代码可提前取出并复用）"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} 需要标签 {self.labelnames}，实际为 {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def collect(self):
+        """返回 (标签值, 子指标) 列表"""
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self.collect(), key=lambda item: item[0]):
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _Value:
+    """计数器和仪表的值"""
+
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+    def render(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        """无标签计数器加一（有标签时使用 labels(...).inc()）"""
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """可增可减的仪表；也可以注册回调，在抓取时读取当前值（如队列深度）"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._callback = None
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def set_function(self, callback):
+        """
+        抓取时调用 callback 获取当前值
+
+        Args:
+            callback: 无标签时返回数值；有标签时返回 {标签值元组: 数值}
+        """
+        self._callback = callback
+
+    def collect(self):
+        if self._callback is None:
+            return super().collect()
+        try:
+            result = self._callback()
+        except Exception as e:
+            logger.debug(f"读取指标失败: {self.name} - {str(e)}")
+            return []
+        if not self.labelnames:
+            child = _Value()
+            child.set(result)
+            return [((), child)]
+        children = []
+        for values, value in result.items():
+            child = _Value()
+            child.set(value)
+            children.append((tuple(values), child))
+        return children
+
+
+class _HistogramValue:
+    """直方图的分桶计数"""
+
+    __slots__ = ('buckets', 'counts', 'sum', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def render(self, name, labelnames, values):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + [float('inf')], counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, values)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, values)} {cumulative}")
+        return lines
+
+
+class Histogram(_Metric):
+    """耗时等数值的分布（按上界分桶累计）"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=None):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = sorted(buckets or METRICS_CONFIG['DEFAULT_BUCKETS'])
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self, *values):
+        """计时上下文管理器：with histogram.time('push'): ..."""
+        return self.labels(*values).time()
+
+
+class MetricsRegistry:
+    """指标注册表：同名指标只创建一次，各模块在导入时注册"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标 {name} 已注册为 {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=None):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """输出 Prometheus 文本格式"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 抓取请求不写访问日志
+
+
+class MetricsServer:
+    """本地指标端口（后台线程运行 http.server）"""
+
+    def __init__(self, registry, host=None, port=None):
+        self.registry = registry
+        self.host = host or METRICS_CONFIG['HOST']
+        self.port = METRICS_CONFIG['PORT'] if port is None else port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """启动指标端口；端口被占用等错误只记录日志，不影响主程序"""
+        if self._server is not None or not METRICS_CONFIG['ENABLED']:
+            return False
+        handler = type('MetricsRequestHandler', (_MetricsRequestHandler,), {'registry': self.registry})
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        except OSError as e:
+            logger.error(f"指标端口启动失败: {self.host}:{self.port} - {str(e)}")
+            return False
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        logger.info(f"指标端口已启动: http://{self.host}:{self._server.server_port}/metrics")
+        return True
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+
+# 创建全局实例
+metrics = MetricsRegistry()
+metrics_server = MetricsServer(metrics)
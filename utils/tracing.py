@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+任务链路追踪模块功能：
+1. 按任务（postName, time）记录各阶段的开始和结束（Excel检测、建目录、媒体清单、ADB传输、媒体扫描、调度等待、界面自动化）
+2. 跨线程和协程：当前任务通过 contextvars 传递，底层模块无需知道任务信息
+3. 任务结束时输出 Chrome trace_event JSON，可在 chrome://tracing 或 Perfetto 中打开
+4. 按任务采样（同一任务在所有阶段的采样结果一致）
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from utils.logger import get_logger
+from config.settings import TRACE_CONFIG
+
+logger = get_logger(__name__)
+
+# 任务时间的几种写法（Excel时间、调度时间、目录名），统一为分钟精度
+_TIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d_%H-%M')
+
+_current_task = contextvars.ContextVar('trace_task', default=None)
+
+
+def trace_key(post_name, task_time):
+    """任务追踪键：'设备名 YYYY-MM-DD HH:MM'"""
+    text = str(task_time).strip()
+    for fmt in _TIME_FORMATS:
+        try:
+            text = datetime.strptime(text, fmt).strftime('%Y-%m-%d %H:%M')
+            break
+        except ValueError:
+            continue
+    return f"{str(post_name).strip()} {text}"
+
+
+def _now_us():
+    return time.time_ns() // 1000
+
+
+class _TaskTrace:
+    """单个任务的事件缓冲"""
+
+    __slots__ = ('events', 'open_spans', 'dropped')
+
+    def __init__(self):
+        self.events = []
+        self.open_spans = {}   # 阶段名 -> (开始时间, 线程号, 参数)
+        self.dropped = 0
+
+
+class Tracer:
+    """任务链路追踪器"""
+
+    def __init__(self):
+        self.enabled = TRACE_CONFIG['ENABLED']
+        self.sample_rate = TRACE_CONFIG['SAMPLE_RATE']
+        self.output_dir = TRACE_CONFIG['OUTPUT_DIR']
+        self._traces = OrderedDict()   # 追踪键 -> _TaskTrace（超过上限时淘汰最久未更新的任务）
+        self._thread_names = {}
+        self._lock = threading.Lock()
+
+    def sampled(self, key):
+        """按追踪键的哈希采样，同一任务的结果固定"""
+        if not self.enabled or key is None:
+            return False
+        if self.sample_rate >= 1:
+            return True
+        return zlib.crc32(key.encode('utf-8')) % 10000 < self.sample_rate * 10000
+
+    def _trace(self, key):
+        trace = self._traces.get(key)
+        if trace is None:
+            trace = self._traces[key] = _TaskTrace()
+            while len(self._traces) > TRACE_CONFIG['MAX_TASKS']:
+                evicted, _ = self._traces.popitem(last=False)
+                logger.debug(f"追踪缓冲已满，丢弃任务: {evicted}")
+        else:
+            self._traces.move_to_end(key)
+        return trace
+
+    def _add(self, key, event):
+        thread = threading.current_thread()
+        event['tid'] = thread.ident
+        with self._lock:
+            self._thread_names.setdefault(thread.ident, thread.name)
+            trace = self._trace(key)
+            if len(trace.events) >= TRACE_CONFIG['MAX_EVENTS_PER_TASK']:
+                trace.dropped += 1
+                return
+            trace.events.append(event)
+
+    @contextmanager
+    def task(self, key):
+        """将当前线程/协程的后续阶段归属到任务（底层模块通过 span 自动关联）"""
+        token = _current_task.set(key if self.sampled(key) else None)
+        try:
+            yield
+        finally:
+            _current_task.reset(token)
+
+    @contextmanager
+    def span(self, stage, key=None, **args):
+        """
+        记录一个阶段的开始和结束
+
+        未指定任务时使用当前上下文的任务；指定任务时阶段内的子阶段也归属该任务
+        """
+        token = None
+        if key is None:
+            key = _current_task.get()
+        else:
+            key = key if self.sampled(key) else None
+            token = _current_task.set(key)
+        try:
+            if key is None:
+                yield
+                return
+            start = _now_us()
+            try:
+                yield
+            finally:
+                self._add(key, {'name': stage, 'cat': 'task', 'ph': 'X', 'ts': start,
+                                'dur': _now_us() - start, 'args': args})
+        finally:
+            if token is not None:
+                _current_task.reset(token)
+
+    def now(self):
+        """当前时间（微秒），与 complete 配合使用"""
+        return _now_us()
+
+    def complete(self, stage, start, **args):
+        """
+        事后记录当前任务从 start（now() 的返回值）到现在的阶段
+
+        用于开始时还不确定是否值得记录的阶段（如没有文件需要传输的检查）
+        """
+        key = _current_task.get()
+        if key is not None:
+            self._add(key, {'name': stage, 'cat': 'task', 'ph': 'X', 'ts': start,
+                            'dur': _now_us() - start, 'args': args})
+
+    def instant(self, key, stage, **args):
+        """记录一个时间点（如检测到任务）"""
+        if self.sampled(key):
+            self._add(key, {'name': stage, 'cat': 'task', 'ph': 'i', 's': 't', 'ts': _now_us(), 'args': args})
+
+    def begin(self, key, stage, **args):
+        """开始一个跨线程的阶段（如调度等待），由 end 在任意线程结束"""
+        if not self.sampled(key):
+            return
+        thread = threading.current_thread()
+        with self._lock:
+            self._thread_names.setdefault(thread.ident, thread.name)
+            self._trace(key).open_spans[stage] = (_now_us(), thread.ident, args)
+
+    def end(self, key, stage, **args):
+        """结束 begin 开始的阶段（记录在开始时的线程上）"""
+        if not self.sampled(key):
+            return
+        with self._lock:
+            trace = self._traces.get(key)
+            opened = trace.open_spans.pop(stage, None) if trace else None
+            if opened is None or len(trace.events) >= TRACE_CONFIG['MAX_EVENTS_PER_TASK']:
+                return
+            start, tid, start_args = opened
+            trace.events.append({'name': stage, 'cat': 'task', 'ph': 'X', 'ts': start,
+                                 'dur': _now_us() - start, 'tid': tid, 'args': {**start_args, **args}})
+
+    def finish(self, key):
+        """
+        任务结束：输出该任务的 trace_event 文件并释放缓冲
+
+        Returns:
+            str: 输出文件路径；未采样或没有事件时返回 None
+        """
+        if not self.sampled(key):
+            return None
+        with self._lock:
+            trace = self._traces.pop(key, None)
+            thread_names = dict(self._thread_names)
+        if trace is None or not trace.events:
+            return None
+
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': key}}]
+        for tid in sorted({event['tid'] for event in trace.events}):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': thread_names.get(tid, str(tid))}})
+        for event in sorted(trace.events, key=lambda e: e['ts']):
+            events.append({**event, 'pid': pid})
+
+        file_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in key) + '.json'
+        path = os.path.join(self.output_dir, file_name)
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms',
+                           'otherData': {'task': key, 'dropped_events': trace.dropped}}, f, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"写入追踪文件失败: {path} - {str(e)}")
+            return None
+        logger.debug(f"任务追踪已输出: {path}")
+        return path
+
+
+# 创建全局实例
+tracer = Tracer()